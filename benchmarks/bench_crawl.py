@@ -0,0 +1,260 @@
+"""
+End-to-end load test: runs IgefaScraper.run against the local stand-in server and reports
+pages/s, p50/p99 request latency, CPU time per page and peak RSS of the scraper process.
+
+Usage:
+    python benchmarks/bench_crawl.py [scenario ...] [--concurrency N] [--streaming] [--parse-workers N] [--metrics]
+                                     [--json results.json] [--baseline results.json --tolerance 0.2]
+
+Each scenario runs with the stand-in server and the scraper in separate processes, so the server's CPU time
+does not count against the scraper and the peak RSS belongs to one scenario only.
+With --baseline the run fails if a scenario's pages/s dropped or its CPU per page rose by more than --tolerance.
+A scenario whose crawl crashes or runs past --timeout fails the run, with or without a baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+SCENARIOS = {
+    "baseline": dict(categories=10, products=200),
+    "large-payload": dict(categories=5, products=100, payload_kb=300),
+    "latency": dict(categories=10, products=100, latency=0.02, jitter=0.03),
+    "errors": dict(categories=5, products=100, error_rate=0.005, throttle_rate=0.005),
+    "listing": dict(categories=10, products=200, listing_fields=True),  # Compare with and without --listing-only
+}
+
+
+def serve(server_kwargs: dict, port_queue, stop_event):
+    from igefa_scraper.tests.standin import StandInServer
+
+    async def run():
+        async with StandInServer(**server_kwargs) as server:
+            port_queue.put(server.port)
+            while not stop_event.is_set():
+                await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+
+def crawl(base_url: str, options: dict, result_queue):
+    from igefa_scraper.logger import main_logger
+    from igefa_scraper.metrics import Metrics
+    from igefa_scraper.ratelimit import AdaptiveRateController
+    from igefa_scraper.scraper import IgefaScraper
+
+    main_logger.setLevel(logging.WARNING)  # Per-URL logging would dominate the profile
+
+    class RecordingController(AdaptiveRateController):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.samples = []
+
+        def release(self, status, latency, error):
+            self.samples.append(latency)
+            super().release(status, latency, error)
+
+    concurrency = options["concurrency"]
+    if options["adaptive"]:
+        controller = RecordingController(
+            concurrency=concurrency, max_concurrency=concurrency * 4, rate=1000, max_rate=1e6
+        )
+    else:
+        # Pinned limits: measures the scraper itself rather than the rate control
+        controller = RecordingController(
+            concurrency=concurrency,
+            min_concurrency=concurrency,
+            max_concurrency=concurrency,
+            rate=1e6,
+            min_rate=1e6,
+            max_rate=1e6,
+        )
+
+    async def run():
+        with tempfile.TemporaryDirectory() as directory:
+            scraper = IgefaScraper(
+                streaming=options["streaming"],
+                workers=concurrency,
+                frontier_file=os.path.join(directory, "frontier.sqlite3"),
+                dead_letter_file=os.path.join(directory, "dead_letters.sqlite3"),
+                rate_controller=controller,
+                parse_workers=options["parse_workers"],
+                base_url=base_url,
+                metrics=Metrics() if options["metrics"] else None,
+                listing_only=options["listing_only"],
+                data_routes=options["data_routes"],
+            )
+            scraper.intermediate_file = os.path.join(directory, "store")
+            async with scraper:
+                await scraper.run()
+            return len(scraper.processed_urls)
+
+    start_usage = cpu_time()
+    start = time.perf_counter()
+    products = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    cpu = cpu_time() - start_usage
+
+    samples = sorted(controller.samples)
+    pages = len(samples)
+    result_queue.put(
+        {
+            "pages": pages,
+            "products": products,
+            "seconds": round(elapsed, 3),
+            "pages_per_s": round(pages / elapsed, 1),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+            "cpu_ms_per_page": round(cpu / pages * 1000, 3) if pages else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+    )
+
+
+def cpu_time() -> float:
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):  # Children are the parse pool workers
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def percentile(samples: list, q: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def run_scenario(name: str, options: dict, timeout: float) -> dict:
+    """
+    Runs one scenario. A crawl that crashes or outlasts `timeout` seconds yields {"error": ...} instead of a result.
+    """
+    context = multiprocessing.get_context("spawn")
+    port_queue, result_queue, stop_event = context.Queue(), context.Queue(), context.Event()
+    server = context.Process(target=serve, args=(SCENARIOS[name], port_queue, stop_event), daemon=True)
+    server.start()
+    try:
+        base_url = f"http://127.0.0.1:{port_queue.get(timeout=30)}"
+        scraper = context.Process(target=crawl, args=(base_url, options, result_queue))
+        scraper.start()
+        result = wait_for_result(scraper, result_queue, timeout)
+        scraper.join(timeout=5)
+    finally:
+        stop_event.set()
+        server.join(timeout=5)
+    return result
+
+
+def wait_for_result(scraper, result_queue, timeout: float) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return result_queue.get(timeout=1)
+        except queue.Empty:
+            pass
+        if not scraper.is_alive():
+            try:
+                return result_queue.get(timeout=1)  # Put just before the process exited
+            except queue.Empty:
+                return {"error": f"crawl process exited with code {scraper.exitcode} without a result"}
+        if time.monotonic() > deadline:
+            scraper.terminate()
+            return {"error": f"crawl did not finish within {timeout:.0f}s"}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if "error" in result:
+            regressions.append(f"{name}: {result['error']}")
+            continue
+        if not result["pages"] or result["cpu_ms_per_page"] is None:
+            regressions.append(f"{name}: no pages crawled")
+            continue
+        if result["pages_per_s"] < before["pages_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: pages/s {before['pages_per_s']} -> {result['pages_per_s']}")
+        if before.get("cpu_ms_per_page") and result["cpu_ms_per_page"] > before["cpu_ms_per_page"] * (1 + tolerance):
+            regressions.append(f"{name}: CPU ms/page {before['cpu_ms_per_page']} -> {result['cpu_ms_per_page']}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    arg_parser.add_argument("--concurrency", type=int, default=20)
+    arg_parser.add_argument("--adaptive", action="store_true", help="Use adaptive rate control instead of fixed limits")
+    arg_parser.add_argument("--streaming", action="store_true")
+    arg_parser.add_argument("--parse-workers", type=int, default=0)
+    arg_parser.add_argument("--data-routes", action="store_true", help="Fetch Next.js data routes instead of HTML")
+    arg_parser.add_argument("--listing-only", action="store_true", help="Build rows from category hits")
+    arg_parser.add_argument("--metrics", action="store_true", help="Enable stage metrics to measure their overhead")
+    arg_parser.add_argument("--json", help="Write the results to this file")
+    arg_parser.add_argument("--baseline", help="Results file of an earlier run to compare against")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    arg_parser.add_argument("--timeout", type=float, default=600, help="Seconds a scenario may run before it fails")
+    args = arg_parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        arg_parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    options = {
+        "concurrency": args.concurrency,
+        "adaptive": args.adaptive,
+        "streaming": args.streaming,
+        "parse_workers": args.parse_workers,
+        "metrics": args.metrics,
+        "listing_only": args.listing_only,
+        "data_routes": args.data_routes,
+    }
+    results = {}
+    print(
+        f"{'scenario':<16} {'pages':>7} {'pages/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'CPU ms/page':>12} {'peak RSS MB':>12}"
+    )
+    for name in args.scenarios or SCENARIOS:
+        result = results[name] = run_scenario(name, options, args.timeout)
+        if "error" in result:
+            print(f"{name:<16} FAILED: {result['error']}")
+            continue
+        cpu_ms_per_page = "-" if result["cpu_ms_per_page"] is None else result["cpu_ms_per_page"]
+        print(
+            f"{name:<16} {result['pages']:>7} {result['pages_per_s']:>9} {result['p50_ms']:>8} {result['p99_ms']:>8} "
+            f"{cpu_ms_per_page:>12} {result['peak_rss_mb']:>12}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"options": options, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+    if any("error" in result for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
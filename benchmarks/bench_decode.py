@@ -0,0 +1,116 @@
+"""
+Micro-benchmark: schema-targeted decoding (schema.decode_page) vs. json.loads of product and category payloads,
+each followed by the parser's extraction, plus the peak memory allocated while decoding a batch.
+
+Usage:
+    python benchmarks/bench_decode.py [saved_payload.json ...] [--repeat N] [--batch N]
+
+Without arguments synthetic payloads are generated: product pages with related products, reviews and
+attributes the parser never reads, and category pages of 20 and 100 hits. Requires msgspec.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from igefa_scraper.parser import (  # noqa: E402
+    extract_product_details_from_next_data,
+    extract_products_from_next_data,
+)
+from igefa_scraper.schema import decode_page, decode_page_struct, decode_pages  # noqa: E402
+
+
+def synthetic_product(i: int) -> dict:
+    return {
+        "name": f"Seifencreme {i}",
+        "sku": f"SKU-{i}",
+        "skuProvidedBySupplier": f"S{i}",
+        "variationName": "500 ml",
+        "mainVariant": {
+            "id": f"id{i:08d}",
+            "slug": f"seifencreme-{i}",
+            "gtin": "4024009029110",
+            "description": "Zusatz --- " + "Beschreibung " * 40,
+            "images": [{"url": f"https://cdn.example/{i}-{j}.jpg", "width": 800, "height": 800} for j in range(6)],
+            "prices": [{"quantity": q, "net": 1.99 * q, "gross": 2.37 * q} for q in range(1, 6)],
+        },
+        "brand": {"name": "Clean and Clever", "logo": "https://cdn.example/brand.png"},
+        "breadcrumbs": {"hierarchy": [{"slug": s, "name": s.title()} for s in ("hygiene", "seife", "creme")]},
+        "clientFields": {"attributes": [{"label": f"Merkmal {j}", "value": "x" * 30} for j in range(25)]},
+    }
+
+
+def product_page(i: int) -> bytes:
+    page_props = {
+        "product": synthetic_product(i),
+        "relatedProducts": [synthetic_product(i * 100 + j) for j in range(12)],
+        "reviews": [{"author": "Kunde", "rating": 5, "text": "Sehr gut " * 20} for _ in range(10)],
+    }
+    return json.dumps({"props": {"initialProps": {"pageProps": page_props}}, "buildId": "b1"}).encode("utf-8")
+
+
+def category_page(hits: int) -> bytes:
+    product_data = {"hits": [synthetic_product(i) for i in range(hits)], "total": 5000, "hitsPerPage": hits}
+    facets = [{"name": f"facet{j}", "values": [{"value": f"v{k}", "count": k} for k in range(50)]} for j in range(20)]
+    page_props = {"initialProductData": product_data, "facets": facets}
+    return json.dumps({"props": {"initialProps": {"pageProps": page_props}}}).encode("utf-8")
+
+
+def extract(data):
+    pages = data["props"]["initialProps"]["pageProps"]
+    if "product" in pages:
+        return extract_product_details_from_next_data(data)
+    return extract_products_from_next_data(data)
+
+
+def peak_kb(function) -> float:
+    tracemalloc.start()
+    result = function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak / 1024
+
+
+def bench(name: str, payload: bytes, repeat: int, batch: int):
+    assert extract(json.loads(payload)) == extract(decode_page(payload)), "decoders disagree"
+
+    def best(function):
+        return min(timeit.repeat(function, number=batch, repeat=repeat)) / batch * 1000
+
+    generic = best(lambda: extract(json.loads(payload)))
+    schema = best(lambda: extract(decode_page(payload)))
+    struct = best(lambda: decode_page_struct(payload))
+    generic_kb = peak_kb(lambda: [json.loads(payload) for _ in range(batch)])
+    schema_kb = peak_kb(lambda: decode_pages([payload] * batch))
+    print(
+        f"{name:<24} {len(payload) / 1024:>7.0f} KB  json {generic:>7.3f} ms  schema {schema:>7.3f} ms  "
+        f"x{generic / schema:>5.1f}  struct only {struct:>7.3f} ms  "
+        f"peak/{batch}: {generic_kb:>8.0f} KB -> {schema_kb:>7.0f} KB"
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("payloads", nargs="*", help="Saved __NEXT_DATA__ or data route payloads")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--batch", type=int, default=50, help="Payloads per timing and memory measurement")
+    args = arg_parser.parse_args()
+
+    if args.payloads:
+        for path in args.payloads:
+            with open(path, "rb") as f:
+                bench(os.path.basename(path), f.read(), args.repeat, args.batch)
+    else:
+        bench("product page", product_page(1), args.repeat, args.batch)
+        bench("category page, 20 hits", category_page(20), args.repeat, args.batch)
+        bench("category page, 100 hits", category_page(100), args.repeat, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark: fast byte-slicing __NEXT_DATA__ extraction vs. the BeautifulSoup path.
+
+Usage:
+    python benchmarks/bench_next_data.py [saved_page.html ...] [--repeat N]
+
+Without arguments a set of synthetic pages of increasing size is generated.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from igefa_scraper.extractor import find_next_data, find_next_data_soup  # noqa: E402
+
+
+def synthetic_page(n_hits: int, markup_kb: int) -> bytes:
+    hits = [
+        {
+            "mainVariant": {
+                "id": f"id{i:08d}",
+                "slug": f"product-{i}",
+                "description": "Beschreibung " * 20,
+                "images": [{"url": f"https://cdn.example/{i}.jpg"}],
+            },
+            "attributes": [{"label": f"attr{j}", "value": "x" * 30} for j in range(10)],
+        }
+        for i in range(n_hits)
+    ]
+    data = {"props": {"initialProps": {"pageProps": {"initialProductData": {"hits": hits, "total": n_hits}}}}}
+    markup = "<div class='LYSTypography'><span>Kategorie</span><a href='/c/x'>link</a></div>" * (markup_kb * 12)
+    return (
+        f"<!DOCTYPE html><html><head><title>igefa</title></head><body>{markup}"
+        f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+        "</body></html>"
+    ).encode("utf-8")
+
+
+def bench(name: str, body: bytes, repeat: int):
+    fast = min(timeit.repeat(lambda: json.loads(find_next_data(body)), number=1, repeat=repeat))
+    soup = min(timeit.repeat(lambda: json.loads(find_next_data_soup(body)), number=1, repeat=repeat))
+    print(
+        f"{name:<40} {len(body) / 1024:>9.0f} KB  fast {fast * 1000:>8.2f} ms  soup {soup * 1000:>8.2f} ms  "
+        f"x{soup / fast:>6.1f}"
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("pages", nargs="*", help="Saved HTML pages to benchmark")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    if args.pages:
+        for path in args.pages:
+            with open(path, "rb") as f:
+                bench(os.path.basename(path), f.read(), args.repeat)
+    else:
+        for n_hits, markup_kb in [(20, 100), (100, 500), (500, 2000)]:
+            bench(f"synthetic hits={n_hits} markup={markup_kb}KB", synthetic_page(n_hits, markup_kb), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .constants import (
+    CIRCUIT_ERROR_RATE,
+    CIRCUIT_MAX_OPEN_SECONDS,
+    CIRCUIT_MIN_REQUESTS,
+    CIRCUIT_OPEN_SECONDS,
+    CIRCUIT_WINDOW,
+)
+from .logger import main_logger as logger
+
+
+class CircuitOpenError(Exception):
+    """
+    A request was rejected without being sent because the circuit of its endpoint is open.
+    """
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}, retrying in {retry_in:.0f}s.")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class State(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def endpoint_of(url: str) -> str:
+    """
+    Groups URLs by the kind of page they request, e.g. store.igefa.de/p for product pages
+    and store.igefa.de/_next/data for data routes.
+    """
+    parts = urlsplit(url)
+    path = parts.path
+    if path.startswith("/_next/data/"):
+        kind = "/_next/data"
+    elif path.startswith("/p/"):
+        kind = "/p"
+    elif path.startswith("/c/"):
+        kind = "/c"
+    else:
+        kind = "/"
+    return parts.netloc + kind
+
+
+def is_failure(error: Optional[BaseException]) -> bool:
+    """
+    True for errors that say the endpoint is struggling: 429, 5xx, timeouts and connection errors.
+    A 404 or a parse error is the page's problem, not the endpoint's.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError))
+
+
+class Circuit:
+    __slots__ = ("outcomes", "failures", "state", "retry_at", "open_for", "probing")
+
+    def __init__(self, window: int, open_for: float):
+        self.outcomes: deque = deque(maxlen=window)
+        self.failures = 0
+        self.state = State.CLOSED
+        self.retry_at = 0.0
+        self.open_for = open_for
+        self.probing = False
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    Each endpoint keeps the outcomes of its last `window` requests. Once at least min_requests of them are known
+    and the share of failures reaches error_rate, the circuit opens: requests to the endpoint fail immediately
+    with CircuitOpenError for open_seconds, so workers move on to other work instead of waiting on retries.
+    Then a single probe request is let through (half-open). If it succeeds the circuit closes,
+    otherwise it opens again for twice as long, up to max_open_seconds.
+    """
+
+    def __init__(
+        self,
+        window: int = CIRCUIT_WINDOW,
+        min_requests: int = CIRCUIT_MIN_REQUESTS,
+        error_rate: float = CIRCUIT_ERROR_RATE,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        max_open_seconds: float = CIRCUIT_MAX_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.clock = clock
+        self.circuits: Dict[str, Circuit] = {}
+        self.rejected = 0
+
+    def _circuit(self, endpoint: str) -> Circuit:
+        circuit = self.circuits.get(endpoint)
+        if circuit is None:
+            circuit = self.circuits[endpoint] = Circuit(self.window, self.open_seconds)
+        return circuit
+
+    def check(self, url: str) -> str:
+        """
+        Admits a request to a URL, turning an open circuit whose pause is over into a half-open one with this
+        request as its probe.
+        Returns:
+            str: The endpoint to report the outcome to with record().
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its probe still in flight.
+        """
+        endpoint = endpoint_of(url)
+        circuit = self._circuit(endpoint)
+        if circuit.state == State.CLOSED:
+            return endpoint
+        now = self.clock()
+        if circuit.state == State.OPEN and now >= circuit.retry_at:
+            circuit.state = State.HALF_OPEN
+        if circuit.state == State.HALF_OPEN and not circuit.probing:
+            circuit.probing = True
+            logger.info(f"Circuit breaker: probing {endpoint}.")
+            return endpoint
+        self.rejected += 1
+        raise CircuitOpenError(endpoint, max(0.0, circuit.retry_at - now))
+
+    def record(self, endpoint: str, failed: Optional[bool]):
+        """
+        Reports the outcome of an admitted request. None, e.g. for a cancelled request, only ends a probe.
+        """
+        circuit = self._circuit(endpoint)
+        if circuit.state == State.HALF_OPEN and circuit.probing:
+            circuit.probing = False
+            if failed:
+                self._open(endpoint, circuit, min(circuit.open_for * 2, self.max_open_seconds), "the probe failed")
+            elif failed is False:
+                circuit.state = State.CLOSED
+                circuit.outcomes.clear()
+                circuit.failures = 0
+                circuit.open_for = self.open_seconds
+                logger.info(f"Circuit breaker: {endpoint} recovered. Closing its circuit.")
+            return
+        if circuit.state != State.CLOSED or failed is None:
+            return  # Requests that were in flight when the circuit opened
+
+        if len(circuit.outcomes) == circuit.outcomes.maxlen:
+            circuit.failures -= circuit.outcomes[0]
+        circuit.outcomes.append(failed)
+        circuit.failures += failed
+        if len(circuit.outcomes) >= self.min_requests and circuit.failures >= self.error_rate * len(circuit.outcomes):
+            reason = f"{circuit.failures} of the last {len(circuit.outcomes)} requests failed"
+            self._open(endpoint, circuit, circuit.open_for, reason)
+
+    def _open(self, endpoint: str, circuit: Circuit, open_for: float, reason: str):
+        circuit.state = State.OPEN
+        circuit.open_for = open_for
+        circuit.retry_at = self.clock() + open_for
+        logger.warning(f"Circuit breaker: {reason} at {endpoint}. Pausing it for {open_for:.0f}s.")
+
+    def open_circuits(self) -> int:
+        return sum(circuit.state != State.CLOSED for circuit in self.circuits.values())
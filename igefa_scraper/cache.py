@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from .constants import CACHE_SIZE
+from .logger import main_logger as logger
+from .utils import resolve_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+class ResponseCache:
+    """
+    Disk-backed HTTP response cache for conditional requests.
+
+    Bodies are stored with their ETag and Last-Modified validators. The next request for the same URL
+    sends If-None-Match / If-Modified-Since, and a 304 answer is served from the cache.
+    Least recently used entries are evicted once the stored bodies exceed max_bytes.
+    Methods are blocking; IgefaScraper calls them through asyncio.to_thread.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = CACHE_SIZE):
+        self.directory = resolve_path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self.conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> "ResponseCache":
+        os.makedirs(self.directory, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(self.directory, "responses.sqlite3"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            logger.info(f"Response cache: {self.stats()}")
+
+    def __enter__(self) -> "ResponseCache":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Returns the If-None-Match / If-Modified-Since headers for a cached URL, or {} if it is not cached.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        Returns the cached body after a 304 answer and counts the hit, or None if the entry is gone.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT body FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            body = row[0]
+            self.hits += 1
+            self.bytes_saved += len(body)
+        return body
+
+    def put(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        """
+        Stores a full response. Responses without validators cannot be revalidated and are not stored.
+        """
+        with self._lock:
+            self.misses += 1
+        if not etag and not last_modified:
+            return
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            with self.conn:
+                row = self.conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, body, size, time.time()),
+                )
+                self.total_bytes += size - (row[0] if row else 0)
+                self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute("SELECT url, size FROM responses ORDER BY last_access LIMIT 100").fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            for url, size in rows:
+                self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self.total_bytes -= size
+                self.evictions += 1
+                if self.total_bytes <= self.max_bytes:
+                    return
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+            "evictions": self.evictions,
+            "bytes_stored": self.total_bytes,
+        }
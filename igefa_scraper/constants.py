@@ -4,3 +4,94 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; IgefaScraper/1.0; +https://yourwebsite.com)",
     "Accept-Language": "de-DE,de;q=0.9",
 }
+
+# Streaming pipeline defaults
+DEFAULT_WORKERS = 10  # Number of concurrent product workers
+DEFAULT_QUEUE_SIZE = 1000  # Maximum number of pending items between pipeline stages
+
+# Intermediate writer defaults
+WRITER_BATCH_SIZE = 100  # Records per write
+WRITER_FLUSH_INTERVAL = 1.0  # Maximum seconds a record waits before being written
+
+# Product store defaults
+INTERMEDIATE_STORE = "intermediate_data"  # Directory holding the product store segments
+LEGACY_INTERMEDIATE_FILE = "intermediate_data.jsonl"  # Imported into an empty store on first run
+SEGMENT_SIZE = 64 * 1024 * 1024  # Uncompressed bytes after which the active segment is sealed
+
+# Crawl frontier
+FRONTIER_FILE = "frontier.sqlite3"  # SQLite database recording discovery and scraping progress
+
+# Response cache
+CACHE_SIZE = 1024 * 1024 * 1024  # Maximum bytes of cached response bodies
+
+# Delta crawl
+DELTA_FILE = "delta.sqlite3"  # SQLite database with listing and content fingerprints per product
+
+# Adaptive rate control
+INITIAL_CONCURRENCY = 10  # Concurrent requests at start
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 50
+INITIAL_RATE = 8.0  # Requests per second at start
+MIN_RATE = 0.5
+MAX_RATE = 50.0
+
+# Export
+COLUMNS_ORDER = [
+    "Product Name",
+    "Original Data Column 1 (Breadcrumb)",
+    "Original Data Column 2 (Ausführung)",
+    "Supplier Article Number",
+    "EAN/GTIN",
+    "Article Number",
+    "Product Description",
+    "Supplier",
+    "Supplier-URL",
+    "Product Image URL",
+    "Manufacturer",
+    "Original Data Column 3 (Add. Description)",
+]
+EXPORT_CHUNK_SIZE = 10000  # Records held in memory at a time while exporting
+
+# Metrics
+METRICS_FILE = "metrics.json"  # Periodic JSON snapshot of the stage timings and counters
+METRICS_INTERVAL = 10.0  # Seconds between snapshots
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Listing-only mode: rows built from category hits are only complete with these columns filled,
+# otherwise the product page is fetched
+LISTING_REQUIRED_FIELDS = (
+    "Product Name",
+    "Supplier Article Number",
+    "EAN/GTIN",
+    "Product Image URL",
+)
+
+# Next.js data routes
+DATA_ROUTE_MAX_FAILURES = 5  # Consecutive data route failures under one build id before falling back to HTML for good
+
+# HTTP transport
+HTTP_TOTAL_TIMEOUT = 60.0  # Seconds for a whole request, including reading the body
+HTTP_CONNECT_TIMEOUT = 10.0  # Seconds to get a connection, from the pool or newly opened
+HTTP_READ_TIMEOUT = 20.0  # Seconds a response may stall between two reads
+KEEPALIVE_TIMEOUT = 30.0  # Seconds an idle connection is kept open for reuse
+DNS_CACHE_TTL = 300  # Seconds a resolved host name is cached
+MAX_BODY_SIZE = 32 * 1024 * 1024  # Responses larger than this are aborted
+READ_CHUNK_SIZE = 64 * 1024  # Bytes per read of a response body
+
+# Logging
+LOG_FILE = "scraper.log"
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+LOG_SAMPLE_EVERY = 100  # Log one in this many routine per-URL events; the rest only count towards progress lines
+PROGRESS_INTERVAL = 10.0  # Seconds between progress lines summarising the per-URL events
+
+# Failure handling
+FETCH_ATTEMPTS = 2  # Attempts per request before the URL goes to the dead-letter queue
+FETCH_RETRY_WAIT_MIN = 1.0  # Seconds before the first retry, doubling up to FETCH_RETRY_WAIT_MAX
+FETCH_RETRY_WAIT_MAX = 4.0
+DEAD_LETTER_FILE = "dead_letters.sqlite3"  # SQLite database of failed URLs with the reason, kept across crawls
+DEAD_LETTER_MAX_ATTEMPTS = 5  # Failed URLs are retried automatically until they have failed this often
+CIRCUIT_WINDOW = 20  # Recent requests per endpoint the error rate is computed over
+CIRCUIT_MIN_REQUESTS = 10  # Requests in the window before the breaker can open
+CIRCUIT_ERROR_RATE = 0.5  # Share of failed requests that opens the breaker
+CIRCUIT_OPEN_SECONDS = 30.0  # Pause before a probe request; doubles after every failed probe
+CIRCUIT_MAX_OPEN_SECONDS = 300.0
@@ -0,0 +1,164 @@
+import sqlite3
+import threading
+import time
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .constants import DEAD_LETTER_FILE
+from .logger import main_logger as logger
+from .utils import resolve_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_letters (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    category_url TEXT,
+    page INTEGER,
+    reason TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    first_failed REAL,
+    last_failed REAL
+);
+"""
+
+ADD = (
+    "INSERT INTO dead_letters (url, kind, category_url, page, reason, attempts, first_failed, last_failed) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (url) DO UPDATE SET reason = excluded.reason, attempts = attempts + excluded.attempts, "
+    "last_failed = excluded.last_failed"
+)
+REMOVE = "DELETE FROM dead_letters WHERE url = ?"
+
+
+class Kind(str, Enum):
+    PRODUCT = "product"
+    CATEGORY_PAGE = "category_page"
+
+
+class DeadLetter(NamedTuple):
+    url: str
+    kind: Kind
+    category_url: Optional[str]
+    page: Optional[int]
+    reason: str
+    attempts: int
+
+
+class DeadLetterQueue:
+    """
+    Persistent list of the product and category page URLs that failed, with the reason of their last failure.
+
+    An entry stays until its URL succeeds, across runs and crawls, so a failure is never just a log line.
+    IgefaScraper retries the entries in a deferred pass at the end of a run, or on demand with --retry-failed.
+    Without a filename the queue lives in memory for the current run only.
+
+    add() and remove() only buffer the change; flush() writes the buffer in one transaction. IgefaScraper
+    flushes from the writer thread once per batch, and reads and close() flush first.
+    """
+
+    def __init__(self, filename: Optional[str] = DEAD_LETTER_FILE):
+        self.filepath = resolve_path(filename) if filename else ":memory:"
+        self.conn: Optional[sqlite3.Connection] = None
+        self._urls: Set[str] = set()  # Lets remove() skip the database for URLs that never failed
+        self._lock = threading.RLock()  # Shared by the event loop and the writer thread
+        self._changes_lock = threading.Lock()
+        self._changes: List[Tuple[str, tuple]] = []
+
+    def open(self) -> "DeadLetterQueue":
+        self.conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._urls = {row[0] for row in self.conn.execute("SELECT url FROM dead_letters")}
+        if self._urls:
+            logger.info(f"Dead-letter queue: {len(self._urls)} failed URLs from earlier runs.")
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self) -> "DeadLetterQueue":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def add(
+        self,
+        url: str,
+        reason: str,
+        kind: Kind = Kind.PRODUCT,
+        category_url: Optional[str] = None,
+        page: Optional[int] = None,
+        attempted: bool = True,
+    ):
+        """
+        Records a failure of a URL.
+        Args:
+            url (str): Product URL or category page URL.
+            reason (str): Why it failed, e.g. "HTTP 503".
+            kind (Kind): What the URL is.
+            category_url (Optional[str]): Category of a category page.
+            page (Optional[int]): Page number of a category page.
+            attempted (bool): False if the request was never sent, e.g. because a circuit breaker was open;
+                such failures do not count towards DEAD_LETTER_MAX_ATTEMPTS.
+        """
+        now = time.time()
+        with self._changes_lock:
+            self._changes.append((ADD, (url, kind, category_url, page, reason, int(attempted), now, now)))
+        self._urls.add(url)
+
+    def remove(self, url: str) -> bool:
+        """
+        Drops the entry of a URL that succeeded. Returns True if there was one.
+        """
+        if url not in self._urls:
+            return False
+        with self._changes_lock:
+            self._changes.append((REMOVE, (url,)))
+        self._urls.discard(url)
+        return True
+
+    def flush(self):
+        """
+        Writes the buffered additions and removals in one transaction, in the order they were made.
+        """
+        with self._changes_lock:
+            changes, self._changes = self._changes, []
+        if not changes:
+            return
+        with self._lock, self.conn:
+            for statement, parameters in changes:
+                self.conn.execute(statement, parameters)
+
+    def entries(self, max_attempts: Optional[int] = None) -> List[DeadLetter]:
+        """
+        Returns the entries, oldest failure first.
+        Args:
+            max_attempts (Optional[int]): Only entries that failed fewer times than this; None returns all.
+        """
+        with self._lock:
+            self.flush()
+            rows = self.conn.execute(
+                "SELECT url, kind, category_url, page, reason, attempts FROM dead_letters "
+                "WHERE ? IS NULL OR attempts < ? ORDER BY first_failed",
+                (max_attempts, max_attempts),
+            ).fetchall()
+        return [DeadLetter(url, Kind(kind), *rest) for url, kind, *rest in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self.flush()
+            rows = self.conn.execute(
+                "SELECT reason, COUNT(*) FROM dead_letters GROUP BY reason ORDER BY COUNT(*) DESC"
+            ).fetchall()
+        return {reason: count for reason, count in rows}
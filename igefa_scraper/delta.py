@@ -0,0 +1,150 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .constants import DELTA_FILE
+from .logger import main_logger as logger
+from .utils import resolve_path
+
+# Fields of a category hit that change whenever the product changes, if the listing provides them
+CHANGE_MARKERS = ("updatedAt", "updated_at", "modifiedAt", "lastModified", "version")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    url TEXT PRIMARY KEY,
+    listing_hash TEXT,
+    scraped_listing_hash TEXT,
+    content_hash TEXT,
+    changed INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS products_changed ON products (changed);
+"""
+
+
+def fingerprint(data) -> str:
+    """
+    Returns a short stable hash of JSON-serialisable data.
+    """
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def listing_fingerprint(hit: dict, record: Optional[Dict] = None) -> str:
+    """
+    Fingerprints a category hit: its change markers when the listing has any, otherwise the row built from it
+    (or the whole hit without a row). The row only depends on fields that schema decoding keeps,
+    so the fingerprint does not change with the decoder.
+    """
+    markers = {}
+    for source in (hit, hit.get("mainVariant") or {}):
+        for key in CHANGE_MARKERS:
+            if source.get(key) is not None:
+                markers[key] = source[key]
+    return fingerprint(markers or record or hit)
+
+
+class DeltaTracker:
+    """
+    Tracks listing and content fingerprints per product for delta crawls.
+
+    A product page is only scraped when its category listing entry is new or changed since the last scrape.
+    Products whose extracted details differ from the previous scrape are flagged as changed
+    until the changes have been exported. IgefaScraper records scraped products with record_many()
+    from the writer thread, once per written batch.
+    """
+
+    def __init__(self, filename: str = DELTA_FILE):
+        self.filepath = resolve_path(filename)
+        self.conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()  # Shared by the event loop and the writer thread
+
+    def open(self) -> "DeltaTracker":
+        self.conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self) -> "DeltaTracker":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def select(self, listing: Dict[str, str]) -> List[str]:
+        """
+        Records the listing fingerprints seen on a category page.
+        Args:
+            listing (Dict[str, str]): Product URL -> listing fingerprint.
+        Returns:
+            List[str]: URLs of the products that are new or whose listing changed since they were last scraped.
+        """
+        now = time.time()
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO products (url, listing_hash, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (url) DO UPDATE SET listing_hash = excluded.listing_hash, "
+                    "updated_at = excluded.updated_at",
+                    [(url, listing_hash, now) for url, listing_hash in listing.items()],
+                )
+            return [url for url in listing if self.needs_scrape(url)]
+
+    def needs_scrape(self, url: str) -> bool:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT listing_hash, scraped_listing_hash FROM products WHERE url = ?", (url,)
+            ).fetchone()
+        return row is None or row[1] is None or row[0] != row[1]
+
+    def record(self, url: str, product_data: Dict) -> bool:
+        """
+        Records a scraped product. Returns True if its content is new or changed.
+        """
+        content_hash = fingerprint(product_data)
+        with self._lock:
+            row = self.conn.execute("SELECT content_hash FROM products WHERE url = ?", (url,)).fetchone()
+            self.record_many([(url, product_data)], [content_hash])
+        return row is None or row[0] != content_hash
+
+    def record_many(self, products: Iterable[Tuple[str, Dict]], content_hashes: Optional[List[str]] = None):
+        """
+        Records a batch of scraped products in one transaction. A product is flagged as changed when it is new
+        or its content hash differs from the stored one.
+        Args:
+            products (Iterable[Tuple[str, Dict]]): (URL, product details) pairs.
+            content_hashes (Optional[List[str]]): Fingerprints of the details, if already computed.
+        """
+        now = time.time()
+        products = list(products)
+        content_hashes = content_hashes or [fingerprint(product_data) for _, product_data in products]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO products (url, scraped_listing_hash, content_hash, changed, updated_at) "
+                "VALUES (?, NULL, ?, 1, ?) "
+                "ON CONFLICT (url) DO UPDATE SET scraped_listing_hash = listing_hash, "
+                "changed = MAX(changed, content_hash IS NOT excluded.content_hash), "
+                "content_hash = excluded.content_hash, updated_at = excluded.updated_at",
+                [(url, content_hash, now) for (url, _), content_hash in zip(products, content_hashes)],
+            )
+
+    def changed_urls(self) -> Set[str]:
+        with self._lock:
+            return {row[0] for row in self.conn.execute("SELECT url FROM products WHERE changed = 1")}
+
+    def clear_changes(self):
+        """
+        Clears the changed flags once the changes have been exported.
+        """
+        with self._lock, self.conn:
+            cursor = self.conn.execute("UPDATE products SET changed = 0 WHERE changed = 1")
+        logger.info(f"Delta: cleared {cursor.rowcount} exported changes.")
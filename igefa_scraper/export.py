@@ -0,0 +1,154 @@
+import csv
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from .constants import COLUMNS_ORDER, EXPORT_CHUNK_SIZE
+from .delta import DeltaTracker
+from .logger import main_logger as logger
+from .idset import ProductIdSet
+from .store import ProductStore
+from .utils import resolve_path
+
+FORMATS = ("csv", "parquet")
+
+
+def dedup_records(records: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Yields each product once, keeping its first record. Only 64-bit fingerprints are kept in memory.
+    Records without a Supplier-URL cannot be told apart and are all passed through.
+    """
+    seen = ProductIdSet()
+    for data in records:
+        url = data.get("Supplier-URL")
+        if not url or seen.add(url):
+            yield data
+
+
+def _chunks(records: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for data in records:
+        chunk.append(data)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_csv(chunks: Iterable[List[Dict]], output_path: str) -> int:
+    count = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS_ORDER, extrasaction="ignore", lineterminator=os.linesep)
+        writer.writeheader()
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def _write_parquet(chunks: Iterable[List[Dict]], output_path: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow: poetry install --extras parquet") from e
+
+    schema = pa.schema([(column, pa.string()) for column in COLUMNS_ORDER])
+    count = 0
+    with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            columns = {column: [_to_str(data.get(column)) for data in chunk] for column in COLUMNS_ORDER}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def _to_str(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def export_records(
+    records: Iterable[Dict],
+    output_file: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    keep_empty: bool = False,
+) -> int:
+    """
+    Writes records to CSV or Parquet chunk by chunk with the COLUMNS_ORDER schema, deduplicated by product.
+    Args:
+        records (Iterable[Dict]): Product records.
+        output_file (str): File to write.
+        fmt (Optional[str]): "csv" or "parquet". Taken from the file extension if omitted.
+        chunk_size (int): Records held in memory at a time.
+        keep_empty (bool): Write a file with only the header instead of no file when there are no records.
+    Returns:
+        int: Number of rows written.
+    """
+    fmt = fmt or os.path.splitext(output_file)[1].lstrip(".").lower() or "csv"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Expected one of {FORMATS}.")
+
+    output_path = resolve_path(output_file)
+    tmp_path = output_path + ".tmp"
+    chunks = _chunks(dedup_records(records), chunk_size)
+    try:
+        count = _write_csv(chunks, tmp_path) if fmt == "csv" else _write_parquet(chunks, tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if not count and not keep_empty:
+        os.remove(tmp_path)
+        logger.info(f"No data to export. {output_path} will not be created.")
+        return 0
+    os.replace(tmp_path, output_path)
+    logger.info(f"Exported {count} products to {output_path}.")
+    return count
+
+
+def export_store(
+    intermediate_file: str,
+    output_file: str,
+    fmt: Optional[str] = None,
+    product_urls: Optional[Set[str]] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    keep_empty: bool = False,
+) -> int:
+    """
+    Streams the latest record of every product in the product store to CSV or Parquet.
+    Args:
+        intermediate_file (str): Product store directory.
+        output_file (str): File to write.
+        fmt (Optional[str]): "csv" or "parquet". Taken from the file extension if omitted.
+        product_urls (Optional[Set[str]]): Only export these products, e.g. the changes of a delta crawl.
+        chunk_size (int): Records held in memory at a time.
+        keep_empty (bool): Write a file with only the header instead of no file when there are no records.
+    Returns:
+        int: Number of rows written.
+    """
+    if product_urls is not None and not product_urls:
+        return export_records([], output_file, fmt, chunk_size, keep_empty)
+
+    with ProductStore(intermediate_file) as store:
+        records = store.iter_records()
+        if product_urls is not None:
+            records = (data for data in records if data.get("Supplier-URL") in product_urls)
+        return export_records(records, output_file, fmt, chunk_size, keep_empty)
+
+
+def export_changes(intermediate_file: str, delta_file: str, output_file: str) -> int:
+    """
+    Exports the products a delta crawl found new or changed to CSV and clears them from the delta tracker.
+    The file is always rewritten, with only the header if nothing changed, so a previous run's changes
+    are never picked up again.
+    Returns:
+        int: Number of rows written.
+    """
+    with DeltaTracker(delta_file) as delta:
+        changed_urls = delta.changed_urls()
+        logger.info(f"Delta crawl: {len(changed_urls)} new or changed products. Creating changes CSV...")
+        count = export_store(intermediate_file, output_file, fmt="csv", product_urls=changed_urls, keep_empty=True)
+        delta.clear_changes()
+    return count
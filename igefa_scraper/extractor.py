@@ -0,0 +1,179 @@
+import json
+import re
+from typing import Any, Callable, Dict, Optional, Union
+from urllib.parse import urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+
+from .logger import main_logger as logger
+from .metrics import timed
+
+# Next.js always renders the payload as <script id="__NEXT_DATA__" type="application/json">...</script>
+# and escapes '<' inside the JSON, so the first '</script>' after the opening tag closes it.
+NEXT_DATA_MARKERS = (b'id="__NEXT_DATA__"', b"id='__NEXT_DATA__'")
+SCRIPT_OPEN = b"<script"
+SCRIPT_CLOSE = b"</script>"
+BUILD_ID_PATTERN = re.compile(rb'"buildId"\s*:\s*"([^"\\]+)"')
+
+
+def find_next_data(body: Union[bytes, str]) -> Optional[bytes]:
+    """
+    Slices the raw JSON payload of <script id="__NEXT_DATA__"> out of a page without parsing the HTML.
+    Args:
+        body (Union[bytes, str]): Raw response body.
+    Returns:
+        Optional[bytes]: The JSON payload, or None if the script tag cannot be located.
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+
+    for marker in NEXT_DATA_MARKERS:
+        marker_pos = body.find(marker)
+        while marker_pos != -1:
+            tag_start = _script_tag_start(body, marker_pos)
+            if tag_start == -1:
+                marker_pos = body.find(marker, marker_pos + len(marker))
+                continue
+
+            payload_start = body.find(b">", marker_pos)
+            if payload_start == -1:
+                return None
+            payload_end = body.find(SCRIPT_CLOSE, payload_start)
+            if payload_end == -1:
+                return None
+
+            payload = body[payload_start + 1 : payload_end].strip()
+            return payload or None
+    return None
+
+
+def _script_tag_start(body: bytes, marker_pos: int) -> int:
+    """
+    Returns the offset of the opening <script> tag the marker is an attribute of,
+    or -1 if the marker is plain text, e.g. a string inside an earlier inline script.
+    """
+    tag_start = body.rfind(SCRIPT_OPEN, 0, marker_pos)
+    if tag_start == -1 or body.find(b">", tag_start, marker_pos) != -1:
+        return -1
+
+    # A '<script' that is itself inside the text of a still open script is not a tag
+    previous_open = body.rfind(SCRIPT_OPEN, 0, tag_start)
+    if previous_open != -1 and body.find(SCRIPT_CLOSE, previous_open, tag_start) == -1:
+        return -1
+    return tag_start
+
+
+def find_next_data_soup(body: Union[bytes, str], url: str = "") -> Optional[str]:
+    """
+    Locates the <script id="__NEXT_DATA__"> payload by building a full BeautifulSoup tree.
+    Args:
+        body (Union[bytes, str]): Raw response body.
+        url (str): Page URL, used for log messages only.
+    Returns:
+        Optional[str]: The JSON payload, or None if the script tag is missing or empty.
+    """
+    soup = BeautifulSoup(body, "lxml")
+    next_data_script = soup.find("script", id="__NEXT_DATA__")
+    if not next_data_script:
+        logger.warning(f"Cannot find <script id='__NEXT_DATA__'> on page {url}.")
+        return None
+
+    next_data_json = next_data_script.string
+    if not next_data_json:
+        logger.warning(f"<script id='__NEXT_DATA__'> is empty on page {url}.")
+        return None
+    return next_data_json
+
+
+def find_build_id(body: Union[bytes, str]) -> Optional[str]:
+    """
+    Returns the Next.js build id of a server-rendered page, read from its __NEXT_DATA__ without decoding it.
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    match = BUILD_ID_PATTERN.search(body)
+    return match.group(1).decode("utf-8") if match else None
+
+
+def data_route_url(url: str, build_id: str) -> str:
+    """
+    Maps a page URL to its Next.js data route,
+    e.g. https://host/c/seife?page=2 -> https://host/_next/data/<build id>/c/seife.json?page=2.
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/") or "/index"
+    return urlunsplit((parts.scheme, parts.netloc, f"/_next/data/{build_id}{path}.json", parts.query, ""))
+
+
+def load_data_route(
+    body: Union[bytes, str], url: str = "", decode: Callable[[Union[bytes, str]], Any] = json.loads
+) -> Optional[dict]:
+    """
+    Decodes a Next.js data route response ({"pageProps": ...}) into the layout of __NEXT_DATA__.
+    Args:
+        body (Union[bytes, str]): Raw response body.
+        url (str): Page URL, used for log messages only.
+        decode (Callable[[Union[bytes, str]], Any]): JSON decoder, e.g. schema.decode_page.
+    Returns:
+        Optional[dict]: The data, or None if the response is not valid page data, e.g. a redirect or notFound.
+    """
+    try:
+        payload = decode(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.debug(f"Invalid data route response for {url}: {e}")
+        return None
+    page_props = payload.get("pageProps") if isinstance(payload, dict) else None
+    if not isinstance(page_props, dict) or "__N_REDIRECT" in page_props:
+        logger.debug(f"Data route response for {url} has no page props.")
+        return None
+    return {"props": {"initialProps": {"pageProps": page_props}, "pageProps": page_props}}
+
+
+def is_data_route_response(body: Union[bytes, str]) -> bool:
+    start = body.lstrip()[:1]
+    return start in (b"{", "{")
+
+
+def load_next_data(
+    body: Union[bytes, str],
+    url: str = "",
+    timings: Optional[Dict[str, float]] = None,
+    decode: Callable[[Union[bytes, str]], Any] = json.loads,
+) -> Optional[dict]:
+    """
+    Extracts and decodes the __NEXT_DATA__ JSON of a page.
+    Tries the byte-slicing fast path first and only falls back to BeautifulSoup when it fails.
+    Args:
+        body (Union[bytes, str]): Raw response body.
+        url (str): Page URL, used for log messages only.
+        timings (Optional[Dict[str, float]]): Receives the seconds spent in the "locate", "json_decode"
+            and "soup" stages, if given.
+        decode (Callable[[Union[bytes, str]], Any]): JSON decoder, e.g. schema.decode_page to skip
+            the parts of the payload the parsers do not read.
+    Returns:
+        Optional[dict]: Decoded JSON data, or None if the payload cannot be found.
+    Raises:
+        json.JSONDecodeError: If the payload found by the soup fallback is not valid JSON.
+    """
+    if is_data_route_response(body):
+        # A JSON data route response is the payload itself
+        with timed(timings, "json_decode"):
+            return load_data_route(body, url, decode)
+
+    with timed(timings, "locate"):
+        payload = find_next_data(body)
+    if payload is not None:
+        try:
+            with timed(timings, "json_decode"):
+                return decode(payload)
+        except json.JSONDecodeError as e:
+            logger.debug(f"Fast __NEXT_DATA__ extraction failed on page {url}: {e}. Falling back to soup.")
+    else:
+        logger.debug(f"Fast __NEXT_DATA__ extraction found no payload on page {url}. Falling back to soup.")
+
+    with timed(timings, "soup"):
+        next_data_json = find_next_data_soup(body, url)
+    if next_data_json is None:
+        return None
+    with timed(timings, "json_decode"):
+        return decode(next_data_json)
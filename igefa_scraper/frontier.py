@@ -0,0 +1,317 @@
+import sqlite3
+import threading
+import time
+from enum import Enum
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+from .constants import FRONTIER_FILE
+from .logger import main_logger as logger
+from .utils import resolve_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS categories (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER,
+    page_size INTEGER,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    category_url TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated_at REAL,
+    PRIMARY KEY (category_url, page)
+);
+CREATE TABLE IF NOT EXISTS products (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS products_status ON products (status);
+"""
+
+
+class Status(str, Enum):
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Frontier:
+    """
+    Persistent crawl frontier in SQLite (WAL mode).
+
+    Records the categories, category pages and product URLs of the current crawl with their status,
+    so an interrupted run continues where it stopped instead of repeating discovery.
+    Once every category has been discovered the crawl is marked complete, and the next run starts a fresh one.
+
+    Product status changes are buffered in memory and written by flush_products(), which IgefaScraper calls
+    from the writer thread once per batch, so scraping a product costs no SQLite commit on the event loop.
+    Reads of the products table flush first. Updates lost in a crash leave their products pending.
+    """
+
+    def __init__(self, filename: str = FRONTIER_FILE):
+        self.filepath = resolve_path(filename)
+        self.conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()  # The writer thread flushes product updates while the event loop reads
+        self._updates_lock = threading.Lock()
+        self._product_updates: List[Tuple[str, Status, int, Optional[str], float]] = []
+
+    def open(self) -> "Frontier":
+        self.conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        if self._get_meta("complete") == "1":
+            logger.info("Previous crawl is complete. Starting a new crawl frontier.")
+            self.reset()
+        else:
+            # Whatever was in flight when the previous run stopped has to be done again
+            with self.conn:
+                self.conn.execute("UPDATE pages SET status = ? WHERE status = ?", (Status.PENDING, Status.IN_FLIGHT))
+                self.conn.execute("UPDATE products SET status = ? WHERE status = ?", (Status.PENDING, Status.IN_FLIGHT))
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.flush_products()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self) -> "Frontier":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def reset(self):
+        with self._lock, self.conn:
+            for table in ("meta", "categories", "pages", "products"):
+                self.conn.execute(f"DELETE FROM {table}")
+
+    # ------------------------------------------------------------------ categories
+
+    def categories(self) -> Optional[List[str]]:
+        """
+        Returns the category URLs of the current crawl, or None if they have not been discovered yet.
+        """
+        with self._lock:
+            if self._get_meta("categories_discovered") != "1":
+                return None
+            return [row[0] for row in self.conn.execute("SELECT url FROM categories ORDER BY rowid")]
+
+    def add_categories(self, urls: Iterable[str]):
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO categories (url, status, updated_at) VALUES (?, ?, ?)",
+                [(url, Status.PENDING, now) for url in urls],
+            )
+            self._set_meta("categories_discovered", "1")
+
+    def category(self, url: str) -> Tuple[Optional[Status], int, int]:
+        """
+        Returns (status, total, page_size) of a category. total and page_size are 0 until page 1 is done.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT status, total, page_size FROM categories WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None, 0, 0
+        return Status(row[0]), row[1] or 0, row[2] or 0
+
+    def set_category_pages(self, url: str, total: int, page_size: int, n_pages: int):
+        """
+        Records the pagination reported by page 1 and adds the remaining pages as pending.
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO categories (url, status, total, page_size, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET total = excluded.total, page_size = excluded.page_size, "
+                "updated_at = excluded.updated_at",
+                (url, Status.IN_FLIGHT, total, page_size, now),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO pages (category_url, page, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(url, page, Status.PENDING, now) for page in range(2, n_pages + 1)],
+            )
+
+    def pending_pages(self, url: str) -> List[int]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT page FROM pages WHERE category_url = ? AND status != ? ORDER BY page", (url, Status.DONE)
+            )
+            return [row[0] for row in rows]
+
+    def complete_page(
+        self, url: str, page: int, product_urls: List[str], processed_urls: Optional[Container[str]] = None
+    ) -> List[str]:
+        """
+        Marks a category page done and adds its products to the frontier in one transaction.
+        Args:
+            url (str): Category URL.
+            page (int): Page number.
+            product_urls (List[str]): Product URLs found on the page.
+            processed_urls (Optional[Container[str]]): Products already in the product store; they are added as done.
+        Returns:
+            List[str]: The product URLs that still have to be scraped and were not in the frontier yet.
+        """
+        processed_urls = processed_urls or set()
+        now = time.time()
+        new_urls = []
+        with self._lock, self.conn:
+            for product_url in product_urls:
+                processed = product_url in processed_urls
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO products (url, status, updated_at) VALUES (?, ?, ?)",
+                    (product_url, Status.DONE if processed else Status.PENDING, now),
+                )
+                if cursor.rowcount and not processed:
+                    new_urls.append(product_url)
+            self.conn.execute(
+                "INSERT INTO pages (category_url, page, status, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (category_url, page) DO UPDATE SET status = excluded.status, error = NULL, "
+                "updated_at = excluded.updated_at",
+                (url, page, Status.DONE, now),
+            )
+            self._update_category_status(url)
+        return new_urls
+
+    def fail_page(self, url: str, page: int, error: str):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO pages (category_url, page, status, error, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (category_url, page) DO UPDATE SET status = excluded.status, error = excluded.error, "
+                "updated_at = excluded.updated_at",
+                (url, page, Status.FAILED, error, time.time()),
+            )
+
+    def _update_category_status(self, url: str):
+        first_page_done = self.conn.execute(
+            "SELECT 1 FROM pages WHERE category_url = ? AND page = 1 AND status = ?", (url, Status.DONE)
+        ).fetchone()
+        remaining = self.conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE category_url = ? AND status != ?", (url, Status.DONE)
+        ).fetchone()[0]
+        status = Status.DONE if first_page_done and not remaining else Status.IN_FLIGHT
+        self.conn.execute(
+            "INSERT INTO categories (url, status, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (url) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at",
+            (url, status, time.time()),
+        )
+
+    def discovery_complete(self) -> bool:
+        with self._lock:
+            if self._get_meta("categories_discovered") != "1":
+                return False
+            row = self.conn.execute("SELECT COUNT(*) FROM categories WHERE status != ?", (Status.DONE,)).fetchone()
+            return row[0] == 0
+
+    # ------------------------------------------------------------------ products
+
+    def pending_products(self) -> List[str]:
+        """
+        Returns the product URLs that still have to be scraped, including ones that failed before.
+        """
+        with self._lock:
+            self.flush_products()
+            rows = self.conn.execute("SELECT url FROM products WHERE status != ? ORDER BY rowid", (Status.DONE,))
+            return [row[0] for row in rows]
+
+    def start_product(self, url: str):
+        self._set_product(url, Status.IN_FLIGHT, attempt=True)
+
+    def complete_product(self, url: str):
+        self._set_product(url, Status.DONE)
+
+    def fail_product(self, url: str, error: str):
+        self._set_product(url, Status.FAILED, error)
+
+    def _set_product(self, url: str, status: Status, error: Optional[str] = None, attempt: bool = False):
+        with self._updates_lock:
+            self._product_updates.append((url, status, int(attempt), error, time.time()))
+
+    def flush_products(self):
+        """
+        Writes the buffered product status changes in one transaction, in the order they were made.
+        """
+        with self._updates_lock:
+            updates, self._product_updates = self._product_updates, []
+        if not updates:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO products (url, status, attempts, error, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET status = excluded.status, error = excluded.error, "
+                "attempts = attempts + excluded.attempts, updated_at = excluded.updated_at",
+                updates,
+            )
+
+    def reconcile(self, processed_urls: Container[str]):
+        """
+        Sends products marked done back to pending if their record never reached the product store,
+        e.g. because the process was killed before the writer flushed them.
+        """
+        with self._lock:
+            self.flush_products()
+            lost = [
+                (Status.PENDING, url)
+                for (url,) in self.conn.execute("SELECT url FROM products WHERE status = ?", (Status.DONE,))
+                if url not in processed_urls
+            ]
+            if lost:
+                with self.conn:
+                    self.conn.executemany("UPDATE products SET status = ? WHERE url = ?", lost)
+            logger.info(f"Frontier: {len(lost)} products marked done were not saved and are pending again.")
+
+    # ------------------------------------------------------------------ crawl
+
+    def crawl_finished(self) -> bool:
+        """
+        True once discovery is complete and every product was attempted. Failed products do not block it:
+        they are not in the product store, so the next crawl finds and retries them.
+        """
+        with self._lock:
+            if not self.discovery_complete():
+                return False
+            self.flush_products()
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM products WHERE status IN (?, ?)", (Status.PENDING, Status.IN_FLIGHT)
+            ).fetchone()
+            return row[0] == 0
+
+    def mark_complete(self):
+        """
+        Marks the crawl complete so the next run starts a fresh frontier.
+        """
+        with self._lock, self.conn:
+            self._set_meta("complete", "1")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {}
+        with self._lock:
+            self.flush_products()
+            for table in ("categories", "pages", "products"):
+                rows = self.conn.execute(f"SELECT status, COUNT(*) FROM {table} GROUP BY status")
+                stats[table] = {status: count for status, count in rows}
+        return stats
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
@@ -0,0 +1,93 @@
+import bisect
+import hashlib
+import heapq
+from array import array
+from typing import Iterable, Iterator, Set
+
+from .parser import product_id_from_url
+
+MIN_BUFFER = 1024  # Recent additions kept in a set before they are merged into the sorted table
+
+
+def product_key(url: str) -> int:
+    """
+    Returns the 64-bit fingerprint of the product behind a URL, keyed on its product id so that
+    the same product listed under different slugs or categories has one key.
+    At a million products the chance of any two keys colliding is below 1 in 30 million.
+    """
+    key = product_id_from_url(url) or url
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class ProductIdSet:
+    """
+    Compact set of products, used in place of a set of URL strings for deduplication and resume.
+
+    Products are stored as 64-bit fingerprints of their product id in a sorted array('Q'), 8 bytes each,
+    where a set of URLs takes well over 100 bytes per entry. New keys go to a small set that is merged into the
+    sorted table once it grows past 1/16 of it, so additions stay amortised O(log n) and lookups are a binary search.
+    """
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self._sorted = array("Q")
+        self._recent: Set[int] = set()
+        self.update(urls)
+
+    @classmethod
+    def from_product_ids(cls, product_ids: Iterable[str]) -> "ProductIdSet":
+        """
+        Builds the set from product ids, e.g. the keys of a ProductStore index, sorting them in one pass.
+        """
+        id_set = cls()
+        id_set._sorted = array("Q", sorted({product_key(product_id) for product_id in product_ids}))
+        return id_set
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._recent)
+
+    def __contains__(self, url: str) -> bool:
+        return self._contains_key(product_key(url))
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Yields the fingerprints, not the URLs, which the set does not keep.
+        """
+        self._merge()
+        return iter(self._sorted)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the set's tables.
+        """
+        recent = len(self._recent) * 64  # Set slot plus int object
+        return self._sorted.itemsize * len(self._sorted) + recent
+
+    def add(self, url: str) -> bool:
+        """
+        Adds the product behind a URL.
+        Returns:
+            bool: True if the product was not in the set yet.
+        """
+        key = product_key(url)
+        if self._contains_key(key):
+            return False
+        self._recent.add(key)
+        if len(self._recent) >= max(MIN_BUFFER, len(self._sorted) // 16):
+            self._merge()
+        return True
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def _contains_key(self, key: int) -> bool:
+        if key in self._recent:
+            return True
+        i = bisect.bisect_left(self._sorted, key)
+        return i < len(self._sorted) and self._sorted[i] == key
+
+    def _merge(self):
+        if self._recent:
+            self._sorted = array("Q", heapq.merge(self._sorted, sorted(self._recent)))
+            self._recent = set()
@@ -1,30 +1,116 @@
+import atexit
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Union
 
+from .constants import LOG_FILE, LOG_FORMAT, LOG_SAMPLE_EVERY, PROGRESS_INTERVAL
 
-def setup_logger(name: str, log_file: str, level=logging.INFO) -> logging.Logger:
+# Background threads writing the records of each configured logger, by logger name
+_listeners: Dict[str, QueueListener] = {}
+
+
+class EventSampler(logging.Filter):
+    """
+    Samples routine per-URL events and aggregates them into periodic progress lines.
+
+    Records logged with extra={"event": name} below WARNING are counted per name, and only the first of every
+    `every` records of a name is passed on (0 passes none). Warnings, errors and untagged records always pass.
+    At most every `interval` seconds the counts since the previous line are logged as one progress line, e.g.
+    "Progress in the last 10s: 412 products saved, 20 category pages."
+    """
+
+    def __init__(self, logger: logging.Logger, every: int = LOG_SAMPLE_EVERY, interval: float = PROGRESS_INTERVAL):
+        super().__init__()
+        self.logger = logger
+        self.every = every
+        self.interval = interval
+        self.totals: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._since = time.monotonic()
+        self._lock = threading.Lock()  # Records also come from asyncio.to_thread() workers
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        if event is None or record.levelno >= logging.WARNING:
+            return True
+
+        with self._lock:
+            total = self.totals[event] = self.totals.get(event, 0) + 1
+            self._counts[event] = self._counts.get(event, 0) + 1
+            progress = self._take_progress() if time.monotonic() - self._since >= self.interval else None
+        if progress:
+            self.logger.info(progress)
+        return self.every > 0 and (total - 1) % self.every == 0
+
+    def flush(self):
+        """
+        Logs the events counted since the last progress line, e.g. at the end of a run.
+        """
+        with self._lock:
+            progress = self._take_progress()
+        if progress:
+            self.logger.info(progress)
+
+    def _take_progress(self) -> Optional[str]:
+        now = time.monotonic()
+        counts, elapsed = self._counts, now - self._since
+        self._counts, self._since = {}, now
+        if not counts:
+            return None
+        events = ", ".join(f"{count} {event}" for event, count in counts.items())
+        return f"Progress in the last {elapsed:.0f}s: {events}."
+
+
+def setup_logger(
+    name: str,
+    log_file: Optional[str] = LOG_FILE,
+    level: Union[int, str] = logging.INFO,
+    fmt: str = LOG_FORMAT,
+    sample_every: int = LOG_SAMPLE_EVERY,
+    progress_interval: float = PROGRESS_INTERVAL,
+) -> logging.Logger:
     """
-    Sets up a logger with the specified name and log file.
+    Sets up a logger with the specified name and log file, or reconfigures it if it exists.
+
+    Records are put on a queue and written to the file and to stderr by a background thread,
+    so logging never blocks the event loop on I/O. Per-URL events are sampled by an EventSampler.
 
     Args:
         name (str): Name of the logger.
-        log_file (str): File to write logs to.
-        level (int): Logging level.
+        log_file (Optional[str]): File to write logs to, or None for stderr only.
+        level (Union[int, str]): Logging level, e.g. logging.INFO or "DEBUG".
+        fmt (str): logging.Formatter format string.
+        sample_every (int): Log one in this many events of each kind; 1 logs all, 0 only progress lines.
+        progress_interval (float): Seconds between progress lines.
 
     Returns:
         logging.Logger: Configured logger.
     """
-    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    logger = logging.getLogger(name)
+    _stop_listener(name)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    for log_filter in logger.filters[:]:
+        logger.removeFilter(log_filter)
 
-    handler = logging.FileHandler(log_file)
-    handler.setFormatter(formatter)
+    formatter = logging.Formatter(fmt)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
 
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
 
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    logger.addHandler(handler)
-    logger.addHandler(stream_handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.addFilter(EventSampler(logger, sample_every, progress_interval))
 
     # Prevent log propagation to the root logger
     logger.propagate = False
@@ -32,5 +118,30 @@ def setup_logger(name: str, log_file: str, level=logging.INFO) -> logging.Logger
     return logger
 
 
+def flush_progress(logger: logging.Logger):
+    """
+    Logs the pending progress line of a logger set up with setup_logger().
+    """
+    for log_filter in logger.filters:
+        if isinstance(log_filter, EventSampler):
+            log_filter.flush()
+
+
+def _stop_listener(name: str):
+    listener = _listeners.pop(name, None)
+    if listener is None:
+        return
+    listener.stop()  # Writes the records still queued
+    for handler in listener.handlers:
+        handler.close()
+
+
+@atexit.register
+def _stop_listeners():
+    for name in list(_listeners):
+        flush_progress(logging.getLogger(name))
+        _stop_listener(name)
+
+
 # Initialize the main logger
-main_logger = setup_logger("main_logger", "scraper.log")
+main_logger = setup_logger("main_logger", LOG_FILE)
@@ -0,0 +1,277 @@
+import asyncio
+import bisect
+import json
+import os
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from aiohttp import web
+
+from .constants import LATENCY_BUCKETS, METRICS_INTERVAL
+from .logger import main_logger as logger
+from .utils import resolve_path
+
+
+class Histogram:
+    """
+    Latency histogram with fixed bucket bounds in seconds, as exported to Prometheus.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile as the upper bound of the bucket it falls into (the maximum for the +Inf bucket).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p90": self.quantile(0.90),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 6),
+        }
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class _StageTimer:
+    __slots__ = ("timings", "stage", "start")
+
+    def __init__(self, timings: Dict[str, float], stage: str):
+        self.timings = timings
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.timings[self.stage] = self.timings.get(self.stage, 0.0) + time.perf_counter() - self.start
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+NULL_TIMER = _NullTimer()
+
+
+def timed(timings: Optional[Dict[str, float]], stage: str):
+    """
+    Adds the time spent in a `with` block to timings[stage]. Does nothing if timings is None.
+    Used by the page parsers, which may run in a worker process and hand their timings back with the result.
+    """
+    return NULL_TIMER if timings is None else _StageTimer(timings, stage)
+
+
+class Metrics:
+    """
+    Per-stage latency histograms, event counters and sampled gauges of a scraper run.
+
+    Stages are timed with `with metrics.timer("fetch"):` or recorded with observe().
+    Gauges are callables sampled when a snapshot is taken, e.g. queue depths and in-flight requests.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.started = time.time()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        return histogram
+
+    def timer(self, stage: str) -> _Timer:
+        return _Timer(self.histogram(stage))
+
+    def observe(self, stage: str, seconds: float):
+        self.histogram(stage).observe(seconds)
+
+    def inc(self, name: str, value: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, sample: Callable[[], float]):
+        self.gauges[name] = sample
+
+    def _sample_gauges(self) -> Dict[str, float]:
+        values = {}
+        for name, sample in self.gauges.items():
+            try:
+                values[name] = sample()
+            except Exception:  # A gauge over a component that has been closed
+                continue
+        return values
+
+    def snapshot(self) -> Dict:
+        return {
+            "timestamp": time.time(),
+            "uptime": round(time.time() - self.started, 3),
+            "stages": {stage: histogram.snapshot() for stage, histogram in sorted(self.histograms.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "gauges": self._sample_gauges(),
+        }
+
+    def prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# HELP igefa_stage_seconds Time spent per scraper stage.",
+            "# TYPE igefa_stage_seconds histogram",
+        ]
+        for stage, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip((*histogram.bounds, "+Inf"), histogram.counts):
+                cumulative += count
+                lines.append(f'igefa_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'igefa_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+            lines.append(f'igefa_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE igefa_{name}_total counter")
+            lines.append(f"igefa_{name}_total {value}")
+        for name, value in sorted(self._sample_gauges().items()):
+            lines.append(f"# TYPE igefa_{name} gauge")
+            lines.append(f"igefa_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics(Metrics):
+    """
+    Disabled metrics: every call is a no-op, so instrumented code costs a method call per stage.
+    """
+
+    enabled = False
+
+    def timer(self, stage: str) -> _NullTimer:
+        return NULL_TIMER
+
+    def observe(self, stage: str, seconds: float):
+        pass
+
+    def inc(self, name: str, value: float = 1):
+        pass
+
+    def gauge(self, name: str, sample: Callable[[], float]):
+        pass
+
+
+class MetricsExporter:
+    """
+    Publishes Metrics as a JSON snapshot file rewritten every `interval` seconds
+    and, if a port is given, as a Prometheus endpoint at http://host:port/metrics.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        snapshot_file: Optional[str] = None,
+        interval: float = METRICS_INTERVAL,
+        port: Optional[int] = None,
+        host: str = "0.0.0.0",
+    ):
+        self.metrics = metrics
+        self.snapshot_file = snapshot_file and resolve_path(snapshot_file)
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self._task: Optional[asyncio.Task] = None
+        self._runner = None
+
+    async def start(self) -> "MetricsExporter":
+        if self.snapshot_file:
+            self._task = asyncio.create_task(self._run())
+        if self.port is not None:
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            self.port = self._runner.addresses[0][1]
+            logger.info(f"Serving Prometheus metrics at http://{self.host}:{self.port}/metrics")
+        return self
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await asyncio.to_thread(self.write_snapshot, self.metrics.snapshot())  # Final numbers of the run
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MetricsExporter":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def write_snapshot(self, snapshot: Dict):
+        tmp_path = self.snapshot_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, self.snapshot_file)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            # Taken on the event loop, which owns the metrics; only the file write runs in a thread
+            await asyncio.to_thread(self.write_snapshot, self.metrics.snapshot())
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.metrics.prometheus(), content_type="text/plain", charset="utf-8")
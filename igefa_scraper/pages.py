@@ -0,0 +1,98 @@
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from .delta import listing_fingerprint
+from .extractor import load_next_data
+from .parser import (
+    extract_listing_hits_from_next_data,
+    extract_product_details_from_next_data,
+    extract_pagination_from_next_data,
+    extract_product_record,
+)
+from .metrics import timed
+from .schema import decode_page
+
+T = TypeVar("T")
+
+# These functions turn raw response bytes into plain data. They run either on the event loop
+# or in a worker process of IgefaScraper's parse pool, so they take and return only picklable values.
+
+
+def parse_category_page(
+    body: bytes, url: str = "", timings: Optional[Dict[str, float]] = None, fingerprints: bool = False
+) -> Optional[Tuple[Dict[str, Optional[str]], int, int]]:
+    """
+    Parses a category page.
+    Args:
+        body (bytes): Raw response body.
+        url (str): Page URL, used for log messages only.
+        timings (Optional[Dict[str, float]]): Receives the seconds spent per parse stage, if given.
+        fingerprints (bool): Compute the listing fingerprint of every hit, for delta crawls.
+    Returns:
+        Optional[Tuple[Dict[str, Optional[str]], int, int]]: ({product URL: listing fingerprint or None}, total,
+        page size), or None if the page has no __NEXT_DATA__.
+    """
+    data = load_next_data(body, url, timings, decode_page)
+    if data is None:
+        return None
+
+    with timed(timings, "extract"):
+        listing = {}
+        for product_url, hit in extract_listing_hits_from_next_data(data):
+            listing[product_url] = listing_fingerprint(hit, extract_product_record(hit)) if fingerprints else None
+        total, page_size = extract_pagination_from_next_data(data)
+    return listing, total, page_size
+
+
+def parse_listing_page(
+    body: bytes, url: str = "", timings: Optional[Dict[str, float]] = None, fingerprints: bool = False
+) -> Optional[Tuple[Dict[str, Optional[str]], int, int, Dict[str, Dict]]]:
+    """
+    Parses a category page for listing-only mode: like parse_category_page, plus output rows built from the hits.
+    Args:
+        body (bytes): Raw response body.
+        url (str): Page URL, used for log messages only.
+        timings (Optional[Dict[str, float]]): Receives the seconds spent per parse stage, if given.
+        fingerprints (bool): Compute the listing fingerprint of every hit from its row, for delta crawls.
+    Returns:
+        Optional[Tuple[Dict[str, Optional[str]], int, int, Dict[str, Dict]]]:
+        ({product URL: listing fingerprint or None}, total, page size, {product URL: row}),
+        or None if the page has no __NEXT_DATA__.
+    """
+    data = load_next_data(body, url, timings, decode_page)
+    if data is None:
+        return None
+
+    with timed(timings, "extract"):
+        listing, records = {}, {}
+        for product_url, hit in extract_listing_hits_from_next_data(data):
+            record = extract_product_record(hit)
+            if record:
+                records[product_url] = record
+            listing[product_url] = listing_fingerprint(hit, record) if fingerprints else None
+        total, page_size = extract_pagination_from_next_data(data)
+    return listing, total, page_size, records
+
+
+def parse_product_page(body: bytes, url: str = "", timings: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+    """
+    Parses a product page.
+    Args:
+        body (bytes): Raw response body.
+        url (str): Page URL, used for log messages only.
+        timings (Optional[Dict[str, float]]): Receives the seconds spent per parse stage, if given.
+    Returns:
+        Optional[Dict]: Product details, or None if the page has no __NEXT_DATA__ or extraction fails.
+    """
+    data = load_next_data(body, url, timings, decode_page)
+    if data is None:
+        return None
+    with timed(timings, "extract"):
+        return extract_product_details_from_next_data(data)
+
+
+def parse_timed(parse_page: Callable[..., T], body: bytes, url: str = "") -> Tuple[T, Dict[str, float]]:
+    """
+    Runs a page parser and returns its result with the seconds spent per stage, for the metrics of the parent process.
+    """
+    timings: Dict[str, float] = {}
+    return parse_page(body, url, timings), timings
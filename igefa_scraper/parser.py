@@ -1,9 +1,20 @@
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from .constants import BASE_URL
 from .logger import main_logger as logger
 
 
+def product_id_from_url(url: str) -> str:
+    """
+    Returns the product id (the mainVariant.id) from a product URL of the form {BASE_URL}/p/{slug}/{id}.
+    Args:
+        url (str): Product URL.
+    Returns:
+        str: Product id, or an empty string if the URL has no path.
+    """
+    return url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1] if "/" in url else ""
+
+
 def extract_products_from_next_data(data: dict) -> List[Dict]:
     """
     Extracts a list of products from the JSON data of a category page.
@@ -12,7 +23,18 @@ def extract_products_from_next_data(data: dict) -> List[Dict]:
     Returns:
         List[Dict]: List of product dictionaries.
     """
-    products = []
+    return [{"Supplier-URL": product_url} for product_url, _ in extract_listing_hits_from_next_data(data)]
+
+
+def extract_listing_hits_from_next_data(data: dict) -> List[Tuple[str, Dict]]:
+    """
+    Pairs the usable hits of a category page with their product URLs.
+    Args:
+        data (dict): JSON data from the category page.
+    Returns:
+        List[Tuple[str, Dict]]: (product URL, hit) per hit that has a slug and an id.
+    """
+    hits_with_urls = []
     try:
         hits = data["props"]["initialProps"]["pageProps"]["initialProductData"]["hits"]
         for hit in hits:
@@ -31,17 +53,34 @@ def extract_products_from_next_data(data: dict) -> List[Dict]:
             if not product_id:
                 continue
 
-            product_url = f"{BASE_URL}/p/{slug}/{product_id}"
-
-            product = {
-                "Supplier-URL": product_url,
-            }
-            products.append(product)
+            hits_with_urls.append((f"{BASE_URL}/p/{slug}/{product_id}", hit))
     except KeyError as e:
         logger.info(f"KeyError extracting products from category JSON: {e}")
     except Exception as e:
         logger.info(f"Error extracting products from category JSON: {e}")
-    return products
+    return hits_with_urls
+
+
+def extract_pagination_from_next_data(data: dict) -> Tuple[int, int]:
+    """
+    Extracts the total number of products and the page size from the JSON data of a category page.
+    The page size is taken from the pagination fields when present, otherwise from the number of hits.
+    Args:
+        data (dict): JSON data from the category page.
+    Returns:
+        Tuple[int, int]: (total, page_size). Both are 0 if the data has no product listing.
+    """
+    try:
+        product_data = data["props"]["initialProps"]["pageProps"]["initialProductData"]
+        total = int(product_data.get("total") or 0)
+        for key in ("hitsPerPage", "pageSize", "perPage", "limit"):
+            page_size = product_data.get(key)
+            if isinstance(page_size, int) and page_size > 0:
+                return total, page_size
+        return total, len(product_data.get("hits") or [])
+    except (KeyError, TypeError, ValueError) as e:
+        logger.info(f"Error extracting pagination from category JSON: {e}")
+        return 0, 0
 
 
 def extract_product_details_from_next_data(data: dict) -> Optional[Dict]:
@@ -54,6 +93,31 @@ def extract_product_details_from_next_data(data: dict) -> Optional[Dict]:
     """
     try:
         product = data["props"]["initialProps"]["pageProps"]["product"]
+    except KeyError as e:
+        logger.info(f"KeyError extracting product details: {e}")
+        return None
+    except Exception as e:
+        logger.info(f"Error extracting product details: {e}")
+        return None
+    return extract_product_record(product)
+
+
+def missing_fields(record: Dict, required_fields: Iterable[str]) -> List[str]:
+    """
+    Returns the required columns that are missing or empty in a row.
+    """
+    return [field for field in required_fields if not record.get(field)]
+
+
+def extract_product_record(product: dict) -> Optional[Dict]:
+    """
+    Maps a product object, from a product page or a category hit, to an output row.
+    Args:
+        product (dict): Product object with name, sku, mainVariant, brand, breadcrumbs and clientFields.
+    Returns:
+        Optional[Dict]: Dictionary of product details, or None if extraction fails.
+    """
+    try:
         if not product:
             logger.info("Hit is empty in product JSON data.")
             return None
@@ -76,12 +140,12 @@ def extract_product_details_from_next_data(data: dict) -> Optional[Dict]:
         product_url = f"{BASE_URL}/p/{slug}/{product_id}"
 
         # Extract breadcrumbs from 'breadcrumbs' -> 'hierarchy'
-        breadcrumbs = product.get("breadcrumbs", {}).get("hierarchy", [])
+        breadcrumbs = (product.get("breadcrumbs") or {}).get("hierarchy") or []
         breadcrumb_names = [item.get("slug", "").strip() for item in breadcrumbs if item.get("slug")]
         breadcrumb_str = "/".join(breadcrumb_names)
 
         # Get the description from mainVariant
-        description = main_variant.get("description", "").strip()
+        description = (main_variant.get("description") or "").strip()
 
         # Extract part before '---' for Add. Description and part after '---' for Product Description
         if "---" in description:
@@ -93,26 +157,26 @@ def extract_product_details_from_next_data(data: dict) -> Optional[Dict]:
             product_description = description
 
         # Extract Product Image URL from mainVariant['images']
-        images = main_variant.get("images", [])
+        images = main_variant.get("images") or []
         if images:
-            product_image_url = images[0].get("url", "").strip()
+            product_image_url = (images[0].get("url") or "").strip()
         else:
             product_image_url = ""
 
         # Extract 'Manufacturer' from 'hit' -> 'brand'
-        manufacturer_current = product.get("brand", {}).get("name", "").strip()
+        manufacturer_current = ((product.get("brand") or {}).get("name") or "").strip()
         logger.debug(f"Manufacturer from brand: '{manufacturer_current}'")
 
         # Extract 'Manufacturer' from 'clientFields' -> 'attributes'
         manufacturer_attribute = ""
-        attributes = product.get("clientFields", {}).get("attributes", [])
+        attributes = (product.get("clientFields") or {}).get("attributes", [])
         if not isinstance(attributes, list):
             logger.warning("'attributes' is not a list in clientFields.")
             attributes = []
 
         for attribute in attributes:
             if attribute and attribute.get("label") == "Hersteller":
-                manufacturer_attribute = attribute.get("value", "").strip()
+                manufacturer_attribute = (attribute.get("value") or "").strip()
                 logger.debug(f"Manufacturer from attributes: '{manufacturer_attribute}'")
                 break  # Stop after finding the first matching 'Hersteller'
 
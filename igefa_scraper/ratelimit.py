@@ -0,0 +1,223 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+import aiohttp
+
+from .constants import (
+    INITIAL_CONCURRENCY,
+    MIN_CONCURRENCY,
+    MAX_CONCURRENCY,
+    INITIAL_RATE,
+    MIN_RATE,
+    MAX_RATE,
+)
+from .logger import main_logger as logger
+
+
+class TokenBucket:
+    """
+    Request-rate ceiling: allows `rate` requests per second with bursts of up to `burst` requests.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Slot:
+    """
+    One request admitted by a RateController. The fetch path records the response status on it;
+    latency and errors are recorded automatically when the `async with` block exits.
+    `waited` is the time the request spent waiting for admission.
+    """
+
+    def __init__(self, controller: "RateController"):
+        self.controller = controller
+        self.status: Optional[int] = None
+        self.waited = 0.0
+        self._start = 0.0
+
+    async def __aenter__(self) -> "Slot":
+        queued = time.monotonic()
+        await self.controller.acquire()
+        self._start = time.monotonic()
+        self.waited = self._start - queued
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.controller.release(self.status, time.monotonic() - self._start, exc_val)
+
+
+class RateController:
+    """
+    Fixed concurrency limit without a rate ceiling. Base class for pluggable controllers.
+    """
+
+    def __init__(self, concurrency: int = INITIAL_CONCURRENCY):
+        self.limit = concurrency
+        self.in_flight = 0
+        self._waiters: deque = deque()
+
+    @property
+    def max_in_flight(self) -> int:
+        """
+        The most requests this controller ever lets run at once, e.g. for sizing a connection pool.
+        """
+        return int(self.limit)
+
+    def slot(self) -> Slot:
+        return Slot(self)
+
+    async def acquire(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()  # Pass the wake-up on to the next waiter
+                raise
+        self.in_flight += 1
+
+    def release(self, status: Optional[int], latency: float, error: Optional[BaseException]):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+class AdaptiveRateController(RateController):
+    """
+    Token bucket for the request rate plus AIMD (additive increase, multiplicative decrease) concurrency control.
+
+    Every `limit` healthy responses widen the concurrency limit by one and raise the rate by rate_step.
+    A 429 or 5xx response, a timeout or connection error, or a p95 latency above latency_tolerance times
+    the best p95 since the last decrease halves both. Decreases are spaced by `cooldown` seconds,
+    so a burst of failures from requests that were already in flight counts once.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = INITIAL_CONCURRENCY,
+        min_concurrency: int = MIN_CONCURRENCY,
+        max_concurrency: int = MAX_CONCURRENCY,
+        rate: float = INITIAL_RATE,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        rate_step: float = 0.5,
+        latency_window: int = 100,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 1.0,
+    ):
+        super().__init__(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.best_p95: Optional[float] = None
+        self._successes = 0
+        self._samples = 0
+        self._last_decrease = 0.0
+
+    @property
+    def max_in_flight(self) -> int:
+        return int(self.max_concurrency)
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    async def acquire(self):
+        # Slot first: requests queued for a slot hold no tokens, so a rate cut also slows down the queue
+        await super().acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            super().release(None, 0.0, None)
+            raise
+
+    def release(self, status: Optional[int], latency: float, error: Optional[BaseException]):
+        super().release(status, latency, error)
+
+        if status == 429 or (status is not None and status >= 500):
+            self._decrease(f"HTTP {status}")
+            return
+        if status is None and isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, OSError)):
+            self._decrease(type(error).__name__)
+            return
+        if error is not None and status is None:
+            return  # Not caused by the server, e.g. cancellation
+
+        self.latencies.append(latency)
+        self._samples += 1
+        if self._samples % 20 == 0:
+            p95 = self.p95()
+            if p95 is not None:
+                if self.best_p95 is None or p95 < self.best_p95:
+                    self.best_p95 = p95
+                elif p95 > self.best_p95 * self.latency_tolerance:
+                    self._decrease(f"p95 latency {p95:.2f}s")
+                    return
+
+        self._successes += 1
+        if self._successes >= self.limit:
+            self._successes = 0
+            self._increase()
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < self.latencies.maxlen:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def _increase(self):
+        old_limit = int(self.limit)
+        self.limit = min(self.max_concurrency, self.limit + 1)
+        self.bucket.rate = min(self.max_rate, self.bucket.rate + self.rate_step)
+        self._wake()
+        if int(self.limit) != old_limit:
+            logger.info(f"Rate control: widening to concurrency {int(self.limit)}, rate {self.rate:.1f}/s.")
+
+    def _decrease(self, reason: str):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        old_limit, old_rate = self.limit, self.bucket.rate
+        self.limit = max(self.min_concurrency, self.limit / 2)
+        self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+        if self.limit == old_limit and self.bucket.rate == old_rate:
+            return  # Already at the floor
+        # Measure a new latency baseline at the reduced load
+        self.latencies.clear()
+        self.best_p95 = None
+        logger.warning(f"Rate control: {reason}, backing off to concurrency {int(self.limit)}, rate {self.rate:.1f}/s.")
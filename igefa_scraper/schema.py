@@ -0,0 +1,145 @@
+import json
+from typing import Any, Iterable, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # Optional dependency: poetry install --extras fast
+    msgspec = None
+
+# The parsers only read a few paths of a page's __NEXT_DATA__ (or data route) payload:
+#   props.initialProps.pageProps.product
+#   props.initialProps.pageProps.initialProductData.{hits, total, hitsPerPage, ...}
+# with mainVariant, brand, breadcrumbs.hierarchy and clientFields.attributes below products and hits.
+# With msgspec installed, payloads are decoded against structs declaring just these paths: everything else
+# is validated and skipped without building Python objects, which is most of a product page.
+
+if msgspec is not None:
+    from msgspec import UNSET, Struct, UnsetType
+
+    # Fields are UNSET when the payload does not have them, which to_builtins() omits,
+    # so the projection has the same keys, nulls included, as the full json.loads() tree.
+
+    class Image(Struct, gc=False):
+        url: Any = UNSET
+
+    class Crumb(Struct, gc=False):
+        slug: Any = UNSET
+
+    class Breadcrumbs(Struct, gc=False):
+        hierarchy: Union[List[Optional[Crumb]], None, UnsetType] = UNSET
+
+    class Attribute(Struct, gc=False):
+        label: Any = UNSET
+        value: Any = UNSET
+
+    class ClientFields(Struct, gc=False):
+        attributes: Union[List[Optional[Attribute]], None, UnsetType] = UNSET
+
+    class Brand(Struct, gc=False):
+        name: Any = UNSET
+
+    class Variant(Struct, gc=False):
+        id: Any = UNSET
+        slug: Any = UNSET
+        gtin: Any = UNSET
+        description: Any = UNSET
+        images: Union[List[Optional[Image]], None, UnsetType] = UNSET
+        # delta.CHANGE_MARKERS
+        updatedAt: Any = UNSET
+        updated_at: Any = UNSET
+        modifiedAt: Any = UNSET
+        lastModified: Any = UNSET
+        version: Any = UNSET
+
+    class Product(Struct, gc=False):
+        """
+        A product of a product page or a hit of a category page.
+        """
+
+        name: Any = UNSET
+        sku: Any = UNSET
+        skuProvidedBySupplier: Any = UNSET
+        variationName: Any = UNSET
+        mainVariant: Union[Variant, None, UnsetType] = UNSET
+        brand: Union[Brand, None, UnsetType] = UNSET
+        breadcrumbs: Union[Breadcrumbs, None, UnsetType] = UNSET
+        clientFields: Union[ClientFields, None, UnsetType] = UNSET
+        # delta.CHANGE_MARKERS
+        updatedAt: Any = UNSET
+        updated_at: Any = UNSET
+        modifiedAt: Any = UNSET
+        lastModified: Any = UNSET
+        version: Any = UNSET
+
+    class ProductData(Struct, gc=False):
+        hits: Union[List[Optional[Product]], None, UnsetType] = UNSET
+        total: Any = UNSET
+        hitsPerPage: Any = UNSET
+        pageSize: Any = UNSET
+        perPage: Any = UNSET
+        limit: Any = UNSET
+
+    class PageProps(Struct, gc=False):
+        product: Union[Product, None, UnsetType] = UNSET
+        initialProductData: Union[ProductData, None, UnsetType] = UNSET
+        redirect: Any = msgspec.field(default=UNSET, name="__N_REDIRECT")
+
+    class InitialProps(Struct, gc=False):
+        pageProps: Union[PageProps, None, UnsetType] = UNSET
+
+    class Props(Struct, gc=False):
+        initialProps: Union[InitialProps, None, UnsetType] = UNSET
+        pageProps: Union[PageProps, None, UnsetType] = UNSET
+
+    class Page(Struct, gc=False):
+        """
+        A __NEXT_DATA__ payload ({"props": ...}) or a data route response ({"pageProps": ...}).
+        """
+
+        props: Union[Props, None, UnsetType] = UNSET
+        pageProps: Union[PageProps, None, UnsetType] = UNSET
+
+    _decoder = msgspec.json.Decoder(Page)
+
+
+def decode_page_struct(payload: Union[bytes, str]) -> "Page":
+    """
+    Decodes a page payload into Page structs, keeping only the paths the parsers read.
+    Raises:
+        ImportError: If msgspec is not installed.
+        msgspec.DecodeError: If the payload is not valid JSON or does not match the schema.
+    """
+    if msgspec is None:
+        raise ImportError("Schema decoding requires msgspec: poetry install --extras fast")
+    return _decoder.decode(payload)
+
+
+def decode_page(payload: Union[bytes, str]) -> Any:
+    """
+    Drop-in replacement for json.loads() on page payloads that returns the schema paths only.
+    Falls back to json.loads() when msgspec is not installed or the payload does not match the schema,
+    so unexpected data still reaches the parsers, and invalid JSON raises json.JSONDecodeError as before.
+    Args:
+        payload (Union[bytes, str]): __NEXT_DATA__ payload or data route response.
+    Returns:
+        Any: Decoded data in the layout of the payload.
+    """
+    if msgspec is None:
+        return json.loads(payload)
+    try:
+        return msgspec.to_builtins(_decoder.decode(payload))
+    except msgspec.DecodeError:  # Includes ValidationError
+        return json.loads(payload)
+
+
+def decode_pages(payloads: Iterable[Union[bytes, str]]) -> List[Any]:
+    """
+    Decodes a batch of page payloads with decode_page(). A payload that is not valid JSON decodes to None.
+    """
+    results = []
+    for payload in payloads:
+        try:
+            results.append(decode_page(payload))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            results.append(None)
+    return results
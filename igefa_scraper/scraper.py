@@ -1,51 +1,335 @@
 import asyncio
-import json
-import random
+import functools
+import multiprocessing
+import os
+import time
 
 import aiohttp
 import tenacity
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
 
 from bs4 import BeautifulSoup
 
-from .parser import extract_products_from_next_data, extract_product_details_from_next_data
-from .utils import save_intermediate_data, load_processed_urls
-from .constants import BASE_URL, HEADERS
-from .logger import main_logger as logger
+from .breaker import CircuitBreaker, CircuitOpenError, is_failure
+from .cache import ResponseCache
+from .deadletter import DeadLetter, DeadLetterQueue, Kind
+from .delta import DeltaTracker
+from .extractor import data_route_url, find_build_id
+from .metrics import Metrics, NullMetrics
+from .pages import parse_category_page, parse_listing_page, parse_product_page, parse_timed
+from .parser import missing_fields
+from .frontier import Frontier, Status
+from .idset import ProductIdSet
+from .ratelimit import AdaptiveRateController, RateController, Slot
+from .shard import Shard
+from .store import ProductStore
+from .transport import ResponseTooLarge, Transport
+from .utils import resolve_path
+from .writer import Durability, IntermediateWriter
+from .constants import (
+    BASE_URL,
+    DEFAULT_WORKERS,
+    DEFAULT_QUEUE_SIZE,
+    WRITER_BATCH_SIZE,
+    WRITER_FLUSH_INTERVAL,
+    INTERMEDIATE_STORE,
+    LEGACY_INTERMEDIATE_FILE,
+    SEGMENT_SIZE,
+    FRONTIER_FILE,
+    CACHE_SIZE,
+    LISTING_REQUIRED_FIELDS,
+    DATA_ROUTE_MAX_FAILURES,
+    FETCH_ATTEMPTS,
+    FETCH_RETRY_WAIT_MIN,
+    FETCH_RETRY_WAIT_MAX,
+    DEAD_LETTER_FILE,
+    DEAD_LETTER_MAX_ATTEMPTS,
+    CIRCUIT_MAX_OPEN_SECONDS,
+)
+from .logger import flush_progress, main_logger as logger
+
+
+T = TypeVar("T")
+
+
+def count_pages(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size)) if page_size > 0 else 1
+
+
+def is_retryable(error: BaseException) -> bool:
+    # A 404 does not go away by asking again, and data routes fall back to HTML on it
+    if isinstance(error, aiohttp.ClientResponseError) and error.status == 404:
+        return False
+    if isinstance(error, ResponseTooLarge):
+        return False
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def failure_reason(error: BaseException) -> str:
+    """
+    Describes an error for the dead-letter queue, e.g. "HTTP 503" or "TimeoutError".
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return f"HTTP {error.status}"
+    message = str(error)
+    return f"{type(error).__name__}: {message}" if message else type(error).__name__
+
+
+def count_retry(retry_state: tenacity.RetryCallState):
+    metrics = retry_state.args[0].metrics
+    metrics.inc("fetch_retries")
+    metrics.observe("retry_sleep", retry_state.next_action.sleep)
 
 
 class IgefaScraper:
-    def __init__(self):
-        self.session = None
-        self.semaphore = asyncio.Semaphore(10)  # Limit the number of concurrent requests
-        self.processed_urls = set()
-        self.intermediate_file = "intermediate_data.jsonl"
+    def __init__(
+        self,
+        streaming: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = WRITER_BATCH_SIZE,
+        flush_interval: float = WRITER_FLUSH_INTERVAL,
+        durability: Durability = Durability.NONE,
+        segment_size: int = SEGMENT_SIZE,
+        frontier_file: Optional[str] = FRONTIER_FILE,
+        cache_dir: Optional[str] = None,
+        cache_size: int = CACHE_SIZE,
+        delta_file: Optional[str] = None,
+        rate_controller: Optional[RateController] = None,
+        parse_workers: int = 0,
+        shard: Optional[Shard] = None,
+        base_url: str = BASE_URL,
+        metrics: Optional[Metrics] = None,
+        listing_only: bool = False,
+        required_fields: Sequence[str] = LISTING_REQUIRED_FIELDS,
+        data_routes: bool = False,
+        transport: Optional[Transport] = None,
+        dead_letter_file: Optional[str] = DEAD_LETTER_FILE,
+        retry_failed: bool = True,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        # Limits concurrent requests and the request rate, adapting both to how the server responds
+        self.rate_controller = rate_controller or AdaptiveRateController()
+        # Shared HTTP session with a connection pool sized to the most requests the controller runs at once
+        self.transport = transport or Transport(pool_size=self.rate_controller.max_in_flight)
+        self.processed_urls = ProductIdSet()  # Products in the product store, keyed on product id
+        self.intermediate_file = INTERMEDIATE_STORE  # Product store directory
+        self.streaming = streaming  # Scrape products while categories are still being discovered
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.segment_size = segment_size
+        self.frontier_file = frontier_file  # None disables the persistent frontier
+        self.cache_dir = cache_dir  # None disables the conditional-request response cache
+        self.cache_size = cache_size
+        self.delta_file = delta_file  # Only scrape products whose listing entry is new or changed
+        self.parse_workers = parse_workers  # Processes for parsing pages; 0 parses on the event loop
+        self.shard = shard  # Only scrape the products of this shard, keeping per-shard state files
+        self.base_url = base_url.rstrip("/")  # Origin requests go to, e.g. a local stand-in server
+        self.metrics = metrics or NullMetrics()  # Per-stage timings and counters; no-ops unless enabled
+        self.listing_only = listing_only  # Build rows from category hits; fetch product pages only when incomplete
+        self.required_fields = required_fields  # Columns a listing row needs to skip its product page
+        self.data_routes = data_routes  # Fetch /_next/data/<build id>/... JSON instead of HTML where possible
+        self.build_id: Optional[str] = None  # Next.js build id the data routes are requested with
+        self._data_route_failures = 0
+        self.products_in_flight = 0
+        self.url_queue: Optional[asyncio.Queue] = None
+        self.dead_letter_file = dead_letter_file  # Failed URLs with their reason for a deferred retry; None disables it
+        self.retry_failed = retry_failed  # Retry the dead-letter queue in a deferred pass at the end of a run
+        # Fails requests to an endpoint fast while most of its recent requests failed
+        self.breaker = breaker or CircuitBreaker()
+        self._circuit_deadline: Optional[float] = None  # While set, requests wait for open circuits until then
+        if shard:
+            self.intermediate_file = shard.filename(self.intermediate_file)
+            self.frontier_file = frontier_file and shard.filename(frontier_file)
+            self.delta_file = delta_file and shard.filename(delta_file)
+            self.dead_letter_file = dead_letter_file and shard.filename(dead_letter_file)
+        self.store = None
+        self.writer = None
+        self.frontier = None
+        self.cache = None
+        self.delta = None
+        self.dead_letters = None
+        self.parse_pool = None
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(headers=HEADERS)
-        self.processed_urls = await load_processed_urls(self.intermediate_file)
+        await self.transport.open()
+        self.store = ProductStore(self.intermediate_file, segment_size=self.segment_size)
+        await asyncio.to_thread(self.store.open)
+        legacy_file = resolve_path(LEGACY_INTERMEDIATE_FILE)
+        if not self.shard and not len(self.store) and os.path.exists(legacy_file):
+            count = await asyncio.to_thread(self.store.import_jsonl, legacy_file)
+            logger.info(f"Imported {count} records from legacy file {legacy_file}.")
+        self.processed_urls = ProductIdSet.from_product_ids(self.store.index)
         logger.info(f"Loaded {len(self.processed_urls)} processed URLs.")
+        if self.shard:
+            logger.info(f"Running shard {self.shard}, storing products in {self.store.directory}.")
+        self.writer = IntermediateWriter(
+            self.store,
+            batch_size=self.batch_size,
+            flush_interval=self.flush_interval,
+            durability=self.durability,
+            queue_size=self.queue_size,
+            metrics=self.metrics,
+            on_flush=self._on_batch_saved,
+        )
+        await self.writer.start()
+        self._register_gauges()
+
+        if self.frontier_file:
+            self.frontier = Frontier(self.frontier_file).open()
+            self.frontier.reconcile(self.processed_urls)
+            logger.info(f"Crawl frontier: {self.frontier.stats()}")
+
+        if self.cache_dir:
+            self.cache = await asyncio.to_thread(ResponseCache(self.cache_dir, self.cache_size).open)
+
+        if self.delta_file:
+            self.delta = DeltaTracker(self.delta_file).open()
+
+        if self.dead_letter_file:
+            self.dead_letters = DeadLetterQueue(self.dead_letter_file).open()
+
+        if self.parse_workers > 0:
+            # Forking this process would copy its logging, writer and SQLite threads' locks mid-use
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self.parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers, mp_context=multiprocessing.get_context(start_method)
+            )
+            logger.info(f"Parsing pages in {self.parse_workers} worker processes.")
         return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.session.close()
+    def _register_gauges(self):
+        self.metrics.gauge("requests_in_flight", lambda: self.rate_controller.in_flight)
+        self.metrics.gauge("concurrency_limit", lambda: int(self.rate_controller.limit))
+        if isinstance(self.rate_controller, AdaptiveRateController):
+            self.metrics.gauge("request_rate", lambda: self.rate_controller.rate)
+        self.metrics.gauge("products_in_flight", lambda: self.products_in_flight)
+        self.metrics.gauge("url_queue_depth", lambda: self.url_queue.qsize() if self.url_queue else 0)
+        self.metrics.gauge("writer_queue_depth", lambda: self.writer.queue.qsize())
+        self.metrics.gauge("records_written", lambda: self.writer.records_written)
+        self.metrics.gauge("processed_products", lambda: len(self.processed_urls))
+        self.metrics.gauge("processed_index_bytes", lambda: self.processed_urls.nbytes)
+        self.metrics.gauge("http_requests", lambda: self.transport.requests)
+        self.metrics.gauge("http_connections_opened", lambda: self.transport.connections_opened)
+        self.metrics.gauge("http_connections_reused", lambda: self.transport.connections_reused)
+        self.metrics.gauge("http_bytes_read", lambda: self.transport.bytes_read)
+        for stat in ("hits", "misses", "bytes_saved", "evictions"):
+            self.metrics.gauge(f"cache_{stat}", lambda stat=stat: getattr(self.cache, stat) if self.cache else 0)
+        self.metrics.gauge("open_circuits", self.breaker.open_circuits)
+        self.metrics.gauge("dead_letters", lambda: len(self.dead_letters) if self.dead_letters is not None else 0)
 
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # Drain queued records first so nothing is lost on errors or Ctrl-C
+        try:
+            await self.writer.close()
+        finally:
+            if self.frontier:
+                self.frontier.close()
+            if self.cache:
+                self.cache.close()
+            if self.delta:
+                self.delta.close()
+            if self.dead_letters is not None:
+                if len(self.dead_letters):
+                    logger.warning(
+                        f"{len(self.dead_letters)} failed URLs are in the dead-letter queue: "
+                        f"{self.dead_letters.stats()}. Retry them with --retry-failed."
+                    )
+                self.dead_letters.close()
+            if self.parse_pool:
+                self.parse_pool.shutdown(cancel_futures=True)
+            await self.transport.close()
+            flush_progress(logger)
+
+    # Few, short retries: URLs that still fail go to the dead-letter queue and are retried at the end of the run
     @tenacity.retry(
-        wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
-        stop=tenacity.stop_after_attempt(3),
-        retry=tenacity.retry_if_exception_type(aiohttp.ClientError),
+        wait=tenacity.wait_exponential(multiplier=1, min=FETCH_RETRY_WAIT_MIN, max=FETCH_RETRY_WAIT_MAX),
+        stop=tenacity.stop_after_attempt(FETCH_ATTEMPTS),
+        retry=tenacity.retry_if_exception(is_retryable),
+        before_sleep=count_retry,
+        reraise=True,
     )
-    async def fetch(self, url: str) -> str:
-        async with self.semaphore:
-            async with self.session.get(url) as response:
-                response.raise_for_status()
-                return await response.text()
+    async def fetch(self, url: str) -> bytes:
+        endpoint = await self._admit(url)
+        failed = None
+        try:
+            async with self.rate_controller.slot() as slot:
+                self.metrics.observe("rate_wait", slot.waited)
+                with self.metrics.timer("fetch"):
+                    if self.cache:
+                        body = await self._fetch_cached(url, slot)
+                    else:
+                        async with self.transport.get(self.request_url(url)) as response:
+                            slot.status = response.status
+                            response.raise_for_status()
+                            body = await self.transport.read(response)
+        except Exception as e:
+            failed = is_failure(e)
+            raise
+        else:
+            failed = False
+            return body
+        finally:
+            self.breaker.record(endpoint, failed)
+
+    async def _admit(self, url: str) -> str:
+        """
+        Passes a request through the circuit breaker. An open circuit rejects it right away,
+        except during the retry pass, which waits for the circuit to close up to a deadline.
+        """
+        while True:
+            try:
+                return self.breaker.check(url)
+            except CircuitOpenError as e:
+                self.metrics.inc("circuit_rejections")
+                if self._circuit_deadline is None or time.monotonic() + e.retry_in > self._circuit_deadline:
+                    raise
+                await asyncio.sleep(max(e.retry_in, 0.1))
+
+    async def _fetch_cached(self, url: str, slot: Slot) -> bytes:
+        """
+        Revalidates a cached response with a conditional request; a 304 answer is served from the cache.
+        """
+        headers = await asyncio.to_thread(self.cache.conditional_headers, url)
+        async with self.transport.get(self.request_url(url), headers=headers) as response:
+            slot.status = response.status
+            if response.status != 304:
+                return await self._read_and_cache(url, response)
+            body = await asyncio.to_thread(self.cache.get, url)
+            if body is not None:
+                return body
+
+        # The entry was evicted after the conditional headers were built
+        async with self.transport.get(self.request_url(url)) as response:
+            slot.status = response.status
+            return await self._read_and_cache(url, response)
+
+    def request_url(self, url: str) -> str:
+        """
+        Maps a store URL onto base_url. Product and category URLs keep the store origin in the data either way.
+        """
+        if self.base_url != BASE_URL and url.startswith(BASE_URL):
+            return self.base_url + url[len(BASE_URL) :]
+        return url
+
+    async def _read_and_cache(self, url: str, response: aiohttp.ClientResponse) -> bytes:
+        response.raise_for_status()
+        body = await self.transport.read(response)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        await asyncio.to_thread(self.cache.put, url, body, etag, last_modified)
+        return body
 
     async def get_product_urls(self) -> List[str]:
         logger.info("Fetching categories...")
         categories = await self.get_categories()
         logger.info(f"Found {len(categories)} categories.")
         product_urls = []
+        seen = ProductIdSet()
 
         tasks = [self.get_products_in_category(category_url) for category_url in categories]
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -54,14 +338,22 @@ class IgefaScraper:
             if isinstance(result, Exception):
                 logger.error(f"Error fetching products in category: {result}")
                 continue
-            product_urls.extend(result)
+            # Products listed in several categories are kept once
+            product_urls.extend(url for url in result if seen.add(url))
 
         logger.info(f"Total product URLs found: {len(product_urls)}")
         return product_urls
 
     async def get_categories(self) -> List[str]:
+        if self.frontier:
+            categories = self.frontier.categories()
+            if categories is not None:
+                logger.info(f"Resuming with {len(categories)} categories from the crawl frontier.")
+                return categories
+
         try:
             html = await self.fetch(BASE_URL)
+            self._learn_build_id(html)
             soup = BeautifulSoup(html, "lxml")
 
             category_links = soup.select(
@@ -71,108 +363,299 @@ class IgefaScraper:
 
             categories = [BASE_URL + link.get("href") for link in category_links]
             logger.info(f"Processed {len(categories)} category URLs.")
+            if self.frontier and categories:
+                self.frontier.add_categories(categories)
             return categories
         except Exception as e:
             logger.error(f"Error fetching categories: {e}")
             return []
 
     async def get_products_in_category(self, category_url: str) -> List[str]:
-        logger.info(f"Fetching products in category: {category_url}")
         product_urls = []
-        page = 1
-
-        while True:
-            page_url = f"{category_url}?page={page}"
-            logger.info(f"Fetching page {page} of category: {page_url}")
-            try:
-                html = await self.fetch(page_url)
-                soup = BeautifulSoup(html, "lxml")
-
-                # Find <script id="__NEXT_DATA__"> and extract JSON
-                next_data_script = soup.find("script", id="__NEXT_DATA__")
-                if not next_data_script:
-                    logger.warning(f"Cannot find <script id='__NEXT_DATA__'> on page {page_url}.")
-                    break
-
-                next_data_json = next_data_script.string
-                if not next_data_json:
-                    logger.warning(f"<script id='__NEXT_DATA__'> is empty on page {page_url}.")
-                    break
-
-                data = json.loads(next_data_json)
-                # Extract products from the page
-                products = extract_products_from_next_data(data)
-                logger.info(f"Category {category_url}, Page {page}: Found {len(products)} products.")
-
-                if not products:
-                    logger.info(f"No products found in category {category_url} on page {page}. Ending pagination.")
-                    break
-
-                for product in products:
-                    product_url = product.get("Supplier-URL")
-                    if product_url and not product_url.startswith("http"):
-                        product_url = BASE_URL + product_url
-                    if product_url:
-                        product_urls.append(product_url)
-
-                # Check if there are more pages
-                total = data["props"]["initialProps"]["pageProps"]["initialProductData"].get("total", 0)
-                items_per_page = 20  # Assuming 20 products per page
-                if total <= page * items_per_page:
-                    logger.info(f"No more pages in category {category_url}.")
-                    break
-
-                page += 1
-            except Exception as e:
-                logger.error(f"Error fetching products in category {category_url}, page {page}: {e}")
-                break
+        async for page_urls in self.iter_products_in_category(category_url):
+            product_urls.extend(page_urls)
 
         logger.info(f"Category {category_url}: Total products found: {len(product_urls)}")
         return product_urls
 
-    async def scrape_product(self, url: str):
-        if url in self.processed_urls:
-            logger.info(f"Skipping already processed URL: {url}")
+    async def iter_products_in_category(self, category_url: str) -> AsyncIterator[List[str]]:
+        """
+        Yields the product URLs of a category page by page.
+        Page 1 reports the total and the page size, so all remaining pages are then fetched concurrently
+        (bounded by the global request limit) and yielded in completion order.
+        With a crawl frontier, pages finished in an earlier run are skipped and only product URLs
+        that are new to the frontier and not scraped yet are yielded.
+        """
+        status, total, page_size = self.frontier.category(category_url) if self.frontier else (None, 0, 0)
+        if status == Status.DONE:
+            logger.info(f"Category {category_url} already discovered. Skipping.")
             return
 
-        try:
-            logger.info(f"Scraping product URL: {url}")
-            html = await self.fetch(url)
-            soup = BeautifulSoup(html, "lxml")
-
-            # Find <script id="__NEXT_DATA__"> and extract JSON
-            next_data_script = soup.find("script", id="__NEXT_DATA__")
-            if not next_data_script:
-                logger.warning(f"Cannot find <script id='__NEXT_DATA__'> on product page: {url}")
+        if page_size:
+            pages = self.frontier.pending_pages(category_url)
+            logger.info(f"Resuming category {category_url}: {len(pages)} pages left.")
+        else:
+            logger.info(f"Fetching products in category: {category_url}")
+            first_page = await self.fetch_category_page(category_url, 1)
+            if first_page is None:
                 return
-            next_data_json = next_data_script.string
-            if not next_data_json:
-                logger.warning(f"<script id='__NEXT_DATA__'> is empty on product page: {url}")
+            page_urls, total, page_size = first_page
+            yield page_urls
+
+            if page_size <= 0 or total <= page_size:
+                logger.info(f"No more pages in category {category_url}.")
                 return
-            data = json.loads(next_data_json)
 
-            # Extract detailed product information from JSON
-            product_data = extract_product_details_from_next_data(data)
-            if product_data:
-                await save_intermediate_data(self.intermediate_file, product_data)
-                self.processed_urls.add(url)
-                logger.info(f"Successfully scraped: {url}")
-                await asyncio.sleep(random.uniform(0.5, 2.0))  # Delay between requests
+            n_pages = count_pages(total, page_size)
+            logger.info(f"Category {category_url}: {total} products on {n_pages} pages of {page_size}.")
+            pages = range(2, n_pages + 1)
+
+        tasks = [asyncio.create_task(self.fetch_category_page(category_url, page)) for page in pages]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                result = await next_page
+                if result is not None:
+                    yield result[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def parse(self, parse_page: Callable[[bytes, str], T], body: bytes, url: str) -> T:
+        """
+        Runs a page parser from igefa_scraper.pages in the parse pool, or on the event loop without one.
+        With metrics enabled, "parse" is the wall time including the wait for a pool worker,
+        and the parser reports its locate / json_decode / soup / extract stages separately.
+        """
+        if not self.metrics.enabled:
+            if self.parse_pool is None:
+                return parse_page(body, url)
+            return await asyncio.get_running_loop().run_in_executor(self.parse_pool, parse_page, body, url)
+
+        with self.metrics.timer("parse"):
+            if self.parse_pool is None:
+                result, timings = parse_timed(parse_page, body, url)
             else:
+                loop = asyncio.get_running_loop()
+                result, timings = await loop.run_in_executor(self.parse_pool, parse_timed, parse_page, body, url)
+        for stage, seconds in timings.items():
+            self.metrics.observe(stage, seconds)
+        return result
+
+    async def fetch_page(self, url: str, parse_page: Callable[[bytes, str], T]) -> Optional[T]:
+        """
+        Fetches and parses a page. With data routes enabled and a build id known, the page's Next.js JSON data route
+        is requested instead of the HTML. If the route 404s or has no usable data, e.g. because the build id rotated,
+        the HTML page is fetched instead and its build id is picked up for the following requests.
+        """
+        failed_build_id = None
+        if self.data_routes and self.build_id:
+            build_id = self.build_id
+            data_url = data_route_url(url, build_id)
+            try:
+                body = await self.fetch(data_url)
+            except CircuitOpenError:
+                pass  # The data routes are struggling, the HTML pages may not be
+            except aiohttp.ClientResponseError as e:
+                if e.status != 404:
+                    raise
+                failed_build_id = build_id
+            else:
+                parsed = await self.parse(parse_page, body, data_url)
+                if parsed is not None:
+                    self._data_route_failures = 0
+                    self.metrics.inc("data_route_pages")
+                    return parsed
+                failed_build_id = build_id
+            self.metrics.inc("data_route_fallbacks")
+            logger.debug(f"Data route of {url} failed. Falling back to HTML.")
+
+        html = await self.fetch(url)
+        build_id = self._learn_build_id(html)
+        if failed_build_id and build_id in (None, failed_build_id):
+            # The route failed under the current build, not because the build rotated
+            self._data_route_failed()
+        return await self.parse(parse_page, html, url)
+
+    def _learn_build_id(self, html: bytes) -> Optional[str]:
+        if not self.data_routes:
+            return None
+        build_id = find_build_id(html)
+        if build_id and build_id != self.build_id:
+            logger.info(f"Next.js build id {build_id}: fetching data routes instead of HTML.")
+            self.build_id = build_id
+            self._data_route_failures = 0
+        return build_id
+
+    def _data_route_failed(self):
+        self._data_route_failures += 1
+        if self._data_route_failures >= DATA_ROUTE_MAX_FAILURES:
+            logger.warning(
+                f"{self._data_route_failures} data routes in a row failed under build id {self.build_id}. "
+                "Fetching HTML pages from now on."
+            )
+            self.data_routes = False
+
+    async def fetch_category_page(self, category_url: str, page: int) -> Optional[Tuple[List[str], int, int]]:
+        """
+        Fetches one page of a category and records the outcome in the crawl frontier.
+        Returns:
+            Optional[Tuple[List[str], int, int]]: (product URLs, total, page size), or None if the page failed.
+        """
+        page_url = f"{category_url}?page={page}"
+        logger.debug(f"Fetching page {page} of category: {page_url}")
+        try:
+            # Extract products and pagination from <script id="__NEXT_DATA__"> or the data route
+            parse_page = parse_listing_page if self.listing_only else parse_category_page
+            if self.delta:
+                parse_page = functools.partial(parse_page, fingerprints=True)
+            parsed = await self.fetch_page(page_url, parse_page)
+            if parsed is None:
+                self._fail_category_page(category_url, page, "Missing __NEXT_DATA__")
+                return None
+
+            listing, total, page_size = parsed[:3]
+            logger.info(
+                f"Category {category_url}, Page {page}: Found {len(listing)} products.",
+                extra={"event": "category pages"},
+            )
+            n_pages = count_pages(total, page_size) if listing else 1
+            if self.shard:
+                # Every shard walks all listings, so a product is always found by the shard that owns it
+                listing = {url: value for url, value in listing.items() if self.shard.owns(url)}
+            page_urls = list(listing)
+            if self.delta:
+                # Unchanged listings need no product page request
+                page_urls = self.delta.select(listing)
+            if self.listing_only:
+                page_urls = await self._save_listing_records(page_urls, parsed[3])
+            if self.frontier:
+                if page == 1:
+                    self.frontier.set_category_pages(category_url, total, page_size, n_pages)
+                processed_urls = None if self.delta else self.processed_urls
+                page_urls = self.frontier.complete_page(category_url, page, page_urls, processed_urls)
+            self.metrics.inc("category_pages")
+            if self.dead_letters is not None:
+                self.dead_letters.remove(page_url)
+            return page_urls, total, page_size
+        except Exception as e:
+            logger.error(f"Error fetching products in category {category_url}, page {page}: {e}")
+            self._fail_category_page(
+                category_url, page, failure_reason(e), attempted=not isinstance(e, CircuitOpenError)
+            )
+            return None
+
+    def _fail_category_page(self, category_url: str, page: int, reason: str, attempted: bool = True):
+        self.metrics.inc("category_pages_failed")
+        if self.frontier:
+            self.frontier.fail_page(category_url, page, reason)
+        if self.dead_letters is not None:
+            page_url = f"{category_url}?page={page}"
+            self.dead_letters.add(page_url, reason, Kind.CATEGORY_PAGE, category_url, page, attempted=attempted)
+
+    async def _save_listing_records(self, urls: List[str], records: Dict[str, Dict]) -> List[str]:
+        """
+        Saves the listing rows that have every required field.
+        Returns:
+            List[str]: The URLs whose product page still has to be fetched.
+        """
+        remaining = []
+        for url in urls:
+            record = records.get(url)
+            if record is None or self.is_done(url):
+                remaining.append(url)
+                continue
+            missing = missing_fields(record, self.required_fields)
+            if missing:
+                logger.debug(f"Listing row of {url} lacks {', '.join(missing)}. Fetching the product page.")
+                self.metrics.inc("listing_rows_incomplete")
+                remaining.append(url)
+                continue
+            await self.save_product(url, record)
+            self.metrics.inc("products_from_listing")
+        return remaining
+
+    async def fetch_product(self, url: str) -> Optional[Dict]:
+        """
+        Fetches a product page and extracts its details. Errors are logged and reported as None.
+        """
+        product_data, _, _ = await self._fetch_product(url)
+        return product_data
+
+    async def _fetch_product(self, url: str) -> Tuple[Optional[Dict], Optional[str], bool]:
+        """
+        Returns:
+            Tuple[Optional[Dict], Optional[str], bool]: (product details, reason of the failure, whether
+                a request was sent). The details are None on failure.
+        """
+        try:
+            logger.debug(f"Scraping product URL: {url}")
+            # Extract detailed product information from <script id="__NEXT_DATA__"> or the data route
+            product_data = await self.fetch_page(url, parse_product_page)
+            if not product_data:
                 logger.warning(f"No data scraped for URL: {url}")
+                return None, "No product data", True
+            return product_data, None, True
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
+            return None, failure_reason(e), not isinstance(e, CircuitOpenError)
+
+    def is_done(self, url: str) -> bool:
+        """
+        True if the product is in the product store and, in delta mode, its listing has not changed since.
+        """
+        return url in self.processed_urls and not (self.delta and self.delta.needs_scrape(url))
+
+    async def scrape_product(self, url: str):
+        if self.is_done(url):
+            logger.info(f"Skipping already processed URL: {url}", extra={"event": "products skipped"})
+            self.metrics.inc("products_skipped")
+            if self.frontier:
+                self.frontier.complete_product(url)
+            return
+
+        self.products_in_flight += 1
+        try:
+            if self.frontier:
+                self.frontier.start_product(url)
+            product_data, reason, attempted = await self._fetch_product(url)
+            if product_data:
+                await self.save_product(url, product_data)
+            else:
+                self.metrics.inc("products_failed")
+                if self.frontier:
+                    self.frontier.fail_product(url, reason)
+                if self.dead_letters is not None:
+                    self.dead_letters.add(url, reason, attempted=attempted)
+        finally:
+            self.products_in_flight -= 1
+
+    async def save_product(self, url: str, product_data: Dict):
+        with self.metrics.timer("save"):
+            await self.writer.put(product_data, url)
+            self.processed_urls.add(url)
+        self.metrics.inc("products_saved")
+        logger.info(f"Successfully scraped: {url}", extra={"event": "products saved"})
 
     async def run(self):
+        if self.streaming:
+            await self.run_streaming()
+            return
+
         logger.info("Starting scraper...")
         product_urls = await self.get_product_urls()
+        if self.frontier:
+            # Includes products discovered by an interrupted run that were never scraped
+            product_urls = self.frontier.pending_products()
         logger.info(f"Found {len(product_urls)} product URLs.")
 
         if not product_urls:
             logger.info("No products found. Exiting scraper.")
+            await self._retry_pass()
+            await self._finish_crawl()
             return
 
-        tasks = [self.scrape_product(url) for url in product_urls if url not in self.processed_urls]
+        seen = ProductIdSet()
+        tasks = [self.scrape_product(url) for url in product_urls if not self.is_done(url) and seen.add(url)]
 
         if tasks:
             logger.info(f"Starting to scrape {len(tasks)} products...")
@@ -180,3 +663,165 @@ class IgefaScraper:
             logger.info("Scraping completed.")
         else:
             logger.info("No new products to scrape.")
+        await self._retry_pass()
+        await self._finish_crawl()
+
+    async def _retry_pass(self):
+        if self.retry_failed and self.dead_letters is not None and len(self.dead_letters):
+            await self.retry_dead_letters()
+
+    async def retry_dead_letters(self, max_attempts: Optional[int] = DEAD_LETTER_MAX_ATTEMPTS) -> int:
+        """
+        Retries the URLs in the dead-letter queue: failed category pages first, then failed products,
+        including the ones listed on the recovered pages. Requests wait for open circuits to close, up to
+        CIRCUIT_MAX_OPEN_SECONDS, instead of failing fast. URLs that fail again stay in the queue.
+        Args:
+            max_attempts (Optional[int]): Skip entries that already failed this many times; None retries all.
+        Returns:
+            int: Number of URLs recovered.
+        """
+        if self.dead_letters is None:
+            return 0
+        entries = await asyncio.to_thread(self.dead_letters.entries, max_attempts)
+        if not entries:
+            return 0
+        logger.info(f"Retrying {len(entries)} failed URLs from the dead-letter queue...")
+        self._circuit_deadline = time.monotonic() + CIRCUIT_MAX_OPEN_SECONDS
+        try:
+            product_urls = []
+
+            async def retry_page(entry: DeadLetter):
+                if entry.page == 1:
+                    # The rest of the category was never paginated
+                    async for urls in self.iter_products_in_category(entry.category_url):
+                        product_urls.extend(urls)
+                    return
+                result = await self.fetch_category_page(entry.category_url, entry.page)
+                if result:
+                    product_urls.extend(result[0])
+
+            pages = [entry for entry in entries if entry.kind == Kind.CATEGORY_PAGE]
+            await self._run_workers(pages, retry_page)
+            product_urls.extend(entry.url for entry in entries if entry.kind == Kind.PRODUCT)
+
+            seen = ProductIdSet()
+            retry_urls = []
+            for url in product_urls:
+                if self.is_done(url):
+                    self.dead_letters.remove(url)  # Saved since it failed, e.g. listed again under another category
+                elif seen.add(url):
+                    retry_urls.append(url)
+            await self._run_workers(retry_urls, self.scrape_product)
+            await self.writer.flush()  # Saved products leave the queue once their records are written
+        finally:
+            self._circuit_deadline = None
+
+        # Entries that failed again are still queued; products first seen on a recovered page do not count
+        recovered = sum(1 for entry in entries if entry.url not in self.dead_letters)
+        self.metrics.inc("dead_letters_recovered", recovered)
+        logger.info(f"Dead-letter queue: {recovered} URLs recovered, {len(self.dead_letters)} still failing.")
+        return recovered
+
+    def _on_batch_saved(self, saved: List[Tuple[str, Dict]]):
+        """
+        Runs in the writer thread once a batch of (URL, record) pairs is in the product store.
+        """
+        if self.delta:
+            self.delta.record_many(saved)
+        if self.frontier:
+            for url, _ in saved:
+                self.frontier.complete_product(url)
+            self.frontier.flush_products()
+        if self.dead_letters is not None:
+            for url, _ in saved:
+                self.dead_letters.remove(url)
+            self.dead_letters.flush()
+
+    async def _finish_crawl(self):
+        await self.writer.flush()  # Products are done once their records are in the store
+        if self.frontier and await asyncio.to_thread(self.frontier.crawl_finished):
+            self.frontier.mark_complete()
+            logger.info(f"Crawl complete: {self.frontier.stats()}. The next run starts a new crawl.")
+
+    async def run_streaming(self):
+        """
+        Runs discovery, product scraping and saving as concurrent stages connected by bounded queues:
+        category pagination -> url_queue -> product workers -> writer queue -> IntermediateWriter.
+        """
+        logger.info(f"Starting streaming scraper with {self.workers} workers...")
+        url_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.url_queue = url_queue
+
+        workers = [asyncio.create_task(self._product_worker(url_queue)) for _ in range(self.workers)]
+        try:
+            queued = await self._discover_products(url_queue)
+            await url_queue.join()
+            logger.info(f"Scraping completed. {queued} products queued.")
+            await self._retry_pass()
+            await self._finish_crawl()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _discover_products(self, url_queue: asyncio.Queue) -> int:
+        seen = ProductIdSet()  # Products listed in several categories are queued once
+        queued = 0
+        if self.frontier:
+            # Products discovered by an interrupted run go first
+            for url in self.frontier.pending_products():
+                if not self.is_done(url) and seen.add(url):
+                    await url_queue.put(url)
+                    queued += 1
+
+        logger.info("Fetching categories...")
+        categories = await self.get_categories()
+        logger.info(f"Found {len(categories)} categories.")
+
+        async def produce(category_url: str) -> int:
+            queued = 0
+            async for page_urls in self.iter_products_in_category(category_url):
+                for url in page_urls:
+                    if self.is_done(url) or not seen.add(url):
+                        continue
+                    await url_queue.put(url)  # Blocks while the workers are behind
+                    queued += 1
+            return queued
+
+        results = await asyncio.gather(*(produce(category_url) for category_url in categories), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching products in category: {result}")
+                continue
+            queued += result
+        return queued
+
+    async def _product_worker(self, url_queue: asyncio.Queue):
+        await self._queue_worker(url_queue, self.scrape_product)
+
+    async def _queue_worker(self, queue: asyncio.Queue, handle: Callable[[T], Awaitable[None]]):
+        while True:
+            item = await queue.get()
+            try:
+                await handle(item)
+            except Exception:
+                # A dead worker would leave the producer blocked on a full queue
+                logger.exception(f"Worker failed on {item}")
+            finally:
+                queue.task_done()
+
+    async def _run_workers(self, items: Iterable[T], handle: Callable[[T], Awaitable[None]]):
+        """
+        Runs handle on every item with a fixed pool of workers fed through a bounded queue, like run_streaming,
+        instead of one task per item.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        workers = [asyncio.create_task(self._queue_worker(queue, handle)) for _ in range(self.workers)]
+        try:
+            for item in items:
+                await queue.put(item)
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
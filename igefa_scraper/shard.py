@@ -0,0 +1,103 @@
+import os
+from typing import List
+
+from .constants import INTERMEDIATE_STORE, WRITER_BATCH_SIZE
+from .logger import main_logger as logger
+from .idset import product_key
+from .store import ProductStore
+from .utils import resolve_path
+
+
+class Shard:
+    """
+    One slice of a sharded crawl, written as "i/N" with 1 <= i <= N.
+
+    Products are partitioned by a stable hash of their product id, so every shard scrapes a disjoint set
+    and together they cover the whole catalogue without talking to each other.
+    Each shard keeps its own product store, frontier and delta state next to the unsharded files.
+    """
+
+    def __init__(self, index: int, count: int):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Invalid shard {index}/{count}: expected 1 <= i <= N.")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        try:
+            index, count = (int(part) for part in spec.split("/"))
+        except ValueError:
+            raise ValueError(f"Invalid shard '{spec}': expected i/N, e.g. 1/4.") from None
+        return cls(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def __repr__(self) -> str:
+        return f"Shard({self.index}, {self.count})"
+
+    def owns(self, url: str) -> bool:
+        """
+        True if the product behind a URL belongs to this shard.
+        """
+        return shard_of(url, self.count) == self.index
+
+    def filename(self, filename: str) -> str:
+        """
+        Returns the per-shard variant of a data file name,
+        e.g. frontier.sqlite3 -> frontier.shard-1-of-4.sqlite3 and intermediate_data -> intermediate_data.shard-1-of-4.
+        """
+        root, ext = os.path.splitext(filename)
+        return f"{root}.shard-{self.index}-of-{self.count}{ext}"
+
+
+def shard_of(url: str, count: int) -> int:
+    """
+    Returns the 1-based shard that owns a product URL. Uses the product's blake2b fingerprint rather than hash(),
+    which is salted per process.
+    """
+    return product_key(url) % count + 1
+
+
+def shard_stores(count: int, intermediate_file: str = INTERMEDIATE_STORE) -> List[str]:
+    return [Shard(index, count).filename(intermediate_file) for index in range(1, count + 1)]
+
+
+def merge_shards(count: int, intermediate_file: str = INTERMEDIATE_STORE, batch_size: int = WRITER_BATCH_SIZE) -> int:
+    """
+    Appends the latest record of every product in the shard stores to the product store.
+    The store keeps one live record per product id, so merging again or overlapping shards cannot create duplicates.
+    Records that replace one already in the product store leave dead copies behind, so the store is compacted
+    afterwards; merging twice does not double its size.
+    Args:
+        count (int): Number of shards of the crawl.
+        intermediate_file (str): Product store directory the shards are merged into.
+        batch_size (int): Records per append.
+    Returns:
+        int: Number of records merged.
+    """
+    merged = 0
+    replaced = 0
+    with ProductStore(intermediate_file) as target:
+        for shard_file in shard_stores(count, intermediate_file):
+            if not os.path.exists(resolve_path(shard_file)):
+                logger.warning(f"Shard store {resolve_path(shard_file)} does not exist. Skipping.")
+                continue
+            with ProductStore(shard_file) as source:
+                replaced += sum(product_id in target for product_id in source.index)
+                batch = []
+                for data in source.iter_records():
+                    batch.append(data)
+                    if len(batch) >= batch_size:
+                        target.append(batch)
+                        batch = []
+                if batch:
+                    target.append(batch)
+                logger.info(f"Merged {len(source)} products from {source.directory}.")
+                merged += len(source)
+        if replaced:
+            logger.info(f"{replaced} merged products replaced stored records. Compacting the product store.")
+            target.compact()
+    logger.info(f"Merged {merged} records from {count} shards into {resolve_path(intermediate_file)}.")
+    return merged
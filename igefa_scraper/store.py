@@ -0,0 +1,337 @@
+import gzip
+import json
+import os
+import re
+import shutil
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .constants import INTERMEDIATE_STORE, SEGMENT_SIZE
+from .logger import main_logger as logger
+from .parser import product_id_from_url
+from .utils import resolve_path
+
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{6})\.jsonl(\.gz)?$")
+INDEX_FILE = "index.tsv"
+
+
+class ProductStore:
+    """
+    Append-only product store made of rolling JSONL segments.
+
+    The active segment is plain JSONL so that a crash never leaves a half-written compressed stream.
+    Once it grows past segment_size bytes it is sealed into a gzip-compressed segment.
+    index.tsv maps every product id to the segment and uncompressed offset of its latest record,
+    so resume and export only need the index plus the live records, not a JSON parse of every row ever written.
+    """
+
+    def __init__(self, directory: str = INTERMEDIATE_STORE, segment_size: int = SEGMENT_SIZE):
+        self.directory = resolve_path(directory)
+        self.segment_size = segment_size
+        self.index: Dict[str, Tuple[int, int, str]] = {}  # product id -> (segment, offset, Supplier-URL)
+        self.rows_written = 0
+        self._segment = 0
+        self._file = None
+        self._offset = 0
+        self._compacting = False
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def open(self) -> "ProductStore":
+        os.makedirs(self.directory, exist_ok=True)
+        indexed_segment, indexed_offset = self._load_index()
+        segments = self._segments()
+
+        # Records written after the last index save are re-indexed from the segment tail only
+        end = 0
+        for segment, compressed in segments:
+            if segment < indexed_segment:
+                continue
+            end = indexed_offset if segment == indexed_segment else 0
+            for offset, line in self._read_segment(segment, compressed, end):
+                self._index_line(segment, offset, line)
+                end = offset + len(line)
+
+        self._segment = segments[-1][0] if segments else 1
+        if segments and segments[-1][1]:
+            self._segment += 1  # Last segment is sealed, start a new one
+        path = self._segment_path(self._segment)
+        self._file = open(path, "ab")
+        if segments and not segments[-1][1] and self._file.tell() > end:
+            self._file.truncate(end)  # Drop a torn write left by a crash
+            self._file.seek(end)
+        self._offset = self._file.tell()
+        return self
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        self._save_index()
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def __enter__(self) -> "ProductStore":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ------------------------------------------------------------------ writing
+
+    def append(self, records: List[Dict]):
+        """
+        Appends records to the active segment and points the index at them.
+        """
+        lines = []
+        for data in records:
+            line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+            self._index_line(self._segment, self._offset, line, data)
+            lines.append(line)
+            self._offset += len(line)
+        self._file.write(b"".join(lines))
+        self.rows_written += len(records)
+
+        if self._offset >= self.segment_size:
+            self._roll()
+
+    def flush(self, fsync: bool = False):
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def _roll(self):
+        self._file.close()
+        self._seal(self._segment)
+        self._segment += 1
+        self._file = open(self._segment_path(self._segment), "ab")
+        self._offset = 0
+        if not self._compacting:
+            self._save_index()
+
+    def _seal(self, segment: int):
+        plain_path = self._segment_path(segment)
+        sealed_path = self._segment_path(segment, compressed=True)
+        tmp_path = sealed_path + ".tmp"
+        with open(plain_path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, sealed_path)
+        os.remove(plain_path)
+
+    # ------------------------------------------------------------------ reading
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def urls(self) -> Set[str]:
+        return {url for _, _, url in self.index.values()}
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        location = self.index.get(product_id)
+        if location is None:
+            return None
+        segment, offset, _ = location
+        if segment == self._segment and self._file is not None:
+            self._file.flush()
+        with self._open_segment(segment) as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        Yields the latest record of every product, in write order.
+        """
+        if self._file is not None:
+            self._file.flush()
+        return self._iter_live(self.index, self._segments())
+
+    def _iter_live(self, index: Dict, segments: List[Tuple[int, bool]]) -> Iterator[Dict]:
+        # Dead copies are skipped by offset, so only live records are decoded
+        live: Dict[int, Set[int]] = {}
+        for segment, offset, _ in index.values():
+            live.setdefault(segment, set()).add(offset)
+
+        for segment, compressed in segments:
+            offsets = live.get(segment)
+            if not offsets:
+                continue
+            for offset, line in self._read_segment(segment, compressed, 0):
+                if offset not in offsets:
+                    continue
+                data = self._decode(line)
+                if data is None:
+                    continue
+                location = index.get(self._record_id(data))
+                if location is not None and location[0] == segment and location[1] == offset:
+                    yield data
+
+    def stats(self) -> Dict:
+        segments = self._segments()
+        size = sum(os.path.getsize(self._segment_path(segment, compressed)) for segment, compressed in segments)
+        return {"products": len(self.index), "segments": len(segments), "bytes": size}
+
+    # ------------------------------------------------------------------ compaction
+
+    def compact(self) -> Dict:
+        """
+        Rewrites the store so it only holds the latest record per product.
+        New segments are written before the old ones are removed, so an interrupted compaction loses nothing.
+        """
+        before = self.stats()
+        self._file.flush()
+        old_segments = self._segments()
+        old_index = self.index
+
+        self._file.close()
+        if os.path.getsize(self._segment_path(self._segment)) == 0:
+            os.remove(self._segment_path(self._segment))
+            old_segments = [(segment, compressed) for segment, compressed in old_segments if segment != self._segment]
+        else:
+            self._seal(self._segment)
+        self._segment += 1
+        self._file = open(self._segment_path(self._segment), "ab")
+        self._offset = 0
+        live = self._iter_live(old_index, old_segments)
+
+        # index.tsv keeps describing the old segments until the rewrite is complete
+        self.index = {}
+        self._compacting = True
+        try:
+            batch = []
+            for data in live:
+                batch.append(data)
+                if len(batch) >= 1000:
+                    self.append(batch)
+                    batch = []
+            self.append(batch)
+        except BaseException:
+            self.index = old_index
+            raise
+        finally:
+            self._compacting = False
+        if self._offset:
+            self._roll()  # Seal the compacted data too
+        self.flush(fsync=True)
+        self._save_index()
+
+        for segment, compressed in old_segments:
+            for path in (self._segment_path(segment), self._segment_path(segment, compressed=True)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        after = self.stats()
+        logger.info(
+            f"Compacted product store {self.directory}: {before['bytes']} -> {after['bytes']} bytes, "
+            f"{after['products']} products in {after['segments']} segments."
+        )
+        return after
+
+    # ------------------------------------------------------------------ internals
+
+    def _segment_path(self, segment: int, compressed: bool = False) -> str:
+        name = f"segment-{segment:06d}.jsonl" + (".gz" if compressed else "")
+        return os.path.join(self.directory, name)
+
+    def _segments(self) -> List[Tuple[int, bool]]:
+        """
+        Returns (segment number, compressed) for every segment, oldest first.
+        A plain segment left next to its sealed copy by an interrupted seal is removed.
+        """
+        found: Dict[int, bool] = {}
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if not match:
+                continue
+            segment = int(match.group(1))
+            compressed = bool(match.group(2))
+            if segment in found and segment != self._segment:
+                os.remove(self._segment_path(segment))  # The sealed copy is complete
+                compressed = True
+            found[segment] = found.get(segment, False) or compressed
+        return sorted(found.items())
+
+    def _open_segment(self, segment: int):
+        sealed_path = self._segment_path(segment, compressed=True)
+        if os.path.exists(sealed_path):
+            return gzip.open(sealed_path, "rb")
+        return open(self._segment_path(segment), "rb")
+
+    def _read_segment(self, segment: int, compressed: bool, start: int) -> Iterator[Tuple[int, bytes]]:
+        with self._open_segment(segment) as f:
+            if start:
+                f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn write at the end of a crashed segment
+                yield offset, line
+                offset += len(line)
+
+    @staticmethod
+    def _decode(line: bytes) -> Optional[Dict]:
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to decode line: {line[:200]!r}")
+            return None
+
+    @staticmethod
+    def _record_id(data: Dict) -> str:
+        url = data.get("Supplier-URL") or ""
+        return product_id_from_url(url) or url
+
+    def _index_line(self, segment: int, offset: int, line: bytes, data: Optional[Dict] = None):
+        if data is None:
+            data = self._decode(line)
+            if data is None:
+                return
+        self.index[self._record_id(data)] = (segment, offset, data.get("Supplier-URL") or "")
+
+    def _load_index(self) -> Tuple[int, int]:
+        """
+        Loads index.tsv. Returns the (segment, offset) up to which the store is indexed.
+        """
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return 0, 0
+        with open(path, "r", encoding="utf-8") as f:
+            header = f.readline().split()
+            indexed_segment, indexed_offset = int(header[1]), int(header[2])
+            for line in f:
+                product_id, segment, offset, url = line.rstrip("\n").split("\t")
+                self.index[product_id] = (int(segment), int(offset), url)
+        return indexed_segment, indexed_offset
+
+    def _save_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"# {self._segment} {self._offset}\n")
+            for product_id, (segment, offset, url) in self.index.items():
+                f.write(f"{product_id}\t{segment}\t{offset}\t{url}\n")
+        os.replace(tmp_path, path)
+
+    def import_jsonl(self, path: str) -> int:
+        """
+        Imports a legacy intermediate_data.jsonl file.
+        """
+        count = 0
+        batch = []
+        with open(resolve_path(path), "r", encoding="utf-8") as f:
+            for line in f:
+                data = self._decode(line.encode("utf-8"))
+                if data is None:
+                    continue
+                batch.append(data)
+                if len(batch) >= 1000:
+                    self.append(batch)
+                    count += len(batch)
+                    batch = []
+        self.append(batch)
+        return count + len(batch)
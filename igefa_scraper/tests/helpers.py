@@ -0,0 +1,118 @@
+import json
+from typing import Callable, Dict, List, Optional
+
+from igefa_scraper.constants import BASE_URL
+from igefa_scraper.scraper import IgefaScraper
+
+
+def make_page(data: dict, padding: int = 0) -> bytes:
+    filler = "<div class='x'>" + "lorem ipsum " * padding + "</div>"
+    return (
+        "<!DOCTYPE html><html><head><script src='/_next/static/main.js'></script></head><body>"
+        f'{filler}<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+        "<script>window.x = 1;</script></body></html>"
+    ).encode("utf-8")
+
+
+def make_home_page(category_paths: List[str]) -> bytes:
+    links = "".join(f"<a href='{path}'>{path}</a>" for path in category_paths)
+    return (
+        "<html><body><div class='LYSTypography_color_inherit__25ea4'>Kategorien</div>"
+        f"<div><div>{links}</div></div></body></html>"
+    ).encode("utf-8")
+
+
+def make_hit(product_id: str) -> dict:
+    return {
+        "mainVariant": {"id": product_id, "slug": f"product-{product_id}"},
+        "name": f"Product {product_id}",
+    }
+
+
+def make_listing_hit(product_id: str) -> dict:
+    """
+    Category hit carrying the listing fields of a product page, without description and breadcrumbs.
+    """
+    return {
+        "name": f"Product {product_id}",
+        "sku": f"SKU-{product_id}",
+        "mainVariant": {
+            "id": product_id,
+            "slug": f"product-{product_id}",
+            "gtin": "4024009029110",
+            "images": [{"url": f"https://cdn.example/{product_id}.jpg"}],
+        },
+        "brand": {"name": "Clean and Clever"},
+    }
+
+
+def make_category_data(product_ids: List[str], total: int, make_hit: Callable[[str], dict] = make_hit) -> dict:
+    hits = [make_hit(product_id) for product_id in product_ids]
+    return {"props": {"initialProps": {"pageProps": {"initialProductData": {"hits": hits, "total": total}}}}}
+
+
+def make_product_data(product_id: str) -> dict:
+    return {
+        "props": {
+            "initialProps": {
+                "pageProps": {
+                    "product": {
+                        "name": f"Product {product_id}",
+                        "sku": f"SKU-{product_id}",
+                        "mainVariant": {
+                            "id": product_id,
+                            "slug": f"product-{product_id}",
+                            "gtin": "4024009029110",
+                            "description": "Add --- Main",
+                            "images": [{"url": f"https://cdn.example/{product_id}.jpg"}],
+                        },
+                        "breadcrumbs": {"hierarchy": [{"slug": "hygiene"}, {"slug": "seife"}]},
+                        "brand": {"name": "Clean and Clever"},
+                    }
+                }
+            }
+        }
+    }
+
+
+def product_url(product_id: str) -> str:
+    return f"{BASE_URL}/p/product-{product_id}/{product_id}"
+
+
+def make_catalogue(
+    categories: Dict[str, List[str]], page_size: int = 20, make_hit: Callable[[str], dict] = make_hit
+) -> Dict[str, bytes]:
+    """
+    Builds a {url: body} mapping for a home page, paginated categories and product pages.
+    """
+    pages = {BASE_URL: make_home_page(list(categories))}
+    for path, product_ids in categories.items():
+        total = len(product_ids)
+        n_pages = max(1, -(-total // page_size))
+        for page in range(1, n_pages + 1):
+            chunk = product_ids[(page - 1) * page_size : page * page_size]
+            pages[f"{BASE_URL}{path}?page={page}"] = make_page(make_category_data(chunk, total, make_hit))
+        for product_id in product_ids:
+            pages[product_url(product_id)] = make_page(make_product_data(product_id))
+    return pages
+
+
+class FakeScraper(IgefaScraper):
+    """
+    IgefaScraper serving pages from an in-memory mapping instead of the network.
+    """
+
+    def __init__(self, pages: Dict[str, bytes], intermediate_file: Optional[str] = None, **kwargs):
+        kwargs.setdefault("frontier_file", None)
+        kwargs.setdefault("dead_letter_file", None)
+        super().__init__(**kwargs)
+        self.pages = pages
+        self.requested: List[str] = []
+        if intermediate_file:
+            self.intermediate_file = intermediate_file
+
+    async def fetch(self, url: str) -> bytes:
+        self.requested.append(url)
+        if url not in self.pages:
+            raise KeyError(url)
+        return self.pages[url]
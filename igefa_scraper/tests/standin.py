@@ -0,0 +1,218 @@
+"""
+Local stand-in for store.igefa.de, serving a synthetic catalogue for end-to-end tests and load tests.
+
+Usage:
+    python -m igefa_scraper.tests.standin --port 8080 --categories 20 --products 500 --latency 0.05
+
+Then point a scraper at it with IgefaScraper(base_url="http://127.0.0.1:8080").
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from aiohttp import web
+
+from igefa_scraper.tests.helpers import (
+    make_category_data,
+    make_hit,
+    make_home_page,
+    make_listing_hit,
+    make_page,
+    make_product_data,
+)
+
+CATEGORY_PATH = re.compile(r"^/c/cat-(\d+)$")
+PRODUCT_PATH = re.compile(r"^/p/product-([\w-]+)/([\w-]+)$")
+DATA_ROUTE_PATH = re.compile(r"^/_next/data/([^/]+)(/.*)\.json$")
+
+
+class StandInServer:
+    """
+    aiohttp server with a home page, paginated category pages and product pages in the store's __NEXT_DATA__ format.
+
+    Category i lists the products c{i}p0 ... c{i}p{products-1}. Pages are generated on first request and cached.
+    Every response is delayed by `latency` seconds plus an exponentially distributed jitter with mean `jitter`,
+    and a share of the requests can be answered with 500 (error_rate) or 429 (throttle_rate).
+    With listing_fields, category hits carry name, SKU, GTIN, image and brand for listing-only crawls.
+    Pages embed build_id in their __NEXT_DATA__, and with data_routes their JSON is also served at
+    /_next/data/<build_id>/<path>.json. Assigning a new build_id makes routes with the old one 404.
+    """
+
+    def __init__(
+        self,
+        categories: int = 10,
+        products: int = 100,
+        page_size: int = 20,
+        payload_kb: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        listing_fields: bool = False,
+        data_routes: bool = True,
+        build_id: str = "standin-1",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = 0,
+    ):
+        self.categories = categories
+        self.products = products
+        self.page_size = page_size
+        self.padding = payload_kb * 1024 // 12  # make_page pads with 12-byte words
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.make_hit = make_listing_hit if listing_fields else make_hit
+        self.data_routes = data_routes
+        self.build_id = build_id
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+        self.requests: Counter = Counter()  # "home", "category", "product", "data", "missing" -> count
+        self.statuses: Counter = Counter()
+        self._runner: Optional[web.AppRunner] = None
+        self._data = lru_cache(maxsize=4096)(self._render)
+        self._html = lru_cache(maxsize=4096)(self._render_html)
+        self._json = lru_cache(maxsize=4096)(self._render_json)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def product_count(self) -> int:
+        return self.categories * self.products
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self.handle)
+        return app
+
+    async def start(self) -> "StandInServer":
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StandInServer":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        delay = self.latency + (self.random.expovariate(1 / self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return self._respond(web.Response(status=429, headers={"Retry-After": "1"}))
+        if roll < self.throttle_rate + self.error_rate:
+            return self._respond(web.Response(status=500))
+
+        path, page = request.path, request.query.get("page", "1")
+        match = DATA_ROUTE_PATH.match(path)
+        if match:
+            self.requests["data"] += 1
+            key = self.route(match.group(2), page)
+            if not self.data_routes or match.group(1) != self.build_id or key is None or key[0] == "home":
+                return self._respond(web.Response(status=404))
+            body = self._json(*key, self.build_id)
+            return self._respond(web.Response(body=body, content_type="application/json"))
+
+        key = self.route(path, page)
+        self.requests[key[0] if key else "missing"] += 1
+        if key is None:
+            return self._respond(web.Response(status=404))
+        return self._respond(web.Response(body=self._html(*key, self.build_id), content_type="text/html"))
+
+    def route(self, path: str, page: str) -> Optional[Tuple[str, object, int]]:
+        """
+        Returns the (kind, key, page) of a page path, or None if there is no such page.
+        """
+        if path in ("", "/"):
+            return "home", 0, 0
+        match = CATEGORY_PATH.match(path)
+        if match and int(match.group(1)) < self.categories and page.isdigit():
+            return "category", int(match.group(1)), int(page)
+        match = PRODUCT_PATH.match(path)
+        if match and match.group(1) == match.group(2):
+            return "product", match.group(2), 0
+        return None
+
+    def _render(self, kind: str, key, page: int, build_id: str) -> dict:
+        if kind == "category":
+            start = (page - 1) * self.page_size
+            ids = [f"c{key}p{j}" for j in range(start, min(start + self.page_size, self.products))]
+            data = make_category_data(ids, self.products, self.make_hit)
+        else:
+            data = make_product_data(key)
+        data["buildId"] = build_id
+        return data
+
+    def _render_html(self, kind: str, key, page: int, build_id: str) -> bytes:
+        if kind == "home":
+            script = f'<script id="__NEXT_DATA__" type="application/json">{{"buildId":"{build_id}"}}</script>'
+            home = make_home_page([f"/c/cat-{i}" for i in range(self.categories)])
+            return home.replace(b"</body>", script.encode("utf-8") + b"</body>")
+        return make_page(self._data(kind, key, page, build_id), self.padding)
+
+    def _render_json(self, kind: str, key, page: int, build_id: str) -> bytes:
+        page_props = self._data(kind, key, page, build_id)["props"]["initialProps"]["pageProps"]
+        return json.dumps({"pageProps": page_props, "__N_SSP": True}).encode("utf-8")
+
+    def _respond(self, response: web.Response) -> web.Response:
+        self.statuses[response.status] += 1
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--products", type=int, default=100, help="Products per category")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--payload-kb", type=int, default=0, help="Markup padding per page")
+    parser.add_argument("--latency", type=float, default=0.0, help="Base latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mean of the exponential latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--listing-fields", action="store_true", help="Put the listing fields into category hits")
+    parser.add_argument("--no-data-routes", action="store_true", help="Answer /_next/data/ routes with 404")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        categories=args.categories,
+        products=args.products,
+        page_size=args.page_size,
+        payload_kb=args.payload_kb,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        listing_fields=args.listing_fields,
+        data_routes=not args.no_data_routes,
+        host=args.host,
+        port=args.port,
+    )
+    web.run_app(server.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from igefa_scraper.breaker import CircuitBreaker, CircuitOpenError, State, endpoint_of, is_failure
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(window=10, min_requests=4, error_rate=0.5, open_seconds=30, max_open_seconds=100, clock=clock)
+
+
+def test_endpoint_of_groups_urls_by_page_kind():
+    assert endpoint_of("https://store.igefa.de/p/seife/123") == "store.igefa.de/p"
+    assert endpoint_of("https://store.igefa.de/c/seife?page=2") == "store.igefa.de/c"
+    assert endpoint_of("https://store.igefa.de/_next/data/b1/p/seife/123.json") == "store.igefa.de/_next/data"
+    assert endpoint_of("https://store.igefa.de") == "store.igefa.de/"
+
+
+def test_is_failure_counts_only_endpoint_errors():
+    def status_error(status: int) -> aiohttp.ClientResponseError:
+        return aiohttp.ClientResponseError(None, (), status=status)
+
+    assert is_failure(status_error(503))
+    assert is_failure(status_error(429))
+    assert is_failure(asyncio.TimeoutError())
+    assert not is_failure(status_error(404))
+    assert not is_failure(ValueError("parse error"))
+
+
+def test_circuit_opens_on_error_rate_and_spares_other_endpoints():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for failed in (False, True, False, True):
+        breaker.record(breaker.check("https://store.igefa.de/p/a/1"), failed)
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.check("https://store.igefa.de/p/b/2")
+    assert error.value.retry_in == 30
+    assert breaker.check("https://store.igefa.de/c/seife") == "store.igefa.de/c"
+    assert breaker.open_circuits() == 1
+    assert breaker.rejected == 1
+
+
+def test_half_open_probe_closes_or_reopens_for_longer():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record(breaker.check("https://store.igefa.de/p/a/1"), True)
+
+    clock.now = 30
+    endpoint = breaker.check("https://store.igefa.de/p/a/1")  # The probe
+    with pytest.raises(CircuitOpenError):
+        breaker.check("https://store.igefa.de/p/a/1")  # Only one probe at a time
+    breaker.record(endpoint, True)
+    assert breaker.circuits[endpoint].state == State.OPEN
+    assert breaker.circuits[endpoint].retry_at == 90
+
+    clock.now = 90
+    breaker.record(breaker.check("https://store.igefa.de/p/a/1"), None)  # A cancelled probe decides nothing
+    breaker.record(breaker.check("https://store.igefa.de/p/a/1"), False)
+    assert breaker.circuits[endpoint].state == State.CLOSED
+    assert breaker.circuits[endpoint].open_for == 30
+    assert breaker.open_circuits() == 0
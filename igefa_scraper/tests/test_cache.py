@@ -0,0 +1,70 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from igefa_scraper.cache import ResponseCache
+from igefa_scraper.metrics import Metrics
+from igefa_scraper.scraper import IgefaScraper
+
+
+def make_app(bodies: dict, requests: list) -> web.Application:
+    async def handler(request: web.Request) -> web.Response:
+        body = bodies[request.path]
+        etag = f'"{hash(body)}"'
+        requests.append((request.path, request.headers.get("If-None-Match")))
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, headers={"ETag": etag, "Last-Modified": "Wed, 14 Oct 2026 10:00:00 GMT"})
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handler)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_fetch_revalidates_with_conditional_requests(tmp_path):
+    bodies = {"/p/a": b"a" * 1000, "/p/b": b"b" * 500}
+    requests = []
+    server = TestServer(make_app(bodies, requests))
+    await server.start_server()
+    try:
+        for run in range(2):
+            metrics = Metrics()
+            scraper = IgefaScraper(
+                frontier_file=None, dead_letter_file=None, cache_dir=str(tmp_path / "cache"), metrics=metrics
+            )
+            scraper.intermediate_file = str(tmp_path / "store")
+            async with scraper:
+                assert await scraper.fetch(str(server.make_url("/p/a"))) == bodies["/p/a"]
+                if run == 1:
+                    bodies["/p/b"] = b"changed"
+                assert await scraper.fetch(str(server.make_url("/p/b"))) == bodies["/p/b"]
+                stats = scraper.cache.stats()
+                gauges = metrics.snapshot()["gauges"]
+    finally:
+        await server.close()
+
+    assert requests[0] == ("/p/a", None)
+    assert requests[2][0] == "/p/a" and requests[2][1] is not None
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bytes_saved"] == 1000
+    assert gauges["cache_hits"] == 1
+    assert gauges["cache_misses"] == 1
+    assert gauges["cache_bytes_saved"] == 1000
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    with ResponseCache(str(tmp_path), max_bytes=250) as cache:
+        cache.put("a", b"a" * 100, '"a"', None)
+        cache.put("b", b"b" * 100, '"b"', None)
+        assert cache.get("a") is not None  # "b" is now the least recently used entry
+        cache.put("c", b"c" * 100, '"c"', None)
+
+        assert cache.conditional_headers("b") == {}
+        assert cache.conditional_headers("a") == {"If-None-Match": '"a"'}
+        assert cache.stats()["bytes_stored"] == 200
+        assert cache.stats()["evictions"] == 1
+
+        cache.put("d", b"d" * 100, None, None)  # No validators: cannot be revalidated
+        assert cache.conditional_headers("d") == {}
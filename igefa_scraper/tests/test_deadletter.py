@@ -0,0 +1,44 @@
+import sqlite3
+
+from igefa_scraper.deadletter import DeadLetterQueue, Kind
+
+
+def test_dead_letters_persist_until_the_url_succeeds(tmp_path):
+    filename = str(tmp_path / "dead_letters.sqlite3")
+    with DeadLetterQueue(filename) as queue:
+        queue.add("https://store.igefa.de/p/a/1", "HTTP 503")
+        queue.add("https://store.igefa.de/p/a/1", "TimeoutError")
+        queue.add("https://store.igefa.de/p/b/2", "Circuit open", attempted=False)
+        queue.add(
+            "https://store.igefa.de/c/seife?page=2", "HTTP 500", Kind.CATEGORY_PAGE, "https://store.igefa.de/c/seife", 2
+        )
+        assert queue.remove("https://store.igefa.de/p/b/2")
+        assert not queue.remove("https://store.igefa.de/p/b/2")
+
+    with DeadLetterQueue(filename) as queue:
+        assert len(queue) == 2
+        assert "https://store.igefa.de/p/a/1" in queue
+        product, page = queue.entries()
+        assert (product.kind, product.reason, product.attempts) == (Kind.PRODUCT, "TimeoutError", 2)
+        assert (page.kind, page.category_url, page.page) == (Kind.CATEGORY_PAGE, "https://store.igefa.de/c/seife", 2)
+        assert queue.entries(max_attempts=2) == [page]
+        assert queue.stats() == {"TimeoutError": 1, "HTTP 500": 1}
+
+
+def test_in_memory_queue():
+    with DeadLetterQueue(None) as queue:
+        queue.add("https://store.igefa.de/p/a/1", "HTTP 503")
+        assert len(queue) == 1
+
+
+def test_changes_are_buffered_until_flushed(tmp_path):
+    filename = str(tmp_path / "dead_letters.sqlite3")
+    with DeadLetterQueue(filename) as queue:
+        queue.add("https://store.igefa.de/p/a/1", "HTTP 503")
+        queue.add("https://store.igefa.de/p/b/2", "HTTP 503")
+        queue.remove("https://store.igefa.de/p/a/1")
+        with sqlite3.connect(filename) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0] == 0
+        queue.flush()
+        with sqlite3.connect(filename) as conn:
+            assert conn.execute("SELECT url FROM dead_letters").fetchall() == [("https://store.igefa.de/p/b/2",)]
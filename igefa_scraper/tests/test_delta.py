@@ -0,0 +1,106 @@
+import csv
+
+import pytest
+
+from igefa_scraper.constants import BASE_URL, COLUMNS_ORDER
+from igefa_scraper.delta import DeltaTracker, listing_fingerprint
+from igefa_scraper.export import export_changes
+from igefa_scraper.pages import parse_category_page, parse_listing_page
+from igefa_scraper.tests.helpers import (
+    FakeScraper,
+    make_catalogue,
+    make_category_data,
+    make_listing_hit,
+    make_page,
+    make_product_data,
+    product_url,
+)
+
+CATEGORY_URL = f"{BASE_URL}/c/seife"
+
+
+def test_listing_fingerprint_prefers_change_markers():
+    hit = {"mainVariant": {"id": "a", "slug": "x", "updatedAt": "2026-10-01"}, "position": 1}
+    moved = {"mainVariant": {"id": "a", "slug": "x", "updatedAt": "2026-10-01"}, "position": 7}
+    updated = {"mainVariant": {"id": "a", "slug": "x", "updatedAt": "2026-10-02"}, "position": 1}
+    assert listing_fingerprint(hit) == listing_fingerprint(moved)
+    assert listing_fingerprint(hit) != listing_fingerprint(updated)
+    assert listing_fingerprint({"a": 1}) != listing_fingerprint({"a": 2})
+
+
+def test_listing_fingerprint_without_markers_uses_row():
+    hit = {"mainVariant": {"id": "a", "slug": "x"}, "name": "Seife", "position": 1}
+    moved = dict(hit, position=7)
+    assert listing_fingerprint(hit, {"Product Name": "Seife"}) == listing_fingerprint(moved, {"Product Name": "Seife"})
+    assert listing_fingerprint(hit, {"Product Name": "Seife"}) != listing_fingerprint(hit, {"Product Name": "Creme"})
+
+
+def test_category_pages_fingerprint_only_in_delta_mode():
+    body = make_page(make_category_data(["a", "b"], 2, make_listing_hit))
+    listing, total, page_size = parse_category_page(body)
+    assert listing == {product_url("a"): None, product_url("b"): None}
+    assert (total, page_size) == (2, 2)
+
+    listing = parse_category_page(body, fingerprints=True)[0]
+    rows = parse_listing_page(body, fingerprints=True)[3]
+    hit = make_listing_hit("a")
+    assert listing[product_url("a")] == listing_fingerprint(hit, rows[product_url("a")])
+    assert parse_listing_page(body)[0] == {product_url("a"): None, product_url("b"): None}
+
+
+def test_delta_tracker_flags_content_changes(tmp_path):
+    with DeltaTracker(str(tmp_path / "delta.sqlite3")) as delta:
+        assert delta.select({"u1": "h1", "u2": "h2"}) == ["u1", "u2"]
+        assert delta.record("u1", {"name": "a"})
+        assert delta.record("u2", {"name": "b"})
+        delta.clear_changes()
+
+        assert delta.select({"u1": "h1", "u2": "h2-new"}) == ["u2"]
+        assert not delta.record("u2", {"name": "b"})  # Listing changed, content did not
+        assert delta.changed_urls() == set()
+
+        delta.record_many([("u1", {"name": "a2"}), ("u2", {"name": "b"}), ("u3", {"name": "c"})])
+        assert delta.changed_urls() == {"u1", "u3"}
+        assert not delta.needs_scrape("u2")
+
+
+@pytest.mark.asyncio
+async def test_delta_run_only_scrapes_changed_listings(tmp_path):
+    ids = [f"s{i}" for i in range(5)]
+    pages = make_catalogue({"/c/seife": ids})
+    kwargs = dict(intermediate_file=str(tmp_path / "store"), delta_file=str(tmp_path / "delta.sqlite3"))
+
+    async with FakeScraper(pages, **kwargs) as scraper:
+        await scraper.run()
+        assert scraper.delta.changed_urls() == {product_url(i) for i in ids}
+        scraper.delta.clear_changes()
+
+    # s1 gets a new listing marker and new content, s2 only a new listing marker
+    category = make_category_data(ids, total=5)
+    for hit in category["props"]["initialProps"]["pageProps"]["initialProductData"]["hits"]:
+        if hit["mainVariant"]["id"] in ("s1", "s2"):
+            hit["updatedAt"] = "2026-10-16"
+    pages[f"{CATEGORY_URL}?page=1"] = make_page(category)
+    changed = make_product_data("s1")
+    changed["props"]["initialProps"]["pageProps"]["product"]["name"] = "Renamed"
+    pages[product_url("s1")] = make_page(changed)
+
+    async with FakeScraper(pages, streaming=True, **kwargs) as scraper:
+        await scraper.run()
+        assert sorted(url for url in scraper.requested if "/p/" in url) == [product_url("s1"), product_url("s2")]
+        assert scraper.delta.changed_urls() == {product_url("s1")}
+
+
+@pytest.mark.asyncio
+async def test_delta_run_without_changes_empties_changes_file(tmp_path):
+    pages = make_catalogue({"/c/seife": ["s0", "s1"]})
+    kwargs = dict(intermediate_file=str(tmp_path / "store"), delta_file=str(tmp_path / "delta.sqlite3"))
+    changes = tmp_path / "changes.csv"
+
+    for expected in (2, 0):
+        async with FakeScraper(pages, **kwargs) as scraper:
+            await scraper.run()
+        assert export_changes(kwargs["intermediate_file"], kwargs["delta_file"], str(changes)) == expected
+
+    with open(changes, encoding="utf-8", newline="") as f:
+        assert list(csv.reader(f)) == [COLUMNS_ORDER]
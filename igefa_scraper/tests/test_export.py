@@ -0,0 +1,66 @@
+import csv
+
+import pytest
+
+from igefa_scraper.constants import COLUMNS_ORDER
+from igefa_scraper.export import export_records, export_store
+from igefa_scraper.store import ProductStore
+from igefa_scraper.tests.helpers import make_product_data, product_url
+from igefa_scraper.parser import extract_product_details_from_next_data
+
+
+def records(n: int) -> list:
+    return [extract_product_details_from_next_data(make_product_data(f"s{i}")) for i in range(n)]
+
+
+def test_export_csv_in_chunks_with_column_order(tmp_path):
+    rows = records(25)
+    rows[3]["Product Description"] = 'Line one\nline "two", three'
+    rows[4]["Extra"] = "ignored"
+    del rows[5]["Manufacturer"]
+    output = tmp_path / "out.csv"
+
+    assert export_records(rows + rows[:10], str(output), chunk_size=7) == 25
+
+    with open(output, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        assert next(reader) == COLUMNS_ORDER
+        exported = list(reader)
+    assert len(exported) == 25
+    assert exported[3][COLUMNS_ORDER.index("Product Description")] == 'Line one\nline "two", three'
+    assert exported[5][COLUMNS_ORDER.index("Manufacturer")] == ""
+
+
+def test_export_keeps_records_without_url(tmp_path):
+    rows = records(2) + [{"Product Name": "No URL 1"}, {"Product Name": "No URL 2", "Supplier-URL": ""}]
+    output = tmp_path / "out.csv"
+
+    assert export_records(rows + rows[:1], str(output)) == 4
+
+
+def test_export_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / "out.parquet"
+
+    assert export_records(records(12), str(output), chunk_size=5) == 12
+
+    table = pq.read_table(output)
+    assert table.column_names == COLUMNS_ORDER
+    assert table.num_rows == 12
+    assert table.column("Supplier-URL").to_pylist()[0] == product_url("s0")
+
+
+def test_export_store_latest_records_and_filter(tmp_path):
+    rows = records(3)
+    with ProductStore(str(tmp_path / "store")) as store:
+        store.append(rows)
+        store.append([dict(rows[1], **{"Product Name": "Renamed"})])
+
+    output = tmp_path / "changes.csv"
+    assert export_store(str(tmp_path / "store"), str(output), product_urls={product_url("s1")}) == 1
+    with open(output, encoding="utf-8", newline="") as f:
+        exported = list(csv.DictReader(f))
+    assert [row["Product Name"] for row in exported] == ["Renamed"]
+
+    assert export_store(str(tmp_path / "store"), str(tmp_path / "none.csv"), product_urls=set()) == 0
+    assert not (tmp_path / "none.csv").exists()
@@ -0,0 +1,67 @@
+import json
+
+from igefa_scraper.extractor import data_route_url, find_build_id, find_next_data, find_next_data_soup, load_next_data
+from igefa_scraper.tests.helpers import make_category_data, make_page
+
+
+def test_find_next_data_slices_payload():
+    data = {"props": {"initialProps": {"pageProps": {"product": {"name": "Seifencreme"}}}}}
+    payload = find_next_data(make_page(data, padding=100))
+    assert json.loads(payload) == data
+
+
+def test_find_next_data_accepts_str():
+    data = {"buildId": "abc"}
+    assert json.loads(find_next_data(make_page(data).decode("utf-8"))) == data
+
+
+def test_find_next_data_ignores_marker_outside_script_tag():
+    html = b'<div id="__NEXT_DATA__">not json</div><p>no script</p>'
+    assert find_next_data(html) is None
+
+
+def test_find_next_data_skips_marker_inside_earlier_script():
+    data = {"props": {"pageProps": {"ok": True}}}
+    inline = (
+        b"<script>var el = document.querySelector('script[id=\"__NEXT_DATA__\"]');"
+        b"var tpl = '<script id=\"__NEXT_DATA__\">{broken';</script>"
+    )
+    page = make_page(data).replace(b"<body>", b"<body>" + inline, 1)
+    assert json.loads(find_next_data(page)) == data
+
+
+def test_find_next_data_missing_returns_none():
+    assert find_next_data(b"<html><body></body></html>") is None
+
+
+def test_fast_path_matches_soup_path():
+    data = {"props": {"initialProps": {"pageProps": {"initialProductData": {"hits": [], "total": 0}}}}}
+    page = make_page(data, padding=50)
+    assert json.loads(find_next_data(page)) == json.loads(find_next_data_soup(page))
+
+
+def test_load_next_data_falls_back_to_soup():
+    # Unquoted attribute defeats the fast path but is still valid HTML
+    html = b'<html><body><script id=__NEXT_DATA__ type=application/json>{"a": 1}</script></body></html>'
+    assert find_next_data(html) is None
+    assert load_next_data(html) == {"a": 1}
+
+
+def test_load_next_data_missing_script():
+    assert load_next_data(b"<html><body><p>Not found</p></body></html>") is None
+
+
+def test_data_route_helpers():
+    assert (
+        data_route_url("https://store.igefa.de/c/seife?page=2", "b1")
+        == "https://store.igefa.de/_next/data/b1/c/seife.json?page=2"
+    )
+    assert data_route_url("https://store.igefa.de/p/x/1", "b1") == "https://store.igefa.de/_next/data/b1/p/x/1.json"
+    assert find_build_id(make_page({"props": {}, "buildId": "Xy_1-2"})) == "Xy_1-2"
+    assert find_build_id(b"<html></html>") is None
+
+    page_props = make_category_data(["a"], total=1)["props"]["initialProps"]["pageProps"]
+    body = json.dumps({"pageProps": page_props, "__N_SSP": True}).encode("utf-8")
+    assert load_next_data(body)["props"]["initialProps"]["pageProps"] == page_props
+    assert load_next_data(b'{"pageProps": {"__N_REDIRECT": "/login"}}') is None
+    assert load_next_data(b'{"notFound": true}') is None
@@ -0,0 +1,71 @@
+import pytest
+
+from igefa_scraper.constants import BASE_URL
+from igefa_scraper.frontier import Frontier, Status
+from igefa_scraper.tests.helpers import FakeScraper, make_catalogue, product_url
+
+CATEGORY_URL = f"{BASE_URL}/c/seife"
+
+
+def test_frontier_tracks_pages_and_products(tmp_path):
+    with Frontier(str(tmp_path / "frontier.sqlite3")) as frontier:
+        assert frontier.categories() is None
+        frontier.add_categories([CATEGORY_URL])
+        assert frontier.categories() == [CATEGORY_URL]
+
+        frontier.set_category_pages(CATEGORY_URL, total=50, page_size=20, n_pages=3)
+        assert frontier.complete_page(CATEGORY_URL, 1, ["a", "b"], processed_urls={"b"}) == ["a"]
+        assert frontier.complete_page(CATEGORY_URL, 2, ["a", "c"]) == ["c"]
+        frontier.fail_page(CATEGORY_URL, 3, "boom")
+        assert frontier.category(CATEGORY_URL) == (Status.IN_FLIGHT, 50, 20)
+        assert frontier.pending_pages(CATEGORY_URL) == [3]
+
+        frontier.start_product("a")
+        frontier.complete_page(CATEGORY_URL, 3, [])
+        assert frontier.discovery_complete()
+        assert not frontier.crawl_finished()
+
+    # "a" was in flight when the process stopped
+    with Frontier(str(tmp_path / "frontier.sqlite3")) as frontier:
+        assert frontier.pending_products() == ["a", "c"]
+        frontier.complete_product("a")
+        frontier.fail_product("c", "404")
+        assert frontier.crawl_finished()
+        frontier.mark_complete()
+
+    with Frontier(str(tmp_path / "frontier.sqlite3")) as frontier:
+        assert frontier.categories() is None
+        assert frontier.pending_products() == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_run_resumes_from_frontier(tmp_path, streaming):
+    ids = [f"s{i}" for i in range(50)]
+    pages = make_catalogue({"/c/seife": ids}, page_size=20)
+    kwargs = dict(
+        intermediate_file=str(tmp_path / "store"), frontier_file=str(tmp_path / "frontier.sqlite3"), streaming=streaming
+    )
+
+    # First run: page 3 and one product page are unavailable
+    first_run_pages = dict(pages)
+    del first_run_pages[f"{CATEGORY_URL}?page=3"]
+    del first_run_pages[product_url("s5")]
+    async with FakeScraper(first_run_pages, **kwargs) as scraper:
+        await scraper.run()
+        assert not scraper.frontier.crawl_finished()
+
+    async with FakeScraper(pages, **kwargs) as scraper:
+        await scraper.run()
+        assert scraper.requested and BASE_URL not in scraper.requested
+        assert f"{CATEGORY_URL}?page=1" not in scraper.requested
+        assert sorted(scraper.requested) == sorted(
+            [f"{CATEGORY_URL}?page=3", product_url("s5")] + [product_url(i) for i in ids[40:]]
+        )
+        assert len(scraper.processed_urls) == 50
+
+    # The crawl is complete, so the next run discovers again but scrapes nothing new
+    async with FakeScraper(pages, **kwargs) as scraper:
+        await scraper.run()
+        assert BASE_URL in scraper.requested
+        assert not any("/p/" in url for url in scraper.requested)
@@ -0,0 +1,45 @@
+import sys
+
+from igefa_scraper.idset import MIN_BUFFER, ProductIdSet, product_key
+from igefa_scraper.shard import shard_of
+from igefa_scraper.tests.helpers import product_url
+
+
+def test_product_id_set_dedups_on_product_id():
+    ids = ProductIdSet()
+    assert ids.add("https://store.igefa.de/p/seife/abc")
+    assert not ids.add("https://store.igefa.de/p/seife-neu/abc")  # Same product under a renamed slug
+    assert ids.add("https://store.igefa.de/p/seife/abd")
+    assert "https://store.igefa.de/p/x/abc" in ids
+    assert "https://store.igefa.de/p/x/xyz" not in ids
+    assert len(ids) == 2
+
+
+def test_product_id_set_merges_into_sorted_table():
+    urls = [product_url(f"id{i}") for i in range(MIN_BUFFER * 3 + 5)]
+    ids = ProductIdSet(urls)
+    assert len(ids) == len(urls)
+    assert all(url in ids for url in urls)
+    assert not any(product_url(f"other{i}") in ids for i in range(1000))
+    assert list(ids) == sorted(product_key(url) for url in urls)
+
+
+def test_product_id_set_from_product_ids_matches_urls():
+    ids = ProductIdSet.from_product_ids([f"id{i}" for i in range(100)] + ["id5"])
+    assert len(ids) == 100
+    assert product_url("id42") in ids
+    assert not ids.add(product_url("id42"))
+    assert ids.add(product_url("id100"))
+
+
+def test_product_id_set_is_smaller_than_a_url_set():
+    urls = [product_url(f"{i:012d}") for i in range(20000)]
+    ids = ProductIdSet(urls)
+    url_set = set(urls)
+    url_set_bytes = sys.getsizeof(url_set) + sum(sys.getsizeof(url) for url in url_set)
+    assert ids.nbytes * 10 < url_set_bytes
+
+
+def test_shards_follow_product_keys():
+    url = product_url("abc")
+    assert shard_of(url, 7) == product_key(url) % 7 + 1
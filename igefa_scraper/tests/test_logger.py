@@ -0,0 +1,68 @@
+import logging
+from logging.handlers import QueueHandler
+
+from igefa_scraper.logger import EventSampler, flush_progress, setup_logger
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(record.getMessage())
+
+
+def test_event_sampler_passes_one_in_n_and_summarises():
+    logger = logging.getLogger("test_event_sampler")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.addFilter(EventSampler(logger, every=3, interval=3600))
+
+    for i in range(7):
+        logger.info(f"Successfully scraped: {i}", extra={"event": "products saved"})
+    logger.info("Skipping already processed URL: x", extra={"event": "products skipped"})
+    logger.warning("No data scraped for URL: y", extra={"event": "products saved"})
+    logger.info("Starting scraper...")
+    flush_progress(logger)
+
+    assert handler.messages[:3] == ["Successfully scraped: 0", "Successfully scraped: 3", "Successfully scraped: 6"]
+    assert handler.messages[3:6] == [
+        "Skipping already processed URL: x",
+        "No data scraped for URL: y",
+        "Starting scraper...",
+    ]
+    assert handler.messages[6].startswith("Progress in the last")
+    assert handler.messages[6].endswith(": 7 products saved, 1 products skipped.")
+
+
+def test_event_sampler_zero_logs_progress_only():
+    logger = logging.getLogger("test_event_sampler_zero")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.addFilter(EventSampler(logger, every=0, interval=0))
+
+    logger.info("Successfully scraped: a", extra={"event": "products saved"})
+    assert len(handler.messages) == 1
+    assert handler.messages[0].endswith(": 1 products saved.")
+
+
+def test_setup_logger_writes_through_queue(tmp_path):
+    first, second = tmp_path / "first.log", tmp_path / "second.log"
+    logger = setup_logger("test_queue_logger", str(first), level="debug", fmt="%(levelname)s %(message)s")
+    assert any(isinstance(handler, QueueHandler) for handler in logger.handlers)
+    logger.debug("to the first file")
+
+    # Reconfiguring stops the previous listener, which writes what is still queued
+    setup_logger("test_queue_logger", str(second), level=logging.WARNING)
+    logger.info("dropped")
+    logger.error("to the second file")
+    setup_logger("test_queue_logger", None)
+
+    assert first.read_text() == "DEBUG to the first file\n"
+    assert second.read_text().endswith("[ERROR] to the second file\n")
+    assert len([handler for handler in logger.handlers if isinstance(handler, QueueHandler)]) == 1
@@ -0,0 +1,79 @@
+import json
+
+import aiohttp
+import pytest
+
+from igefa_scraper.metrics import Histogram, Metrics, MetricsExporter, NullMetrics
+from igefa_scraper.ratelimit import RateController
+from igefa_scraper.scraper import IgefaScraper
+from igefa_scraper.tests.standin import StandInServer
+
+
+def test_histogram_quantiles_and_prometheus_text():
+    metrics = Metrics()
+    for seconds in [0.002] * 90 + [0.2] * 9 + [50.0]:
+        metrics.observe("fetch", seconds)
+    metrics.inc("products_saved", 3)
+    metrics.gauge("url_queue_depth", lambda: 7)
+
+    histogram = metrics.histograms["fetch"]
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == 0.0025
+    assert histogram.quantile(0.95) == 0.25
+    assert histogram.quantile(1.0) == 50.0
+
+    text = metrics.prometheus()
+    assert 'igefa_stage_seconds_bucket{stage="fetch",le="0.0025"} 90' in text
+    assert 'igefa_stage_seconds_bucket{stage="fetch",le="+Inf"} 100' in text
+    assert 'igefa_stage_seconds_count{stage="fetch"} 100' in text
+    assert "igefa_products_saved_total 3" in text
+    assert "igefa_url_queue_depth 7" in text
+
+
+def test_null_metrics_record_nothing():
+    metrics = NullMetrics()
+    with metrics.timer("fetch"):
+        pass
+    metrics.observe("parse", 1.0)
+    metrics.inc("products_saved")
+    metrics.gauge("url_queue_depth", lambda: 1)
+    assert metrics.snapshot()["stages"] == {}
+    assert metrics.snapshot()["counters"] == {}
+    assert metrics.snapshot()["gauges"] == {}
+    assert not IgefaScraper().metrics.enabled
+    assert Histogram().quantile(0.5) == 0.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parse_workers", [0, 2])
+async def test_scraper_run_records_stage_metrics(tmp_path, parse_workers):
+    metrics = Metrics()
+    snapshot_file = tmp_path / "metrics.json"
+    async with StandInServer(categories=2, products=30, page_size=20) as server:
+        async with MetricsExporter(metrics, str(snapshot_file), interval=0.05, port=0) as exporter:
+            scraper = IgefaScraper(
+                streaming=True,
+                frontier_file=None,
+                dead_letter_file=None,
+                rate_controller=RateController(10),
+                parse_workers=parse_workers,
+                base_url=server.url,
+                metrics=metrics,
+            )
+            scraper.intermediate_file = str(tmp_path / "store")
+            async with scraper:
+                await scraper.run()
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{exporter.port}/metrics") as response:
+                    text = await response.text()
+
+    snapshot = json.loads(snapshot_file.read_text())
+    stages = snapshot["stages"]
+    for stage in ("fetch", "rate_wait", "parse", "locate", "json_decode", "extract", "save", "write"):
+        assert stages[stage]["count"] > 0, stage
+    assert stages["fetch"]["count"] == 1 + 4 + 60
+    assert stages["parse"]["count"] == 4 + 60
+    assert snapshot["counters"]["products_saved"] == 60
+    assert snapshot["counters"]["category_pages"] == 4
+    assert snapshot["gauges"]["records_written"] == 60
+    assert 'igefa_stage_seconds_count{stage="fetch"} 65' in text
@@ -4,7 +4,14 @@ from bs4 import BeautifulSoup
 import aiohttp
 import pytest
 
-from igefa_scraper.parser import extract_product_details_from_next_data
+from igefa_scraper.constants import LISTING_REQUIRED_FIELDS
+from igefa_scraper.pages import parse_listing_page
+from igefa_scraper.parser import (
+    extract_product_details_from_next_data,
+    extract_pagination_from_next_data,
+    missing_fields,
+)
+from igefa_scraper.tests.helpers import make_category_data, make_hit, make_listing_hit, make_page
 
 
 @pytest.mark.asyncio
@@ -58,3 +65,37 @@ async def test_parse_product_details_live():
         isinstance(product_data["Product Name"], str) and product_data["Product Name"]
     ), "Kolibri Comface Mundschutz 3-lagig Typ IIR"
     assert isinstance(product_data["EAN/GTIN"], str) and product_data["EAN/GTIN"], "4024009029110"
+
+
+def test_extract_pagination_from_next_data():
+    assert extract_pagination_from_next_data(make_category_data(["a", "b", "c"], total=10)) == (10, 3)
+
+    data = make_category_data(["a"], total=10)
+    data["props"]["initialProps"]["pageProps"]["initialProductData"]["hitsPerPage"] = 24
+    assert extract_pagination_from_next_data(data) == (10, 24)
+
+    assert extract_pagination_from_next_data({"props": {}}) == (0, 0)
+
+
+def test_parse_listing_page_builds_rows_from_hits():
+    data = make_category_data(["a", "b"], total=2, make_hit=make_listing_hit)
+    hits = data["props"]["initialProps"]["pageProps"]["initialProductData"]["hits"]
+    hits[1]["brand"] = None
+    hits.append(make_hit("c"))
+    hits.append({"name": "No variant"})
+
+    records = list(parse_listing_page(make_page(data))[3].values())
+
+    assert [record["Supplier-URL"] for record in records] == [
+        "https://store.igefa.de/p/product-a/a",
+        "https://store.igefa.de/p/product-b/b",
+        "https://store.igefa.de/p/product-c/c",
+    ]
+    assert records[0]["Manufacturer"] == "Clean and Clever"
+    assert records[1]["Manufacturer"] == ""
+    assert missing_fields(records[0], LISTING_REQUIRED_FIELDS) == []
+    assert missing_fields(records[2], LISTING_REQUIRED_FIELDS) == [
+        "Supplier Article Number",
+        "EAN/GTIN",
+        "Product Image URL",
+    ]
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from igefa_scraper.ratelimit import AdaptiveRateController, RateController, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_caps_request_rate():
+    bucket = TokenBucket(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(11):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_rate_controller_limits_concurrency():
+    controller = RateController(concurrency=3)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with controller.slot() as slot:
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+            slot.status = 200
+
+    await asyncio.gather(*(request() for _ in range(20)))
+    assert peak == 3
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_controller_widens_and_backs_off():
+    controller = AdaptiveRateController(concurrency=4, rate=10, max_rate=100, cooldown=0)
+    for _ in range(4 + 5):
+        await controller.acquire()
+        controller.release(200, 0.01, None)
+    assert controller.limit == 6
+    assert controller.rate == 11
+
+    await controller.acquire()
+    controller.release(429, 0.01, None)
+    assert controller.limit == 3
+    assert controller.rate == 5.5
+
+    await controller.acquire()
+    controller.release(None, 5.0, asyncio.TimeoutError())
+    assert controller.limit == 1.5
+
+
+@pytest.mark.asyncio
+async def test_adaptive_controller_backs_off_on_rising_p95():
+    controller = AdaptiveRateController(
+        concurrency=1000, max_concurrency=1000, rate=1000, latency_window=20, latency_tolerance=2.0
+    )
+    for _ in range(20):
+        await controller.acquire()
+        controller.release(200, 0.01, None)
+    assert controller.best_p95 == pytest.approx(0.01)
+
+    for _ in range(20):
+        await controller.acquire()
+        controller.release(200, 0.5, None)
+    assert controller.limit == 500
+
+
+@pytest.mark.asyncio
+async def test_adaptive_controller_queued_requests_follow_a_rate_cut():
+    controller = AdaptiveRateController(concurrency=1, min_concurrency=1, rate=100, min_rate=5, cooldown=0)
+    controller.bucket.burst = 1
+    await controller.acquire()
+    queued = [asyncio.create_task(controller.acquire()) for _ in range(20)]
+    await asyncio.sleep(0.1)  # 10 tokens at the old rate, which waiters for a slot must not bank
+
+    controller.release(429, 0.01, None)
+    controller.bucket.rate = 5
+    start = time.monotonic()
+    for task in queued[:3]:
+        await task
+        controller.release(200, 0.01, None)
+    assert time.monotonic() - start >= 0.35
+
+    for task in queued[3:]:
+        task.cancel()
+    await asyncio.gather(*queued[3:], return_exceptions=True)
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_controller_logs_back_off_only_when_it_changes(monkeypatch):
+    warnings = []
+    monkeypatch.setattr("igefa_scraper.ratelimit.logger.warning", warnings.append)
+    controller = AdaptiveRateController(concurrency=2, min_concurrency=1, rate=4, min_rate=2, cooldown=0)
+    for _ in range(5):
+        await controller.acquire()
+        controller.release(429, 0.01, None)
+    assert (controller.limit, controller.rate) == (1, 2)
+    assert len(warnings) == 1
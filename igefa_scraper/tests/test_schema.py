@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from igefa_scraper.pages import parse_listing_page
+from igefa_scraper.parser import (
+    extract_pagination_from_next_data,
+    extract_product_details_from_next_data,
+    extract_products_from_next_data,
+)
+from igefa_scraper.schema import decode_page, decode_pages, decode_page_struct
+from igefa_scraper.tests.helpers import make_category_data, make_listing_hit, make_page, make_product_data
+
+msgspec = pytest.importorskip("msgspec")
+
+
+def test_decode_page_drops_unread_paths():
+    data = make_product_data("p1")
+    data["buildId"] = "b1"
+    data["props"]["initialProps"]["pageProps"]["product"]["reviews"] = [{"text": "gut"}] * 10
+    decoded = decode_page(json.dumps(data))
+    assert "buildId" not in decoded
+    assert "reviews" not in decoded["props"]["initialProps"]["pageProps"]["product"]
+    assert extract_product_details_from_next_data(decoded) == extract_product_details_from_next_data(data)
+
+
+def test_decode_page_matches_json_for_category_pages(monkeypatch):
+    data = make_category_data([f"p{i}" for i in range(5)], 50, make_listing_hit)
+    data["props"]["initialProps"]["pageProps"]["initialProductData"]["hits"].append(None)
+    data["props"]["initialProps"]["pageProps"]["initialProductData"]["hitsPerPage"] = 5
+    decoded = decode_page(json.dumps(data).encode("utf-8"))
+    assert extract_products_from_next_data(decoded) == extract_products_from_next_data(data)
+    assert extract_pagination_from_next_data(decoded) == (50, 5)
+
+    page = make_page(data)
+    listing = parse_listing_page(page, fingerprints=True)
+    monkeypatch.setattr("igefa_scraper.pages.decode_page", json.loads)
+    assert parse_listing_page(page, fingerprints=True) == listing
+
+
+def test_decode_page_keeps_nulls():
+    data = {"props": {"initialProps": {"pageProps": {"product": {"name": None, "mainVariant": None}}}}}
+    assert decode_page(json.dumps(data)) == data
+
+
+def test_decode_page_falls_back_on_unexpected_shapes():
+    data = {"props": {"initialProps": {"pageProps": {"product": {"mainVariant": ["not", "an", "object"]}}}}}
+    assert decode_page(json.dumps(data)) == data
+    assert decode_page("[1, 2]") == [1, 2]
+    with pytest.raises(json.JSONDecodeError):
+        decode_page(b"{not json")
+
+
+def test_decode_page_data_route_redirect():
+    redirect = b'{"pageProps": {"__N_REDIRECT": "/login", "x": 1}}'
+    assert decode_page(redirect) == {"pageProps": {"__N_REDIRECT": "/login"}}
+
+
+def test_decode_page_struct():
+    page = decode_page_struct(json.dumps(make_product_data("p1")))
+    product = page.props.initialProps.pageProps.product
+    assert product.mainVariant.id == "p1"
+    assert product.brand.name == "Clean and Clever"
+    assert product.variationName is msgspec.UNSET
+
+
+def test_decode_pages_batch():
+    payloads = [json.dumps(make_product_data(f"p{i}")) for i in range(3)] + [b"{broken"]
+    decoded = decode_pages(payloads)
+    assert [extract_product_details_from_next_data(data)["Supplier-URL"][-2:] for data in decoded[:3]] == [
+        "p0",
+        "p1",
+        "p2",
+    ]
+    assert decoded[3] is None
@@ -0,0 +1,221 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from igefa_scraper.store import ProductStore
+from igefa_scraper.tests.helpers import FakeScraper, make_catalogue, make_listing_hit, product_url
+
+
+def read_urls(path) -> list:
+    with ProductStore(str(path)) as store:
+        return [data["Supplier-URL"] for data in store.iter_records()]
+
+
+@pytest.mark.asyncio
+async def test_run_batch(tmp_path):
+    pages = make_catalogue({"/c/seife": [f"s{i}" for i in range(25)]})
+    output = tmp_path / "store"
+    async with FakeScraper(pages, intermediate_file=str(output)) as scraper:
+        await scraper.run()
+
+    assert sorted(read_urls(output)) == sorted(product_url(f"s{i}") for i in range(25))
+
+
+@pytest.mark.asyncio
+async def test_run_batch_requests_products_listed_twice_once(tmp_path):
+    pages = make_catalogue({"/c/seife": ["s0", "s1", "s2"], "/c/papier": ["p0", "s1", "s2"]})
+    async with FakeScraper(pages, intermediate_file=str(tmp_path / "store")) as scraper:
+        await scraper.run()
+
+    product_requests = [url for url in scraper.requested if "/p/" in url]
+    assert sorted(product_requests) == sorted(product_url(i) for i in ("s0", "s1", "s2", "p0"))
+    assert len(scraper.processed_urls) == 4
+
+
+@pytest.mark.asyncio
+async def test_run_streaming_dedups_and_skips_processed(tmp_path):
+    pages = make_catalogue(
+        {
+            "/c/seife": [f"s{i}" for i in range(30)],
+            "/c/papier": [f"p{i}" for i in range(5)] + ["s0", "s1"],  # Listed in two categories
+        }
+    )
+    output = tmp_path / "store"
+    with ProductStore(str(output)) as store:
+        store.append([{"Supplier-URL": product_url("p0")}])
+    async with FakeScraper(pages, intermediate_file=str(output), streaming=True, workers=3, queue_size=2) as scraper:
+        await scraper.run()
+
+    urls = read_urls(output)
+    expected = {product_url(f"s{i}") for i in range(30)} | {product_url(f"p{i}") for i in range(5)}
+    assert len(urls) == len(expected)
+    assert set(urls) == expected
+    assert product_url("p0") not in scraper.requested
+
+
+class BrokenScraper(FakeScraper):
+    async def scrape_product(self, url: str):
+        raise RuntimeError("Writer is closed")
+
+
+@pytest.mark.asyncio
+async def test_run_streaming_survives_failing_workers(tmp_path):
+    pages = make_catalogue({"/c/seife": [f"s{i}" for i in range(20)]})
+    async with BrokenScraper(
+        pages, intermediate_file=str(tmp_path / "store"), streaming=True, workers=2, queue_size=1
+    ) as scraper:
+        await asyncio.wait_for(scraper.run(), timeout=10)
+
+
+@pytest.mark.asyncio
+async def test_category_pages_use_reported_page_size_and_survive_failures():
+    ids = [f"c{i}" for i in range(95)]
+    pages = make_catalogue({"/c/seife": ids}, page_size=30)
+    category_url = "https://store.igefa.de/c/seife"
+    del pages[f"{category_url}?page=2"]  # A failing page must not end pagination
+    scraper = FakeScraper(pages)
+
+    urls = await scraper.get_products_in_category(category_url)
+
+    assert sorted(urls) == sorted(product_url(i) for i in ids[:30] + ids[60:])
+    assert f"{category_url}?page=4" in scraper.requested
+    assert f"{category_url}?page=5" not in scraper.requested
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_run_with_parse_pool(tmp_path, streaming):
+    ids = [f"s{i}" for i in range(30)]
+    pages = make_catalogue({"/c/seife": ids})
+    output = tmp_path / "store"
+    async with FakeScraper(pages, intermediate_file=str(output), streaming=streaming, parse_workers=2) as scraper:
+        assert scraper.parse_pool is not None
+        await scraper.run()
+
+    assert sorted(read_urls(output)) == sorted(product_url(i) for i in ids)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_listing_only_fetches_only_incomplete_products(tmp_path, streaming):
+    def hit(product_id: str) -> dict:
+        data = make_listing_hit(product_id)
+        if product_id.endswith("7"):
+            del data["mainVariant"]["gtin"]  # Incomplete listing row
+        return data
+
+    ids = [f"s{i}" for i in range(30)]
+    pages = make_catalogue({"/c/seife": ids}, make_hit=hit)
+    output = tmp_path / "store"
+    async with FakeScraper(
+        pages, intermediate_file=str(output), streaming=streaming, listing_only=True, frontier_file=str(tmp_path / "f")
+    ) as scraper:
+        await scraper.run()
+
+    assert sorted(url for url in scraper.requested if "/p/" in url) == sorted(
+        product_url(i) for i in ("s7", "s17", "s27")
+    )
+    with ProductStore(str(output)) as store:
+        assert len(store) == 30
+        listed = store.get("s1")
+        fetched = store.get("s7")
+    assert listed["Product Name"] == "Product s1"
+    assert listed["Supplier Article Number"] == "SKU-s1"
+    assert listed["EAN/GTIN"] == "4024009029110"
+    assert listed["Product Image URL"] == "https://cdn.example/s1.jpg"
+    assert listed["Manufacturer"] == "Clean and Clever"
+    assert listed["Product Description"] == ""
+    assert fetched["Product Description"] == "Main"
+
+
+class FlakyScraper(FakeScraper):
+    """
+    Fails the first request to each of the given URLs.
+    """
+
+    def __init__(self, pages, flaky, **kwargs):
+        super().__init__(pages, **kwargs)
+        self.flaky = set(flaky)
+
+    async def fetch(self, url: str) -> bytes:
+        if url in self.flaky:
+            self.flaky.discard(url)
+            self.requested.append(url)
+            raise aiohttp.ClientConnectionError("Connection reset")
+        return await super().fetch(url)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_failed_urls_are_dead_lettered_and_retried(tmp_path, streaming):
+    ids = [f"s{i}" for i in range(25)]
+    pages = make_catalogue({"/c/seife": ids}, page_size=10)
+    flaky = [product_url("s3"), "https://store.igefa.de/c/seife?page=2"]
+    dead_letter_file = str(tmp_path / "dead_letters.sqlite3")
+    async with FlakyScraper(
+        pages, flaky, intermediate_file=str(tmp_path / "store"), dead_letter_file=dead_letter_file, streaming=streaming
+    ) as scraper:
+        await scraper.run()
+        assert len(scraper.dead_letters) == 0
+    assert sorted(read_urls(tmp_path / "store")) == sorted(product_url(i) for i in ids)
+
+    # Without the deferred pass the failures wait in the queue for the next run or --retry-failed
+    flaky = [product_url("s3"), "https://store.igefa.de/c/seife?page=2"]
+    async with FlakyScraper(
+        pages,
+        flaky,
+        intermediate_file=str(tmp_path / "second"),
+        dead_letter_file=dead_letter_file,
+        streaming=streaming,
+        retry_failed=False,
+    ) as scraper:
+        await scraper.run()
+        assert sorted(entry.url for entry in scraper.dead_letters.entries()) == sorted(flaky)
+        assert await scraper.retry_dead_letters() == 2
+    assert sorted(read_urls(tmp_path / "second")) == sorted(product_url(i) for i in ids)
+
+
+class DownScraper(FakeScraper):
+    """
+    Fails every request to the URLs in `down` and records the peak number of product fetches in flight.
+    """
+
+    def __init__(self, pages, down, **kwargs):
+        super().__init__(pages, **kwargs)
+        self.down = set(down)
+        self.in_flight = self.peak = 0
+
+    async def fetch(self, url: str) -> bytes:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if url in self.down:
+                raise aiohttp.ClientConnectionError("Connection reset")
+            return await super().fetch(url)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_retry_pass_uses_bounded_workers_and_counts_recoveries(tmp_path):
+    ids = [f"s{i}" for i in range(30)]
+    pages = make_catalogue({"/c/seife": ids}, page_size=30)
+    down = [product_url(i) for i in ids[:20]]
+    async with DownScraper(
+        pages,
+        down,
+        intermediate_file=str(tmp_path / "store"),
+        dead_letter_file=str(tmp_path / "dead_letters.sqlite3"),
+        workers=3,
+        retry_failed=False,
+    ) as scraper:
+        await scraper.run()
+        assert len(scraper.dead_letters) == 20
+
+        scraper.down = set(down[:5])  # These fail again
+        scraper.peak = 0
+        assert await scraper.retry_dead_letters() == 15
+        assert scraper.peak <= 3
+        assert sorted(entry.url for entry in scraper.dead_letters.entries()) == sorted(down[:5])
@@ -0,0 +1,59 @@
+import pytest
+
+from igefa_scraper.shard import Shard, merge_shards, shard_of
+from igefa_scraper.store import ProductStore
+from igefa_scraper.tests.helpers import FakeScraper, make_catalogue, product_url
+
+
+def read_urls(path) -> list:
+    with ProductStore(str(path)) as store:
+        return [data["Supplier-URL"] for data in store.iter_records()]
+
+
+def test_parse_and_filenames():
+    shard = Shard.parse("2/4")
+    assert (shard.index, shard.count) == (2, 4)
+    assert shard.filename("frontier.sqlite3") == "frontier.shard-2-of-4.sqlite3"
+    assert shard.filename("intermediate_data") == "intermediate_data.shard-2-of-4"
+    for spec in ("0/4", "5/4", "1/0", "1", "a/b"):
+        with pytest.raises(ValueError):
+            Shard.parse(spec)
+
+
+def test_partition_is_disjoint_and_complete():
+    urls = [product_url(f"s{i}") for i in range(1000)]
+    shards = [Shard(i, 4) for i in range(1, 5)]
+    for url in urls:
+        assert sum(shard.owns(url) for shard in shards) == 1
+    sizes = [sum(shard.owns(url) for url in urls) for shard in shards]
+    assert min(sizes) > 200
+    # The product id decides, not the URL slug
+    assert shard_of(product_url("s1"), 4) == shard_of("https://store.igefa.de/p/renamed/s1", 4)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_shards_scrape_disjoint_products_and_merge(tmp_path, streaming):
+    ids = [f"s{i}" for i in range(40)]
+    pages = make_catalogue({"/c/seife": ids[:30], "/c/papier": ids[20:]})
+    store = str(tmp_path / "store")
+    scraped = []
+    for index in (1, 2, 3):
+        shard = Shard(index, 3)
+        async with FakeScraper(
+            pages, intermediate_file=shard.filename(store), streaming=streaming, shard=shard
+        ) as scraper:
+            await scraper.run()
+        products = [url for url in scraper.requested if "/p/" in url]
+        assert all(scraper.shard.owns(url) for url in products)
+        scraped.extend(products)
+
+    assert sorted(scraped) == sorted(product_url(i) for i in ids)
+
+    assert merge_shards(3, store) == 40
+    with ProductStore(store) as target:
+        size = target.stats()["bytes"]
+    assert merge_shards(3, store) == 40  # Merging again does not duplicate products
+    with ProductStore(store) as target:
+        assert target.stats()["bytes"] <= size
+    assert sorted(read_urls(store)) == sorted(product_url(i) for i in ids)
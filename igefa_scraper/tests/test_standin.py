@@ -0,0 +1,93 @@
+import aiohttp
+import pytest
+
+from igefa_scraper.breaker import CircuitBreaker, CircuitOpenError
+from igefa_scraper.ratelimit import RateController
+from igefa_scraper.scraper import IgefaScraper
+from igefa_scraper.store import ProductStore
+from igefa_scraper.tests.helpers import product_url
+from igefa_scraper.tests.standin import StandInServer
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_scraper_end_to_end_against_standin(tmp_path, streaming):
+    async with StandInServer(categories=3, products=45, page_size=20, latency=0.001, jitter=0.002) as server:
+        scraper = IgefaScraper(
+            streaming=streaming,
+            frontier_file=str(tmp_path / "frontier.sqlite3"),
+            dead_letter_file=str(tmp_path / "dead_letters.sqlite3"),
+            rate_controller=RateController(20),
+            base_url=server.url,
+        )
+        scraper.intermediate_file = str(tmp_path / "store")
+        async with scraper:
+            await scraper.run()
+
+    with ProductStore(str(tmp_path / "store")) as store:
+        urls = sorted(store.urls())
+    assert urls == sorted(product_url(f"c{i}p{j}") for i in range(3) for j in range(45))
+    assert server.requests == {"home": 1, "category": 9, "product": 135}
+
+
+@pytest.mark.asyncio
+async def test_standin_injects_throttling():
+    async with StandInServer(throttle_rate=1.0) as server:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(server.url + "/c/cat-0") as response:
+                assert response.status == 429
+    assert server.statuses == {429: 1}
+
+
+@pytest.mark.asyncio
+async def test_data_routes_with_build_rotation_and_fallback(tmp_path):
+    async with StandInServer(categories=2, products=30, page_size=20) as server:
+        scraper = IgefaScraper(
+            frontier_file=None,
+            dead_letter_file=None,
+            rate_controller=RateController(10),
+            base_url=server.url,
+            data_routes=True,
+        )
+        scraper.intermediate_file = str(tmp_path / "store")
+        async with scraper:
+            await scraper.run()
+            assert scraper.build_id == "standin-1"
+            assert server.requests == {"home": 1, "data": 4 + 60}
+
+            # A new deployment: the stale route 404s, the HTML page reveals the new build id
+            server.build_id = "standin-2"
+            server.requests.clear()
+            assert await scraper.fetch_product(product_url("c0p1"))
+            assert await scraper.fetch_product(product_url("c0p2"))
+            assert scraper.build_id == "standin-2"
+            assert server.requests == {"data": 2, "product": 1}
+
+            # Routes that keep failing under the current build switch data routes off
+            server.data_routes = False
+            for j in range(3, 10):
+                assert await scraper.fetch_product(product_url(f"c0p{j}"))
+            assert not scraper.data_routes
+
+    with ProductStore(str(tmp_path / "store")) as store:
+        assert len(store) == 60
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_while_throttled(tmp_path):
+    async with StandInServer(throttle_rate=1.0) as server:
+        scraper = IgefaScraper(
+            frontier_file=None,
+            dead_letter_file=None,
+            rate_controller=RateController(10),
+            base_url=server.url,
+            breaker=CircuitBreaker(min_requests=2, open_seconds=60),
+        )
+        scraper.intermediate_file = str(tmp_path / "store")
+        async with scraper:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await scraper.fetch(server.url + "/c/cat-0?page=1")
+            # Both attempts were throttled: the circuit is open and the next request is not sent
+            with pytest.raises(CircuitOpenError):
+                await scraper.fetch(server.url + "/c/cat-0?page=2")
+    assert server.statuses == {429: 2}
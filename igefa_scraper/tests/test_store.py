@@ -0,0 +1,71 @@
+import gzip
+import os
+
+from igefa_scraper.store import ProductStore
+
+
+def record(i: int, version: int = 0) -> dict:
+    return {"Supplier-URL": f"https://store.igefa.de/p/product-{i}/id{i}", "Product Name": f"P{i} v{version}"}
+
+
+def test_store_rolls_into_compressed_segments(tmp_path):
+    with ProductStore(str(tmp_path), segment_size=2000) as store:
+        for i in range(50):
+            store.append([record(i)])
+        assert store.get("id7") == record(7)
+
+    names = sorted(os.listdir(tmp_path))
+    assert "index.tsv" in names
+    assert any(name.endswith(".jsonl.gz") for name in names)
+    with gzip.open(tmp_path / "segment-000001.jsonl.gz", "rt", encoding="utf-8") as f:
+        assert f.readline().startswith('{"Supplier-URL"')
+
+    with ProductStore(str(tmp_path), segment_size=2000) as store:
+        assert len(store) == 50
+        assert [data["Product Name"] for data in store.iter_records()] == [f"P{i} v0" for i in range(50)]
+        assert store.get("id42") == record(42)
+
+
+def test_store_keeps_latest_record_and_compacts(tmp_path):
+    with ProductStore(str(tmp_path), segment_size=1500) as store:
+        for version in range(3):
+            store.append([record(i, version) for i in range(10)])
+        assert len(store) == 10
+        before = store.stats()["bytes"]
+
+        store.compact()
+        assert store.stats()["bytes"] < before
+        assert [data["Product Name"] for data in store.iter_records()] == [f"P{i} v2" for i in range(10)]
+
+    with ProductStore(str(tmp_path)) as store:
+        assert sorted(store.urls()) == sorted(record(i)["Supplier-URL"] for i in range(10))
+        assert len(list(store.iter_records())) == 10
+
+
+def test_store_iter_records_decodes_live_records_only(tmp_path, monkeypatch):
+    with ProductStore(str(tmp_path), segment_size=1500) as store:
+        for version in range(3):
+            store.append([record(i, version) for i in range(10)])
+
+        decoded = []
+        decode = ProductStore._decode
+        monkeypatch.setattr(ProductStore, "_decode", staticmethod(lambda line: decoded.append(line) or decode(line)))
+        assert [data["Product Name"] for data in store.iter_records()] == [f"P{i} v2" for i in range(10)]
+        assert len(decoded) == 10
+
+
+def test_store_recovers_unindexed_tail_and_torn_write(tmp_path):
+    store = ProductStore(str(tmp_path)).open()
+    store.append([record(1), record(2)])
+    store.close()
+
+    # Simulate a crash: more records reach the segment but not the index, the last line is torn
+    with open(tmp_path / "segment-000001.jsonl", "ab") as f:
+        f.write(b'{"Supplier-URL": "https://store.igefa.de/p/product-3/id3"}\n{"Supplier-URL": "ht')
+
+    with ProductStore(str(tmp_path)) as store:
+        assert "id3" in store
+        assert len(store) == 3
+        store.append([record(4)])
+        assert store.get("id4") == record(4)
+        assert len(list(store.iter_records())) == 4
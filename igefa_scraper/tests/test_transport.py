@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from igefa_scraper.scraper import is_retryable
+from igefa_scraper.transport import ResponseTooLarge, Transport
+
+
+async def start_server(routes) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_routes(routes)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+async def small(request: web.Request) -> web.Response:
+    return web.Response(body=b"x" * 1000)
+
+
+async def large(request: web.Request) -> web.Response:
+    return web.Response(body=b"x" * 5000)
+
+
+async def chunked(request: web.Request) -> web.StreamResponse:
+    # No Content-Length: the limit can only be enforced while reading
+    response = web.StreamResponse()
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    for _ in range(10):
+        await response.write(b"x" * 1000)
+    await response.write_eof()
+    return response
+
+
+async def stalled(request: web.Request) -> web.Response:
+    await asyncio.sleep(1)
+    return web.Response(body=b"late")
+
+
+@pytest.mark.asyncio
+async def test_transport_reads_bodies_and_reuses_connections():
+    runner = await start_server([web.get("/small", small)])
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}/small"
+    try:
+        async with Transport(pool_size=2, max_body_size=2000, chunk_size=256) as transport:
+            for _ in range(3):
+                async with transport.get(url) as response:
+                    assert await transport.read(response) == b"x" * 1000
+            assert transport.requests == 3
+            assert transport.connections_opened == 1
+            assert transport.connections_reused == 2
+            assert transport.bytes_read == 3000
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_transport_aborts_oversized_responses():
+    runner = await start_server([web.get("/large", large), web.get("/chunked", chunked)])
+    base = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    try:
+        async with Transport(max_body_size=2000, chunk_size=256) as transport:
+            for path in ("/large", "/chunked"):
+                async with transport.get(base + path) as response:
+                    with pytest.raises(ResponseTooLarge) as excinfo:
+                        await transport.read(response)
+                assert excinfo.value.size > 2000
+                assert not is_retryable(excinfo.value)
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_transport_read_timeout():
+    runner = await start_server([web.get("/stalled", stalled)])
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}/stalled"
+    try:
+        async with Transport(read_timeout=0.1) as transport:
+            with pytest.raises(asyncio.TimeoutError) as excinfo:
+                async with transport.get(url) as response:
+                    await transport.read(response)
+            assert is_retryable(excinfo.value)
+    finally:
+        await runner.cleanup()
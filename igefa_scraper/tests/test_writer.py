@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from igefa_scraper.store import ProductStore
+from igefa_scraper.writer import Durability, IntermediateWriter
+
+
+def read_lines(path) -> list:
+    with ProductStore(str(path)) as store:
+        return list(store.iter_records())
+
+
+def record(i: int) -> dict:
+    return {"Supplier-URL": f"https://store.igefa.de/p/product-{i}/id{i}", "id": i}
+
+
+async def start_writer(path, **kwargs) -> IntermediateWriter:
+    writer = IntermediateWriter(ProductStore(str(path)).open(), **kwargs)
+    await writer.start()
+    return writer
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_by_size(tmp_path):
+    path = tmp_path / "store"
+    writer = await start_writer(path, batch_size=10, flush_interval=60)
+    for i in range(25):
+        await writer.put(record(i))
+    await writer.close()
+
+    assert [row["id"] for row in read_lines(path)] == list(range(25))
+    assert writer.records_written == 25
+    assert writer.batches_written == 3
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_by_time(tmp_path):
+    path = tmp_path / "store"
+    writer = await start_writer(path, batch_size=1000, flush_interval=0.05)
+    await writer.put(record(1))
+    await asyncio.sleep(0.2)
+
+    assert writer.records_written == 1
+    assert (path / "segment-000001.jsonl").read_bytes().count(b"\n") == 1
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_writer_drains_queue_when_cancelled(tmp_path):
+    path = tmp_path / "store"
+    writer = await start_writer(path, batch_size=1000, flush_interval=60)
+    for i in range(5):
+        await writer.put(record(i))
+    writer._task.cancel()
+    await writer.close()
+
+    assert len(read_lines(path)) == 5
+    with pytest.raises(RuntimeError):
+        await writer.put(record(6))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("durability, expected_fsyncs", [("none", 0), ("batch", 3), ("shutdown", 1)])
+async def test_writer_durability(tmp_path, monkeypatch, durability, expected_fsyncs):
+    fsyncs = []
+    monkeypatch.setattr("igefa_scraper.store.os.fsync", fsyncs.append)
+    writer = await start_writer(tmp_path / "store", batch_size=2, durability=Durability(durability))
+    for i in range(6):
+        await writer.put(record(i))
+        await asyncio.sleep(0)
+    await writer.close()
+
+    assert len(fsyncs) == expected_fsyncs
+
+
+@pytest.mark.asyncio
+async def test_writer_flush_runs_on_flush_with_keyed_records(tmp_path):
+    flushed = []
+    writer = await start_writer(tmp_path / "store", batch_size=1000, flush_interval=60, on_flush=flushed.append)
+    await writer.put(record(1), "u1")
+    await writer.put(record(2))
+    await writer.flush()
+    assert writer.records_written == 2
+    assert flushed == [[("u1", record(1))]]
+
+    await writer.put(record(3), "u3")
+    await writer.close()
+    assert flushed[-1] == [("u3", record(3))]
@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import aiohttp
+
+from .constants import (
+    DNS_CACHE_TTL,
+    HEADERS,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_TOTAL_TIMEOUT,
+    KEEPALIVE_TIMEOUT,
+    MAX_BODY_SIZE,
+    MAX_CONCURRENCY,
+    READ_CHUNK_SIZE,
+)
+from .logger import main_logger as logger
+
+
+class ResponseTooLarge(aiohttp.ClientError):
+    """
+    A response body exceeded the transport's max_body_size. Not retried: the page will not get any smaller.
+    """
+
+    def __init__(self, url: str, size: int, limit: int):
+        super().__init__(f"Response of {url} exceeds {limit} bytes (at least {size}).")
+        self.url = url
+        self.size = size
+        self.limit = limit
+
+
+class Transport:
+    """
+    The scraper's shared HTTP session.
+
+    The connection pool is sized to the most requests the rate controller lets run at once, so a request never
+    queues for a connection, and idle connections are kept alive for reuse by the next request to the host.
+    Every request has total, connect and read timeouts, and bodies are read in chunks up to max_body_size,
+    so a slow or huge response cannot hold a connection and its memory indefinitely.
+    Connection reuse is counted with aiohttp tracing and logged on close.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = MAX_CONCURRENCY,
+        headers: Optional[Dict[str, str]] = None,
+        total_timeout: Optional[float] = HTTP_TOTAL_TIMEOUT,
+        connect_timeout: Optional[float] = HTTP_CONNECT_TIMEOUT,
+        read_timeout: Optional[float] = HTTP_READ_TIMEOUT,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: Optional[int] = DNS_CACHE_TTL,
+        max_body_size: int = MAX_BODY_SIZE,
+        chunk_size: int = READ_CHUNK_SIZE,
+    ):
+        self.pool_size = pool_size
+        self.headers = HEADERS if headers is None else headers
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout, sock_read=read_timeout)
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.max_body_size = max_body_size
+        self.chunk_size = chunk_size
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.bytes_read = 0
+
+    async def open(self) -> "Transport":
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,
+            use_dns_cache=self.dns_cache_ttl is not None,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_connection_create_end.append(self._on_connection_opened)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        self.session = aiohttp.ClientSession(
+            headers=self.headers, connector=connector, timeout=self.timeout, trace_configs=[trace]
+        )
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+            logger.info(
+                f"HTTP transport: {self.requests} requests, {self.connections_opened} connections opened, "
+                f"{self.connections_reused} reused ({self.reuse_ratio:.0%}), {self.bytes_read / 2**20:.1f} MB read."
+            )
+
+    async def __aenter__(self) -> "Transport":
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def reuse_ratio(self) -> float:
+        """
+        Share of requests that were sent on a kept-alive connection.
+        """
+        connections = self.connections_opened + self.connections_reused
+        return self.connections_reused / connections if connections else 0.0
+
+    def get(self, url: str, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    async def read(self, response: aiohttp.ClientResponse) -> bytes:
+        """
+        Reads a response body chunk by chunk as bytes, aborting once it exceeds max_body_size.
+        The limit applies to the decompressed body, so a small compressed response cannot expand without bound.
+        Raises:
+            ResponseTooLarge: If Content-Length or the bytes read exceed max_body_size.
+        """
+        url = str(response.url)
+        if response.content_length is not None and response.content_length > self.max_body_size:
+            response.close()
+            raise ResponseTooLarge(url, response.content_length, self.max_body_size)
+
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(self.chunk_size):
+            size += len(chunk)
+            if size > self.max_body_size:
+                response.close()  # Drops the connection instead of reading the rest of the body
+                raise ResponseTooLarge(url, size, self.max_body_size)
+            chunks.append(chunk)
+        self.bytes_read += size
+        return b"".join(chunks)
+
+    async def _on_request_start(self, session, context: SimpleNamespace, params):
+        self.requests += 1
+
+    async def _on_connection_opened(self, session, context: SimpleNamespace, params):
+        self.connections_opened += 1
+
+    async def _on_connection_reused(self, session, context: SimpleNamespace, params):
+        self.connections_reused += 1
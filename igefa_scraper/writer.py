@@ -0,0 +1,171 @@
+import asyncio
+import threading
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .constants import DEFAULT_QUEUE_SIZE, WRITER_BATCH_SIZE, WRITER_FLUSH_INTERVAL
+from .logger import main_logger as logger
+from .metrics import Metrics, NullMetrics
+from .store import ProductStore
+
+_STOP = object()  # Sentinel telling the writer task to drain and exit
+
+
+class Durability(str, Enum):
+    """
+    When the product store is fsynced.
+    """
+
+    NONE = "none"  # Leave it to the OS
+    BATCH = "batch"  # After every flushed batch
+    SHUTDOWN = "shutdown"  # Once, when the writer is closed
+
+
+class IntermediateWriter:
+    """
+    Single writer task owning the product store.
+    Records are taken from a queue and written in batches, flushed when the batch is full
+    or when the oldest record in it has waited for flush_interval seconds.
+    The writer closes the store when it shuts down.
+
+    on_flush runs in the writer's thread after every batch is in the store, with the (key, record) pairs of the
+    records that were put with a key. IgefaScraper uses it to update its SQLite bookkeeping once per batch.
+    """
+
+    def __init__(
+        self,
+        store: ProductStore,
+        batch_size: int = WRITER_BATCH_SIZE,
+        flush_interval: float = WRITER_FLUSH_INTERVAL,
+        durability: Durability = Durability.NONE,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        metrics: Optional[Metrics] = None,
+        on_flush: Optional[Callable[[List[Tuple[str, Dict]]], None]] = None,
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = Durability(durability)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.records_written = 0
+        self.batches_written = 0
+        self.metrics = metrics or NullMetrics()
+        self.on_flush = on_flush
+        self._lock = threading.Lock()  # A cancelled to_thread write may still be running during shutdown
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, data: Dict, key: Optional[str] = None):
+        """
+        Queues a record for writing. Blocks while the queue is full.
+        Args:
+            data (Dict): Record.
+            key (Optional[str]): Passed to on_flush with the record, e.g. the URL it was scraped from.
+        """
+        if data is None:
+            return
+        if self._task is None or self._task.done():
+            raise RuntimeError("IntermediateWriter is not running.")
+        await self.queue.put((data, key))
+
+    async def flush(self):
+        """
+        Waits until every record queued so far is written and on_flush has run for it.
+        """
+        if self._task is None or self._task.done():
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self.queue.put(done)
+        await done
+
+    async def close(self):
+        """
+        Drains every queued record to disk and closes the store.
+        """
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self.queue.put(_STOP)
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if not self.store.closed:
+            # The task was cancelled before it ever ran
+            self._shutdown([])
+        self._task = None
+        logger.info(
+            f"Intermediate writer saved {self.records_written} records in {self.batches_written} batches "
+            f"to {self.store.directory}."
+        )
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[Dict, Optional[str]]] = []
+        deadline = 0.0
+        try:
+            while True:
+                try:
+                    timeout = max(0.0, deadline - loop.time()) if batch else None
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    pending, batch = batch, []
+                    await asyncio.to_thread(self._write_batch, pending)
+                    continue
+
+                # Pick up everything that is already waiting without another round trip through the loop
+                while True:
+                    if item is _STOP:
+                        return
+                    if isinstance(item, asyncio.Future):
+                        pending, batch = batch, []
+                        await asyncio.to_thread(self._write_batch, pending)
+                        if not item.done():
+                            item.set_result(None)
+                    else:
+                        if not batch:
+                            deadline = loop.time() + self.flush_interval
+                        batch.append(item)
+                    if len(batch) >= self.batch_size or self.queue.empty():
+                        break
+                    item = self.queue.get_nowait()
+
+                if len(batch) >= self.batch_size:
+                    pending, batch = batch, []
+                    await asyncio.to_thread(self._write_batch, pending)
+        finally:
+            # Runs on normal shutdown and on cancellation: nothing queued may be lost
+            self._shutdown(batch)
+
+    def _shutdown(self, batch: List[Tuple[Dict, Optional[str]]]):
+        flushes = []
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if isinstance(item, asyncio.Future):
+                flushes.append(item)
+            elif item is not _STOP:
+                batch.append(item)
+        self._write_batch(batch)
+        with self._lock:
+            self.store.flush(fsync=self.durability == Durability.SHUTDOWN)
+            self.store.close()
+        for done in flushes:
+            if not done.done():
+                done.set_result(None)
+
+    def _write_batch(self, batch: List[Tuple[Dict, Optional[str]]]):
+        if not batch:
+            return
+        with self._lock:
+            with self.metrics.timer("write"):
+                self.store.append([data for data, _ in batch])
+                self.store.flush(fsync=self.durability == Durability.BATCH)
+                self.records_written += len(batch)
+                self.batches_written += 1
+            if self.on_flush:
+                try:
+                    self.on_flush([(key, data) for data, key in batch if key is not None])
+                except Exception as e:
+                    logger.error(f"Intermediate writer: updating after a batch failed: {e}")
@@ -1,21 +1,313 @@
+import argparse
 import asyncio
+import contextlib
+from typing import Optional
 from igefa_scraper.scraper import IgefaScraper
-from igefa_scraper.utils import create_csv
-from igefa_scraper.logger import main_logger as logger
+from igefa_scraper.utils import create_csv, resolve_path
+from igefa_scraper.constants import (
+    DEFAULT_WORKERS,
+    DEFAULT_QUEUE_SIZE,
+    WRITER_BATCH_SIZE,
+    WRITER_FLUSH_INTERVAL,
+    INTERMEDIATE_STORE,
+    FRONTIER_FILE,
+    DEAD_LETTER_FILE,
+    CACHE_SIZE,
+    DELTA_FILE,
+    INITIAL_CONCURRENCY,
+    MAX_CONCURRENCY,
+    INITIAL_RATE,
+    MAX_RATE,
+    METRICS_FILE,
+    METRICS_INTERVAL,
+    HTTP_TOTAL_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    MAX_BODY_SIZE,
+    LOG_FILE,
+    LOG_FORMAT,
+    LOG_SAMPLE_EVERY,
+    PROGRESS_INTERVAL,
+)
+from igefa_scraper.writer import Durability
+from igefa_scraper.store import ProductStore
+from igefa_scraper.export import export_changes, export_store
+from igefa_scraper.ratelimit import AdaptiveRateController
+from igefa_scraper.shard import Shard, merge_shards
+from igefa_scraper.metrics import Metrics, MetricsExporter
+from igefa_scraper.transport import Transport
+from igefa_scraper.logger import main_logger as logger, setup_logger
 import os
 
 
-async def main():
-    async with IgefaScraper() as scraper:
-        await scraper.run()
+def shard(spec: str) -> Shard:
+    try:
+        return Shard.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
-    # Check if the intermediate data file exists
-    if os.path.exists(scraper.intermediate_file):
-        logger.info(f"Intermediate data file '{scraper.intermediate_file}' found. Creating CSV...")
-        create_csv(scraper.intermediate_file, "output.csv")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Asynchronous scraper for https://store.igefa.de/")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Scrape products while categories are still being discovered",
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of product workers (streaming)")
+    parser.add_argument(
+        "--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Capacity of the pipeline queues (streaming)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=WRITER_BATCH_SIZE, help="Records per write to the intermediate file"
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=WRITER_FLUSH_INTERVAL,
+        help="Maximum seconds a record waits before being written",
+    )
+    parser.add_argument(
+        "--durability",
+        choices=[durability.value for durability in Durability],
+        default=Durability.NONE.value,
+        help="When to fsync the intermediate file: never, after every batch or on shutdown",
+    )
+    parser.add_argument(
+        "--no-frontier",
+        action="store_true",
+        help="Do not record discovery progress; every run re-walks all categories",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Only retry the URLs in the dead-letter queue, however often they failed, then export",
+    )
+    parser.add_argument(
+        "--no-retry-pass",
+        action="store_true",
+        help="Leave failed URLs in the dead-letter queue instead of retrying them at the end of the run",
+    )
+    parser.add_argument(
+        "--no-dead-letters",
+        action="store_true",
+        help="Do not record failed URLs; they are only logged",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        help="Keep responses in DIR and revalidate them with conditional requests on the next run",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=CACHE_SIZE // (1024 * 1024),
+        help="Size budget of the response cache in MB",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Only scrape products whose listing is new or changed and write the changes to changes.csv",
+    )
+    parser.add_argument("--concurrency", type=int, default=INITIAL_CONCURRENCY, help="Concurrent requests at start")
+    parser.add_argument(
+        "--max-concurrency", type=int, default=MAX_CONCURRENCY, help="Upper bound for adaptive concurrency"
+    )
+    parser.add_argument("--rate", type=float, default=INITIAL_RATE, help="Requests per second at start")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE, help="Upper bound for the adaptive request rate")
+    parser.add_argument(
+        "--timeout", type=float, default=HTTP_TOTAL_TIMEOUT, help="Seconds per request, including the body"
+    )
+    parser.add_argument(
+        "--connect-timeout", type=float, default=HTTP_CONNECT_TIMEOUT, help="Seconds to establish a connection"
+    )
+    parser.add_argument(
+        "--read-timeout", type=float, default=HTTP_READ_TIMEOUT, help="Seconds a response may stall between reads"
+    )
+    parser.add_argument(
+        "--max-body-mb",
+        type=int,
+        default=MAX_BODY_SIZE // (1024 * 1024),
+        help="Abort responses larger than this many MB",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Parse pages in this many worker processes (0 parses on the event loop)",
+    )
+    parser.add_argument(
+        "--data-routes",
+        action="store_true",
+        help="Fetch the Next.js /_next/data/ JSON routes instead of HTML pages, falling back to HTML when they fail",
+    )
+    parser.add_argument(
+        "--listing-only",
+        action="store_true",
+        help="Build rows from category listings and fetch product pages only for rows missing required fields",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Also export output.parquet (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard,
+        metavar="I/N",
+        help="Scrape only the products of shard I of N, with its own store and resume state",
+    )
+    parser.add_argument(
+        "--merge",
+        type=int,
+        metavar="N",
+        help="Merge the stores of an N-shard crawl into the product store, export it and exit",
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        const=METRICS_FILE,
+        metavar="FILE",
+        help=f"Write per-stage timings, counters and gauges to FILE (default {METRICS_FILE}) periodically",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve the metrics in Prometheus text format at http://0.0.0.0:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=METRICS_INTERVAL,
+        help="Seconds between metrics snapshots",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Compact the product store (of the --shard, if given) to the latest record per product and exit",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default="INFO",
+        type=str.upper,
+        help="Minimum level of logged messages",
+    )
+    parser.add_argument("--log-format", default=LOG_FORMAT, help="logging.Formatter format of log lines")
+    parser.add_argument("--log-file", default=LOG_FILE, help="File the log is written to besides stderr")
+    parser.add_argument(
+        "--log-sample",
+        type=int,
+        default=LOG_SAMPLE_EVERY,
+        metavar="N",
+        help="Log one in N per-URL events (1 logs all, 0 none); the others are counted in progress lines",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=PROGRESS_INTERVAL,
+        help="Seconds between progress lines",
+    )
+    return parser.parse_args()
+
+
+def configure_logging(args: argparse.Namespace):
+    setup_logger(
+        logger.name,
+        args.log_file,
+        level=args.log_level,
+        fmt=args.log_format,
+        sample_every=args.log_sample,
+        progress_interval=args.progress_interval,
+    )
+
+
+def compact_store(shard: Optional[Shard] = None):
+    with ProductStore(shard.filename(INTERMEDIATE_STORE) if shard else INTERMEDIATE_STORE) as store:
+        store.compact()
+
+
+def export(intermediate_file: str, parquet: bool):
+    # Check if the intermediate data store exists
+    if os.path.exists(resolve_path(intermediate_file)):
+        logger.info(f"Intermediate data file '{intermediate_file}' found. Creating CSV...")
+        create_csv(intermediate_file, "output.csv")
+        if parquet:
+            export_store(intermediate_file, "output.parquet")
     else:
-        logger.info(f"Intermediate data file '{scraper.intermediate_file}' does not exist. CSV file was not created.")
+        logger.info(f"Intermediate data file '{intermediate_file}' does not exist. CSV file was not created.")
+
+
+def create_scraper(args: argparse.Namespace, metrics: Optional[Metrics]) -> IgefaScraper:
+    rate_controller = AdaptiveRateController(
+        concurrency=args.concurrency,
+        max_concurrency=args.max_concurrency,
+        rate=args.rate,
+        max_rate=args.max_rate,
+    )
+    return IgefaScraper(
+        streaming=args.streaming,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        durability=Durability(args.durability),
+        frontier_file=None if args.no_frontier else FRONTIER_FILE,
+        dead_letter_file=None if args.no_dead_letters else DEAD_LETTER_FILE,
+        retry_failed=not args.no_retry_pass,
+        cache_dir=args.cache,
+        cache_size=args.cache_size_mb * 1024 * 1024,
+        delta_file=DELTA_FILE if args.delta else None,
+        rate_controller=rate_controller,
+        parse_workers=args.parse_workers,
+        shard=args.shard,
+        metrics=metrics,
+        listing_only=args.listing_only,
+        data_routes=args.data_routes,
+        transport=Transport(
+            pool_size=rate_controller.max_in_flight,
+            total_timeout=args.timeout,
+            connect_timeout=args.connect_timeout,
+            read_timeout=args.read_timeout,
+            max_body_size=args.max_body_mb * 1024 * 1024,
+        ),
+    )
+
+
+async def main(args: argparse.Namespace):
+    if args.compact:
+        compact_store(args.shard)
+        return
+    if args.merge:
+        merge_shards(args.merge)
+        export(INTERMEDIATE_STORE, args.parquet)
+        return
+
+    metrics = Metrics() if args.metrics or args.metrics_port is not None else None
+    async with contextlib.AsyncExitStack() as stack:
+        if metrics:
+            # Entered first so the final snapshot includes the scraper's shutdown
+            await stack.enter_async_context(
+                MetricsExporter(metrics, args.metrics, args.metrics_interval, args.metrics_port)
+            )
+        scraper = await stack.enter_async_context(create_scraper(args, metrics))
+        if args.retry_failed:
+            await scraper.retry_dead_letters(max_attempts=None)
+        else:
+            await scraper.run()
+
+    if args.delta:
+        changes_file = args.shard.filename("changes.csv") if args.shard else "changes.csv"
+        export_changes(scraper.intermediate_file, scraper.delta_file, changes_file)
+
+    if args.shard:
+        logger.info(f"Shard {args.shard} finished. Run with --merge {args.shard.count} once every shard is done.")
+        return
+    export(scraper.intermediate_file, args.parquet)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    arguments = parse_args()
+    configure_logging(arguments)
+    asyncio.run(main(arguments))